@@ -0,0 +1,203 @@
+"""
+Split-conformal prediction intervals
+"""
+import os
+import json
+import math
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+# Get paths and interval settings from config
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import (
+    CONFORMAL_TABLE_PATH, CONFIDENCE_LEVELS,
+    CONFORMAL_SEGMENTS, CONFORMAL_MIN_SEGMENT_SIZE
+)
+from models.features import decode_one_hot
+from models.model_loader import register_model_cache
+from utils.metrics import cache_metrics
+
+
+def _level_key(confidence: float) -> str:
+    """Format a confidence level as a stable table key"""
+    return f"{confidence:.2f}"
+
+
+def _residual_quantiles(abs_residuals: np.ndarray, levels: Iterable[float]) -> Dict[str, float]:
+    """
+    Compute split-conformal quantiles of absolute residuals
+
+    Uses the finite-sample corrected rank ceil((n + 1) * level), which gives
+    marginal coverage of at least `level` on exchangeable data.
+    """
+    sorted_res = np.sort(abs_residuals)
+    n = len(sorted_res)
+    quantiles = {}
+
+    for level in levels:
+        rank = math.ceil((n + 1) * level)
+        quantiles[_level_key(level)] = float(sorted_res[rank - 1]) if rank <= n else math.inf
+
+    return quantiles
+
+
+def build_conformal_table(models: Dict[str, Any], X_cal: pd.DataFrame, y_cal,
+                          segments=CONFORMAL_SEGMENTS, levels=CONFIDENCE_LEVELS,
+                          min_segment_size: int = CONFORMAL_MIN_SEGMENT_SIZE) -> Dict[str, Any]:
+    """
+    Build the residual quantile lookup table from a calibration split
+
+    Args:
+        models: Dict mapping model names to fitted models
+        X_cal: One-hot encoded calibration features (not used for training)
+        y_cal: Calibration targets
+        segments: Categorical columns to compute per-segment quantiles for
+        levels: Confidence levels to store
+        min_segment_size: Segments smaller than this fall back to the global quantile
+
+    Returns:
+        Nested dict: models -> {global, segments -> column -> category}
+    """
+    y_true = y_cal.iloc[:, 0].values if isinstance(y_cal, pd.DataFrame) else np.asarray(y_cal)
+    segment_values = {col: decode_one_hot(X_cal, col).values for col in segments}
+
+    table = {
+        'levels': [_level_key(level) for level in levels],
+        'calibration_size': int(len(y_true)),
+        'models': {}
+    }
+
+    for model_name, model in models.items():
+        abs_residuals = np.abs(y_true - model.predict(X_cal))
+
+        entry = {
+            'global': {'n': int(len(abs_residuals)), 'q': _residual_quantiles(abs_residuals, levels)},
+            'segments': {}
+        }
+
+        for col, values in segment_values.items():
+            entry['segments'][col] = {}
+            for category in pd.unique(values):
+                mask = values == category
+                if mask.sum() < min_segment_size:
+                    continue
+                entry['segments'][col][str(category)] = {
+                    'n': int(mask.sum()),
+                    'q': _residual_quantiles(abs_residuals[mask], levels)
+                }
+
+        table['models'][model_name] = entry
+
+    return table
+
+
+def save_conformal_table(table: Dict[str, Any], path: str = CONFORMAL_TABLE_PATH) -> None:
+    """Write the table atomically so readers never see a partial file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(table, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+@register_model_cache
+@cache_metrics(st.cache_data)
+def load_conformal_table() -> Optional[Dict[str, Any]]:
+    """
+    Load the conformal residual table
+
+    Falls back to calibrating on the held-out test split when the
+    artifact has not been built yet.
+
+    Returns:
+        Table dict or None if it cannot be loaded or built
+    """
+    try:
+        if os.path.exists(CONFORMAL_TABLE_PATH):
+            with open(CONFORMAL_TABLE_PATH) as f:
+                return json.load(f)
+
+        from models.model_loader import load_models
+        from models.data_loader import load_train_test_data
+
+        models = load_models()
+        data = load_train_test_data()
+        if not models or 'X_test' not in data or 'y_test' not in data:
+            return None
+        return build_conformal_table(models, data['X_test'], data['y_test'])
+
+    except Exception as e:
+        st.error(f"❌ Error loading conformal table: {str(e)}")
+        return None
+
+
+def _segment_quantile(entry: Dict[str, Any], key: str, segment: Optional[Tuple[str, str]]) -> float:
+    """Return the segment quantile if calibrated, else the global one"""
+    if segment is not None:
+        col, category = segment
+        seg = entry['segments'].get(col, {}).get(str(category))
+        if seg is not None:
+            return seg['q'][key]
+    return entry['global']['q'][key]
+
+
+def lookup_interval(table: Dict[str, Any], model_name: str, prediction: float, confidence: float,
+                    segment: Optional[Tuple[str, str]] = None) -> Optional[Tuple[float, float]]:
+    """
+    Look up the prediction interval for a single point prediction
+
+    Args:
+        table: Conformal table from load_conformal_table
+        model_name: Model the prediction came from
+        prediction: Point prediction
+        confidence: Confidence level (must be one of the table levels)
+        segment: Optional (column, category) pair, e.g. ('Crop', 'Rice')
+
+    Returns:
+        (lower, upper) or None if the model/level is not calibrated
+    """
+    entry = table['models'].get(model_name)
+    key = _level_key(confidence)
+    if entry is None or key not in table['levels']:
+        return None
+
+    q = _segment_quantile(entry, key, segment)
+    return prediction - q, prediction + q
+
+
+def apply_intervals(table: Dict[str, Any], model_name: str, predictions: np.ndarray,
+                    confidence: float, segment_col: Optional[str] = None,
+                    segment_values=None) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Vectorized interval lookup for a batch of predictions
+
+    Args:
+        table: Conformal table from load_conformal_table
+        model_name: Model the predictions came from
+        predictions: Point predictions
+        confidence: Confidence level (must be one of the table levels)
+        segment_col: Optional segment column, e.g. 'Crop'
+        segment_values: Category per row for segment_col
+
+    Returns:
+        (lower, upper) arrays or None if the model/level is not calibrated
+    """
+    entry = table['models'].get(model_name)
+    key = _level_key(confidence)
+    if entry is None or key not in table['levels']:
+        return None
+
+    predictions = np.asarray(predictions, dtype=float)
+    global_q = entry['global']['q'][key]
+
+    if segment_col is not None and segment_values is not None:
+        seg_q = {cat: seg['q'][key] for cat, seg in entry['segments'].get(segment_col, {}).items()}
+        widths = (pd.Series(np.asarray(segment_values)).astype(str)
+                  .map(seg_q).fillna(global_q).values)
+    else:
+        widths = np.full(len(predictions), global_q)
+
+    return predictions - widths, predictions + widths
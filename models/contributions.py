@@ -0,0 +1,266 @@
+"""
+Exact per-row tree SHAP contributions for whole batches, in row chunks
+"""
+import math
+import numpy as np
+import pandas as pd
+import shap
+import streamlit as st
+import xgboost as xgb
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Get chunk size from config
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import CONTRIB_CHUNK_ROWS, CONTRIB_BLOCK_CELLS, CONTRIB_TABLE_MAX_CELLS
+from models.explain import iter_chunks
+from models.tree_ensemble import get_booster, parse_sklearn_tree
+from models.model_loader import register_model_cache
+from utils.metrics import CONTRIBUTION_SECONDS, cache_metrics
+
+BIAS_COLUMN = 'SHAP_Bias'
+TOP_INTERACTION_COLUMNS = ['Top_Interaction', 'Top_Interaction_Value']
+
+
+def contribution_columns(features: List[str]) -> List[str]:
+    """Output column of each feature's contribution, then the bias (expected value)"""
+    return [f"SHAP_{feature}" for feature in features] + [BIAS_COLUMN]
+
+
+def _leaf_table(value: float, ratios: np.ndarray) -> np.ndarray:
+    """
+    Path-dependent TreeSHAP contributions of one leaf for every bounds pattern
+
+    With M distinct features on the leaf's path, the leaf's share of the
+    prediction is a product game: feature f contributes 1[row within the
+    leaf's bounds on f] when known and its cover ratio along the path
+    otherwise. Its Shapley values depend on the row only through which of
+    the M bounds it satisfies (pattern bit k for path feature k); they are
+    summed over subsets by multiplying out prod (ratio + t) for the
+    satisfied features, one polynomial coefficient per subset size.
+
+    Returns:
+        (2^M, M) contributions, row = pattern
+    """
+    m = len(ratios)
+    inside = (np.arange(2 ** m)[:, None] >> np.arange(m)) & 1 == 1
+    weights = np.array([math.factorial(s) * math.factorial(m - s - 1) / math.factorial(m) for s in range(m)])
+    table = np.empty((len(inside), m))
+
+    for k in range(m):
+        coef = np.zeros((len(inside), m))
+        coef[:, 0] = 1.0
+        for f in range(m):
+            if f == k:
+                continue
+            shifted = np.zeros_like(coef)
+            shifted[:, 1:] = coef[:, :-1]
+            coef = ratios[f] * coef + np.where(inside[:, f:f + 1], shifted, 0.0)
+        total = coef @ weights
+        table[:, k] = value * np.where(inside[:, k], (1.0 - ratios[k]) * total, -ratios[k] * total)
+    return table
+
+
+def build_path_tables(model: Any) -> Optional[Dict[str, Any]]:
+    """
+    Precompute the exact path-dependent TreeSHAP of a scikit-learn tree
+
+    Rows reaching the same leaf can have different SHAP values (every leaf
+    contributes, through the row's position on that leaf's path features),
+    so each leaf gets a table over its bounds patterns (see _leaf_table).
+    A row's contributions are then one bounds check per (leaf, path
+    feature) and one table row per leaf, vectorized over rows in
+    path_contributions. Leaves are grouped by path length so each group's
+    tables stack into one array.
+
+    Returns:
+        Dict with the bias (expected value), n_features and per path length
+        M a group: feature and lower/upper bounds (lower <= x < upper) of
+        every (leaf, path feature), the M pattern bit values, first table
+        row of each leaf, the stacked (rows, M) tables and the
+        column-to-feature matrix. None if the tables would exceed
+        CONTRIB_TABLE_MAX_CELLS (2^M rows per leaf).
+    """
+    parsed = parse_sklearn_tree(model)
+    tree = model.tree_
+    cover = tree.weighted_n_node_samples
+    n_features = len(parsed['feature_names'])
+
+    # Bounds and cover ratio product of every feature on the path to a node
+    leaves, stack = [], [(0, {})]
+    while stack:
+        node, bounds = stack.pop()
+        if parsed['is_leaf'][0, node]:
+            leaves.append((float(tree.value[node, 0, 0]), bounds))
+            continue
+        f, thr = int(parsed['feature'][0, node]), parsed['threshold'][0, node]
+        lower, upper, ratio = bounds.get(f, (-np.inf, np.inf, 1.0))
+        for child, child_bounds in ((tree.children_left[node], (lower, min(upper, thr))),
+                                    (tree.children_right[node], (max(lower, thr), upper))):
+            stack.append((child, {**bounds, f: (*child_bounds, ratio * cover[child] / cover[node])}))
+
+    if sum(2 ** len(bounds) * len(bounds) for _, bounds in leaves) > CONTRIB_TABLE_MAX_CELLS:
+        return None
+
+    bias, by_length = 0.0, {}
+    for value, bounds in leaves:
+        bias += value * float(np.prod([b[2] for b in bounds.values()]))
+        if bounds:
+            by_length.setdefault(len(bounds), []).append((value, bounds))
+
+    groups = []
+    for m, group in sorted(by_length.items()):
+        features = [sorted(bounds) for _, bounds in group]
+        feature = np.array(features, dtype=np.int64).ravel()
+        bounds = np.array([[bounds[f][:2] for f in fs] for (_, bounds), fs in zip(group, features)]).reshape(-1, 2)
+        tables = [_leaf_table(value, np.array([b[f][2] for f in fs])) for (value, b), fs in zip(group, features)]
+        groups.append({
+            'feature': feature,
+            'lower': bounds[:, 0].astype(np.float32),
+            'upper': bounds[:, 1].astype(np.float32),
+            'bits': (2.0 ** np.arange(m)).astype(np.float32),
+            'offset': np.arange(len(group), dtype=np.int64) * 2 ** m,
+            'table': np.concatenate(tables).astype(np.float32),
+            'onehot': (feature[:, None] == np.arange(n_features)).astype(np.float32)
+        })
+    return {'groups': groups, 'n_features': n_features, 'bias': bias}
+
+
+@register_model_cache
+@cache_metrics(st.cache_resource)
+def load_path_tables(model_name: str = 'Decision Tree') -> Optional[Dict[str, Any]]:
+    """
+    Path tables (see build_path_tables) of a scikit-learn tree model, once per model version
+
+    Returns:
+        Tables or None if the model is unavailable, not a scikit-learn tree
+        or too deep for tables
+    """
+    from models.model_loader import load_models
+
+    model = load_models().get(model_name)
+    if model is None or not hasattr(model, 'tree_'):
+        return None
+    try:
+        return build_path_tables(model)
+    except Exception as e:
+        st.error(f"❌ Error building {model_name} SHAP tables: {str(e)}")
+        return None
+
+
+def path_contributions(tables: Dict[str, Any], X: np.ndarray) -> np.ndarray:
+    """
+    Exact path-dependent TreeSHAP of every row from the path tables
+
+    Each leaf's bounds pattern is summed from its in-bounds bits and picks
+    that leaf's table row. Rows are processed in blocks of
+    CONTRIB_BLOCK_CELLS (row, leaf path feature) cells.
+
+    Returns:
+        (n_rows, n_features + 1) contributions, bias last
+    """
+    out = np.zeros((len(X), tables['n_features'] + 1))
+    out[:, -1] = tables['bias']
+    cells = sum(len(group['feature']) for group in tables['groups'])
+
+    step = max(1, CONTRIB_BLOCK_CELLS // max(cells, 1))
+    for start in range(0, len(X), step):
+        block = X[start:start + step]
+        for group in tables['groups']:
+            m = group['table'].shape[1]
+            values = block[:, group['feature']]
+            inside = ((values >= group['lower']) & (values < group['upper'])).reshape(len(block), -1, m)
+            patterns = (inside.astype(np.float32) @ group['bits']).astype(np.int64)
+            rows = np.take(group['table'], patterns + group['offset'], axis=0)
+            out[start:start + step, :-1] += rows.reshape(len(block), -1) @ group['onehot']
+    return out
+
+
+def _booster_explainer(model: Any, model_name: str) -> Callable:
+    """Chunk explainer of an XGBoost model: the booster's own pred_contribs / pred_interactions"""
+    booster = get_booster(model)
+
+    def explain(X: pd.DataFrame, interactions: bool) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        dmatrix = xgb.DMatrix(X)
+        if interactions:
+            # Rows of the interaction matrix sum to the contributions: one pass gives both
+            pairs = booster.predict(dmatrix, pred_interactions=True)
+            return pairs.sum(axis=2), pairs
+        return booster.predict(dmatrix, pred_contribs=True), None
+    return explain
+
+
+def _tree_explainer(model: Any, model_name: str) -> Callable:
+    """
+    Chunk explainer of a scikit-learn tree: path-dependent TreeSHAP
+
+    The same exact algorithm as XGBoost's pred_contribs. Contributions come
+    from the tree's precomputed path tables (see build_path_tables);
+    interaction values, and contributions of trees without tables, from
+    shap's TreeExplainer.
+    """
+    tables = load_path_tables(model_name)
+    explainer = shap.TreeExplainer(model, feature_perturbation='tree_path_dependent')
+    bias = float(np.ravel(explainer.expected_value)[0])
+
+    def explain(X: pd.DataFrame, interactions: bool) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        rows, features = X.shape
+        if interactions:
+            pairs = np.zeros((rows, features + 1, features + 1))
+            pairs[:, :features, :features] = explainer.shap_interaction_values(X)
+            pairs[:, features, features] = bias
+            return pairs.sum(axis=2), pairs
+        if tables is not None:
+            return path_contributions(tables, X.to_numpy()), None
+        values = explainer.shap_values(X, check_additivity=False)
+        return np.column_stack([values, np.full(rows, bias)]), None
+    return explain
+
+
+def _top_interactions(pairs: np.ndarray, features: List[str]) -> pd.DataFrame:
+    """Strongest feature pair of each row (both off-diagonal halves summed) and its value"""
+    first, second = np.triu_indices(len(features), k=1)
+    values = 2 * pairs[:, first, second]
+    best = np.abs(values).argmax(axis=1)
+    names = np.array([f"{features[a]} × {features[b]}" for a, b in zip(first, second)])
+    return pd.DataFrame({
+        TOP_INTERACTION_COLUMNS[0]: names[best],
+        TOP_INTERACTION_COLUMNS[1]: values[np.arange(len(values)), best]
+    })
+
+
+def iter_contributions(model: Any, model_name: str, X: pd.DataFrame, interactions: bool = False,
+                       chunk_rows: int = CONTRIB_CHUNK_ROWS) -> Iterator[Tuple[int, int, pd.DataFrame]]:
+    """
+    Per-row SHAP contributions of every row, one chunk of rows at a time
+
+    Only one chunk's contributions (and interaction matrices) are held at
+    once, so the caller can stream them to the output next to the
+    predictions. Each row's contributions sum to its prediction.
+
+    Args:
+        model: XGBoost model or scikit-learn tree
+        model_name: Name in load_models (keys the tree's path tables) and
+            label for cropyield_contribution_seconds
+        X: Encoded features in the training column order
+        interactions: Also compute SHAP interaction values and add each
+            row's strongest pair (TOP_INTERACTION_COLUMNS)
+        chunk_rows: Rows per chunk
+
+    Yields:
+        (start, end, contributions) with contributions indexed 0..end-start-1
+        in contribution_columns order
+    """
+    features = list(X.columns)
+    columns = contribution_columns(features)
+    make = _booster_explainer if hasattr(model, 'get_booster') else _tree_explainer
+    explain = make(model, model_name)
+
+    for start, end in iter_chunks(len(X), chunk_rows):
+        with CONTRIBUTION_SECONDS.time(model_name):
+            contributions, pairs = explain(X.iloc[start:end].astype(np.float32), interactions)
+            frame = pd.DataFrame(contributions, columns=columns)
+            if pairs is not None:
+                frame = pd.concat([frame, _top_interactions(pairs, features)], axis=1)
+        yield start, end, frame
@@ -0,0 +1,327 @@
+"""
+Tree-structure-aware counterfactual search
+"""
+import os
+import heapq
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Any, Dict, Iterable, List, Optional
+
+
+# Get feature and search settings from config
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import (
+    BASELINE_CATEGORIES, BOOLEAN_COLS, CATEGORICAL_COLS, NUMERIC_COLS, INTEGER_COLS,
+    COUNTERFACTUAL_SWITCH_COST, COUNTERFACTUAL_MAX_RESULTS, COUNTERFACTUAL_MAX_EVALUATIONS
+)
+from models.features import decode_features
+from models.tree_ensemble import parse_model, leaf_boxes
+from models.model_loader import register_model_cache
+from utils.metrics import cache_metrics
+
+
+def build_counterfactual_space(model: Any, X_train: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Precompute the leaf boxes and per-feature split thresholds of a model
+
+    The prediction is constant between consecutive split thresholds of every
+    feature, so these thresholds are the only places worth moving an input to.
+
+    Args:
+        model: Fitted XGBoost model or scikit-learn tree
+        X_train: One-hot encoded training features (sets scales and ranges)
+
+    Returns:
+        Search space dict consumed by find_counterfactuals
+    """
+    parsed = parse_model(model)
+    boxes = leaf_boxes(parsed)
+    columns = list(X_train.columns)
+
+    thresholds = {}
+    for col in NUMERIC_COLS:
+        if col not in columns:
+            continue
+        f = columns.index(col)
+        split = (~parsed['is_leaf']) & (parsed['feature'] == f)
+        thresholds[col] = np.unique(parsed['threshold'][split]).astype(np.float64)
+
+    numeric = X_train[[c for c in NUMERIC_COLS if c in columns]].astype(float)
+    std = numeric.std().replace(0, 1.0)
+
+    return {
+        'columns': columns,
+        'boxes': boxes,
+        'tree_starts': np.flatnonzero(np.r_[True, np.diff(boxes['tree']) != 0]),
+        'base_score': parsed['base_score'],
+        'thresholds': thresholds,
+        'scale': std.to_dict(),
+        'min': numeric.min().to_dict(),
+        'max': numeric.max().to_dict(),
+        'categories': {
+            col: [BASELINE_CATEGORIES[col]] + [c[len(col) + 1:] for c in columns if c.startswith(f"{col}_")]
+            for col in CATEGORICAL_COLS
+        }
+    }
+
+
+@register_model_cache
+@cache_metrics(st.cache_resource)
+def load_counterfactual_space(model_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Build the counterfactual search space for a model once per process
+
+    Args:
+        model_name: Name of a model returned by load_models
+
+    Returns:
+        Search space dict or None if the model or training split is unavailable
+    """
+    from models.model_loader import load_models
+    from models.data_loader import load_train_test_data
+
+    model = load_models().get(model_name)
+    data = load_train_test_data()
+    if model is None or 'X_train' not in data:
+        return None
+
+    try:
+        return build_counterfactual_space(model, data['X_train'])
+    except Exception as e:
+        st.error(f"❌ Error reading {model_name} tree structure: {str(e)}")
+        return None
+
+
+def _point_mask(boxes: Dict[str, np.ndarray], f: int, value: float) -> np.ndarray:
+    """Leaves whose box contains `value` on feature f"""
+    return (boxes['lower'][:, f] <= value) & (value < boxes['upper'][:, f])
+
+
+def _interval_mask(boxes: Dict[str, np.ndarray], f: int, lower: float, upper: float) -> np.ndarray:
+    """Leaves whose box overlaps [lower, upper) on feature f"""
+    return (np.maximum(boxes['lower'][:, f], lower) < np.minimum(boxes['upper'][:, f], upper))
+
+
+def _numeric_options(space: Dict[str, Any], col: int, name: str, x: float):
+    """
+    One option per threshold interval of a numeric feature
+
+    Each option moves x to the nearest point of its interval that XGBoost's
+    float32 "x < threshold" comparison places inside it.
+    """
+    boxes = space['boxes']
+    lo = min(space['min'][name], x)
+    hi = max(space['max'][name], x)
+    cuts = space['thresholds'].get(name, np.empty(0))
+    edges = np.concatenate([[-np.inf], cuts[(cuts > lo) & (cuts <= hi)], [np.inf]])
+    is_int = name in INTEGER_COLS
+
+    options = []
+    for a, b in zip(edges[:-1], edges[1:]):
+        first = max(a, lo)
+        last = min(float(np.nextafter(np.float32(b), np.float32(-np.inf))), hi)
+        if is_int:
+            first, last = np.ceil(first), np.floor(last)
+        if first > last:
+            continue
+
+        value = float(min(max(x, first), last))
+        options.append({
+            'value': value,
+            'cost': abs(value - x) / space['scale'][name],
+            'mask': _interval_mask(boxes, col, a, b)
+        })
+    return options
+
+
+def _variables(space: Dict[str, Any], current: pd.Series, encoded: np.ndarray,
+               fixed: Iterable[str]):
+    """
+    Decision variables in raw-feature terms, each with its candidate options
+
+    Fixed features get a single zero-cost option so every variable still
+    pins down its columns.
+    """
+    columns, boxes = space['columns'], space['boxes']
+    fixed = set(fixed)
+    variables = []
+
+    for name in CATEGORICAL_COLS:
+        dummies = [(columns.index(f"{name}_{c}"), c) for c in space['categories'][name]
+                   if f"{name}_{c}" in columns]
+        options = []
+        for category in space['categories'][name]:
+            if name in fixed and category != current[name]:
+                continue
+            mask = np.ones(len(boxes['tree']), dtype=bool)
+            for f, c in dummies:
+                mask &= _point_mask(boxes, f, 1.0 if c == category else 0.0)
+            cost = 0.0 if category == current[name] else COUNTERFACTUAL_SWITCH_COST
+            options.append({'value': category, 'cost': cost, 'mask': mask})
+        variables.append((name, options))
+
+    for name in BOOLEAN_COLS:
+        if name not in columns:
+            continue
+        f = columns.index(name)
+        values = [bool(current[name])] if name in fixed else [False, True]
+        variables.append((name, [{
+            'value': v,
+            'cost': 0.0 if v == bool(current[name]) else COUNTERFACTUAL_SWITCH_COST,
+            'mask': _point_mask(boxes, f, float(v))
+        } for v in values]))
+
+    for name in NUMERIC_COLS:
+        if name not in columns:
+            continue
+        f = columns.index(name)
+        x = float(encoded[f])
+        if name in fixed:
+            options = [{'value': x, 'cost': 0.0, 'mask': _point_mask(boxes, f, x)}]
+        else:
+            options = _numeric_options(space, f, name, x)
+        variables.append((name, options))
+
+    return variables
+
+
+def _format_value(value) -> str:
+    """Short display form of a raw feature value"""
+    if isinstance(value, (float, np.floating)) and not float(value).is_integer():
+        return f"{value:.2f}"
+    return str(value)
+
+
+def _is_minimal(variables, choices, bound, goal: float) -> bool:
+    """True if undoing any single change of a complete assignment misses the goal"""
+    masks = [variables[d][1][i]['mask'] for d, i in enumerate(choices)]
+    for d, i in enumerate(choices):
+        if i == 0:
+            continue
+        # Option 0 is the zero-cost one, i.e. the feature's current value
+        reverted = variables[d][1][0]['mask'].copy()
+        for e, mask in enumerate(masks):
+            if e != d:
+                reverted &= mask
+        if bound(reverted) >= goal:
+            return False
+    return True
+
+
+def find_counterfactuals(space: Dict[str, Any], features: pd.DataFrame, target: float,
+                         fixed: Iterable[str] = (), max_results: int = COUNTERFACTUAL_MAX_RESULTS,
+                         max_evaluations: int = COUNTERFACTUAL_MAX_EVALUATIONS) -> pd.DataFrame:
+    """
+    Lowest-cost input changes that bring the prediction to a target
+
+    Every feature is restricted to the intervals between the model's split
+    thresholds, so the search is exact and deterministic. Partial assignments
+    are expanded cheapest first and dropped as soon as the best (or worst,
+    for a lower target) reachable leaf of every tree cannot reach the target.
+    The first complete assignments popped are therefore the cheapest ones.
+    Only the cheapest result per set of changed features is kept, and only
+    if none of its changes can be undone while still reaching the target, so
+    each row suggests a different, irreducible combination of changes.
+
+    Args:
+        space: Search space from load_counterfactual_space
+        features: One encoded input row aligned to the training columns
+        target: Yield to reach (at least it if above the current prediction,
+            at most it if below)
+        fixed: Raw feature names the user cannot change
+        max_results: Number of counterfactuals to return
+        max_evaluations: Search budget in evaluated partial assignments
+
+    Returns:
+        DataFrame in raw feature layout with Predicted_Yield, Cost and
+        Changes columns, cheapest first (empty if the target is unreachable)
+    """
+    boxes = space['boxes']
+    encoded = features.iloc[0].to_numpy(dtype=np.float64)
+    current = decode_features(features).iloc[0]
+
+    variables = _variables(space, current, encoded, fixed)
+
+    root = np.ones(len(boxes['tree']), dtype=bool)
+    for f, value in enumerate(encoded):
+        root &= _point_mask(boxes, f, value)
+    prediction = space['base_score'] + boxes['value'][root].sum()
+    raise_yield = target >= prediction
+
+    values = boxes['value'] if raise_yield else -boxes['value']
+    starts = space['tree_starts']
+
+    def bound(mask):
+        # Best achievable (negated when lowering) sum of per-tree leaf values
+        return np.maximum.reduceat(np.where(mask, values, -np.inf), starts).sum()
+
+    goal = (target - space['base_score']) * (1 if raise_yield else -1)
+
+    # Branch on the features that can move the prediction most first so the
+    # bounds tighten early; options are tried cheapest first
+    variables.sort(key=lambda v: -np.ptp([bound(o['mask']) for o in v[1]]))
+    for _, options in variables:
+        options.sort(key=lambda o: o['cost'])
+
+    solutions: List[Dict[str, Any]] = []
+    changed_sets = set()
+
+    # Entries are (cost, tie, depth, option, parent mask, parent cost, choices)
+    # where choices holds option indices: a node's children are generated
+    # lazily, one sibling at a time, so each pop costs one bound evaluation
+    full = np.ones(len(boxes['tree']), dtype=bool)
+    heap = [(variables[0][1][0]['cost'], 0, 0, 0, full, 0.0, ())] if variables else []
+    counter, evaluations = 1, 0
+
+    while heap and len(solutions) < max_results and evaluations < max_evaluations:
+        cost, _, depth, i, parent, parent_cost, choices = heapq.heappop(heap)
+        options = variables[depth][1]
+        evaluations += 1
+
+        if i + 1 < len(options):
+            heapq.heappush(heap, (parent_cost + options[i + 1]['cost'], counter, depth, i + 1,
+                                  parent, parent_cost, choices))
+            counter += 1
+
+        mask = parent & options[i]['mask']
+        total = bound(mask)
+        if total < goal:
+            continue
+        choices = choices + (i,)
+
+        if depth + 1 < len(variables):
+            heapq.heappush(heap, (cost + variables[depth + 1][1][0]['cost'], counter, depth + 1, 0,
+                                  mask, cost, choices))
+            counter += 1
+            continue
+
+        # Complete assignment: every tree has a single reachable leaf
+        changed = frozenset(variables[d][0] for d, i in enumerate(choices) if i > 0)
+        if changed in changed_sets or not _is_minimal(variables, choices, bound, goal):
+            continue
+        changed_sets.add(changed)
+        solutions.append({'choices': choices, 'cost': cost, 'total': total})
+
+    rows = []
+    sign = 1 if raise_yield else -1
+    for solution in solutions:
+        row = current.to_dict()
+        changes = []
+        for (name, options), i in zip(variables, solution['choices']):
+            if i == 0:
+                continue
+            value = options[i]['value']
+            if name in INTEGER_COLS:
+                value = int(value)
+            row[name] = value
+            changes.append(f"{name}: {_format_value(current[name])} → {_format_value(value)}")
+
+        row['Predicted_Yield'] = space['base_score'] + sign * solution['total']
+        row['Cost'] = solution['cost']
+        row['Changes'] = '; '.join(changes) or 'No change'
+        rows.append(row)
+
+    columns = list(current.index) + ['Predicted_Yield', 'Cost', 'Changes']
+    return pd.DataFrame(rows, columns=columns)
@@ -0,0 +1,240 @@
+"""
+Yield cube: yield aggregates pre-computed for every combination of categorical values
+"""
+import os
+import json
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Get paths and cube settings from config
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import DATASET_PATH, CUBE_PATH, CUBE_DIMENSIONS, TARGET_COL
+from models.data_loader import get_data_version
+from models.splitting import append_marker, read_appended
+from utils.metrics import cache_metrics
+from utils.profiling import timed
+
+
+# Measures kept per cell, along the last axis of the cells array
+MEASURES = ('count', 'sum', 'squares')
+
+# Position of the "any value" slot on every dimension axis
+ALL = -1
+
+
+def _aggregate(df: pd.DataFrame, dimensions: List[str], levels: List[List[str]]) -> np.ndarray:
+    """
+    Count, sum and sum of squares of the target per combination of levels
+
+    Rows missing the target or a dimension value are left out.
+
+    Returns:
+        Array of shape (len(levels[0]), ..., len(levels[-1]), 3)
+    """
+    shape = tuple(len(values) for values in levels)
+    codes = [pd.Categorical(df[dim].astype(str).where(df[dim].notna()), categories=values).codes
+             for dim, values in zip(dimensions, levels)]
+    target = df[TARGET_COL].to_numpy(dtype=np.float64)
+    keep = ~np.isnan(target)
+    for c in codes:
+        keep &= c >= 0
+
+    flat = np.ravel_multi_index([c[keep] for c in codes], shape)
+    size = int(np.prod(shape))
+    y = target[keep]
+    base = np.stack([
+        np.bincount(flat, minlength=size).astype(np.float64),
+        np.bincount(flat, weights=y, minlength=size),
+        np.bincount(flat, weights=y * y, minlength=size)
+    ], axis=-1)
+    return base.reshape(shape + (len(MEASURES),))
+
+
+def _roll_up(base: np.ndarray) -> np.ndarray:
+    """
+    Add an "any value" slot to every dimension axis
+
+    Rolling up one axis after the other fills in the totals for every
+    subset of dimensions (2^d cuboids) from the finest one.
+    """
+    dims = base.ndim - 1
+    cells = np.zeros(tuple(n + 1 for n in base.shape[:-1]) + base.shape[-1:])
+    cells[tuple(slice(0, n) for n in base.shape[:-1])] = base
+    for axis in range(dims):
+        values = [slice(None)] * dims
+        values[axis] = slice(0, -1)
+        total = [slice(None)] * dims
+        total[axis] = ALL
+        cells[tuple(total)] = cells[tuple(values)].sum(axis=axis)
+    return cells
+
+
+def build_cube(df: pd.DataFrame, dimensions: List[str] = CUBE_DIMENSIONS) -> Dict[str, Any]:
+    """
+    Aggregate the target over every combination of the dimension columns
+
+    Returns:
+        Cube dict: dimensions, levels (values of each dimension as strings)
+        and cells, an array with one axis per dimension (the last slot of
+        each being "any value") and count/sum/sum of squares on the last axis
+    """
+    levels = [sorted(df[dim].dropna().astype(str).unique()) for dim in dimensions]
+    return {
+        'dimensions': list(dimensions),
+        'levels': levels,
+        'cells': _roll_up(_aggregate(df, dimensions, levels))
+    }
+
+
+def merge_cube(cube: Dict[str, Any], new_rows: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    """
+    Add appended rows to a cube
+
+    Every cell is a sum, so the rolled up new rows are simply added; new
+    dimension values get an empty slot first.
+
+    Returns:
+        Updated cube, or None if the rows lack a dimension or the target
+    """
+    dimensions = cube['dimensions']
+    if any(col not in new_rows.columns for col in dimensions + [TARGET_COL]):
+        return None
+
+    levels = [list(values) for values in cube['levels']]
+    cells = cube['cells']
+    for axis, dim in enumerate(dimensions):
+        known = set(levels[axis])
+        added = sorted(set(new_rows[dim].dropna().astype(str)) - known)
+        if added:
+            cells = np.insert(cells, [len(levels[axis])] * len(added), 0.0, axis=axis)
+            levels[axis] += added
+
+    return {**cube, 'levels': levels, 'cells': cells + _roll_up(_aggregate(new_rows, dimensions, levels))}
+
+
+def save_cube(cube: Dict[str, Any], path: str = CUBE_PATH) -> None:
+    """Persist the cube atomically (cells as an array, the rest as JSON)"""
+    meta = {k: v for k, v in cube.items() if k != 'cells'}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, cells=cube['cells'], meta=np.array(json.dumps(meta)))
+    os.replace(tmp_path, path)
+
+
+def _read_cube(path: str) -> Dict[str, Any]:
+    with np.load(path, allow_pickle=False) as data:
+        return {**json.loads(str(data['meta'])), 'cells': data['cells']}
+
+
+def refresh_cube(source: str = DATASET_PATH, path: str = CUBE_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Cube of the current dataset, updating the saved artifact as needed
+
+    Reused while the data version is unchanged, extended with just the new
+    rows when the dataset has only been appended to, rebuilt otherwise.
+
+    Returns:
+        Cube dict or None if the dataset does not exist
+    """
+    version = get_data_version(source)
+    if version is None:
+        return None
+
+    cube = None
+    if os.path.exists(path):
+        cube = _read_cube(path)
+        if cube.get('data_version') == version and cube['dimensions'] == CUBE_DIMENSIONS:
+            return cube
+
+    new_rows = None
+    if cube is not None and cube['dimensions'] == CUBE_DIMENSIONS:
+        new_rows = read_appended(source, cube)
+    merged = merge_cube(cube, new_rows) if new_rows is not None else None
+    if merged is None:
+        merged = build_cube(pd.read_csv(source, sep=';', decimal=','))
+
+    merged.update({'data_version': version, **append_marker(source)})
+    save_cube(merged, path)
+    return merged
+
+
+@cache_metrics(st.cache_resource)
+@timed()
+def _load_cube(version: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Cube for a data version (cached; the version is the cache key)"""
+    try:
+        return refresh_cube()
+    except Exception as e:
+        st.error(f"❌ Error building yield cube: {str(e)}")
+        return None
+
+
+def load_yield_cube() -> Optional[Dict[str, Any]]:
+    """
+    Load the yield cube for the current data version
+
+    Returns:
+        Cube dict (see build_cube) or None if the dataset is unavailable
+    """
+    return _load_cube(get_data_version())
+
+
+def _position(cube: Dict[str, Any], filters: Dict[str, Any]) -> Optional[Tuple[int, ...]]:
+    """Cell index for dimension -> value filters (None = any), or None for an unknown value"""
+    index = []
+    for dim, values in zip(cube['dimensions'], cube['levels']):
+        value = filters.get(dim)
+        if value is None:
+            index.append(ALL)
+        elif str(value) in values:
+            index.append(values.index(str(value)))
+        else:
+            return None
+    return tuple(index)
+
+
+def _summarize(count: np.ndarray, total: np.ndarray, squares: np.ndarray) -> Tuple[np.ndarray, ...]:
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        std = np.sqrt(np.maximum(squares - total * mean, 0.0) / (count - 1))
+    return count.astype(np.int64), mean, np.where(count > 1, std, np.nan)
+
+
+def cube_cell(cube: Dict[str, Any], filters: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Yield count, mean and standard deviation of the rows matching the filters
+
+    Args:
+        cube: Cube from load_yield_cube
+        filters: Dimension -> value; dimensions left out (or None) match any value
+    """
+    index = _position(cube, filters)
+    cell = cube['cells'][index] if index is not None else np.zeros(len(MEASURES))
+    count, mean, std = _summarize(*cell)
+    return {'count': int(count), 'mean': float(mean), 'std': float(std)}
+
+
+def cube_breakdown(cube: Dict[str, Any], dimension: str, filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """
+    Yield statistics per value of one dimension, within the filtered rows
+
+    Returns:
+        DataFrame indexed by the dimension's values (those with rows only)
+        with count, mean and std columns, highest mean first
+    """
+    index = _position(cube, {**(filters or {}), dimension: None})
+    axis = cube['dimensions'].index(dimension)
+    values = cube['levels'][axis]
+    if index is None:
+        return pd.DataFrame(columns=['count', 'mean', 'std'], index=pd.Index([], name=dimension))
+
+    selection = list(index)
+    selection[axis] = slice(0, len(values))
+    cells = cube['cells'][tuple(selection)]
+    count, mean, std = _summarize(cells[:, 0], cells[:, 1], cells[:, 2])
+    result = pd.DataFrame({'count': count, 'mean': mean, 'std': std}, index=pd.Index(values, name=dimension))
+    return result[result['count'] > 0].sort_values('mean', ascending=False)
@@ -4,7 +4,7 @@ Data loading utilities
 import os
 import pandas as pd
 import streamlit as st
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 
 # Get paths from config
@@ -14,16 +14,43 @@ from config.settings import (
     DATASET_PATH, X_TRAIN_PATH, X_TEST_PATH, 
     Y_TRAIN_PATH, Y_TEST_PATH, METRICS_PATH
 )
+from utils.profiling import timed
+from utils.metrics import cache_metrics
+
+
+def get_data_version(path: str = DATASET_PATH) -> Optional[str]:
+    """
+    Cheap identifier of a data file's current contents
+    
+    Built from size and modification time, so derived artifacts can tell
+    when they are stale without rereading the file.
+    
+    Returns:
+        Version string or None if the file does not exist
+    """
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
 
 
-@st.cache_data
 def load_dataset() -> Optional[pd.DataFrame]:
     """
     Load the main dataset
     
+    Cached per file version, so records appended to the dataset (e.g. by
+    scripts/update_model.py --append) are picked up on the next call.
+    
     Returns:
         DataFrame or None if file not found
     """
+    return _load_dataset(get_data_version(DATASET_PATH))
+
+
+@cache_metrics(st.cache_data(max_entries=1))
+@timed('load_dataset (cache miss)')
+def _load_dataset(version: Optional[str]) -> Optional[pd.DataFrame]:
+    """Read the main dataset (cached per file version)"""
     try:
         if os.path.exists(DATASET_PATH):
             # CSV uses semicolon as separator and comma as decimal
@@ -37,14 +64,28 @@ def load_dataset() -> Optional[pd.DataFrame]:
         return None
 
 
-@st.cache_data
+def get_split_versions() -> Tuple:
+    """File version of each train/test split file"""
+    return tuple(get_data_version(path) for path in (X_TRAIN_PATH, X_TEST_PATH, Y_TRAIN_PATH, Y_TEST_PATH))
+
+
 def load_train_test_data() -> Dict[str, pd.DataFrame]:
     """
     Load train/test split data
     
+    Cached per version of the split files, so rows appended to them are
+    picked up on the next call.
+    
     Returns:
         Dictionary with X_train, X_test, y_train, y_test DataFrames
     """
+    return _load_train_test_data(get_split_versions())
+
+
+@cache_metrics(st.cache_data(max_entries=1))
+@timed('load_train_test_data (cache miss)')
+def _load_train_test_data(versions: Tuple) -> Dict[str, pd.DataFrame]:
+    """Read the train/test split files (cached per file versions)"""
     data = {}
     
     try:
@@ -63,7 +104,8 @@ def load_train_test_data() -> Dict[str, pd.DataFrame]:
     return data
 
 
-@st.cache_data
+@cache_metrics(st.cache_data)
+@timed()
 def load_metrics() -> Optional[pd.DataFrame]:
     """
     Load model comparison metrics
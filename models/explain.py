@@ -0,0 +1,66 @@
+"""
+Chunked SHAP computation: explainers, row-block iteration and merging
+"""
+import numpy as np
+import pandas as pd
+import shap
+from typing import Iterator, List, Optional, Tuple
+
+# Get SHAP settings from config
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import SHAP_BACKGROUND_ROWS, SHAP_CHUNK_ROWS
+from utils.metrics import SHAP_SECONDS
+
+
+def background_sample(X_train: pd.DataFrame, random_state: Optional[int] = None) -> pd.DataFrame:
+    """Up to SHAP_BACKGROUND_ROWS training rows used as the explainer's background"""
+    return X_train.sample(min(SHAP_BACKGROUND_ROWS, len(X_train)), random_state=random_state)
+
+
+def make_explainer(model, background: pd.DataFrame):
+    """SHAP explainer of a model over numeric background rows"""
+    return shap.Explainer(model, background)
+
+
+def explain_rows(explainer, X: pd.DataFrame, model_label: str) -> shap.Explanation:
+    """SHAP values of a block of rows (timed in cropyield_shap_seconds)"""
+    with SHAP_SECONDS.time(model_label):
+        return explainer(X)
+
+
+def compute_shap_values(model, X_train: pd.DataFrame, X_sample: pd.DataFrame) -> shap.Explanation:
+    """
+    Explain a sample in one call in this process (used by the benchmark suite)
+
+    The background is up to SHAP_BACKGROUND_ROWS training rows drawn from
+    the global RNG; the app runs SHAP in the worker pool (models.shap_pool).
+    """
+    explainer = make_explainer(model, background_sample(X_train))
+    return explain_rows(explainer, X_sample, type(model).__name__)
+
+
+def iter_chunks(rows: int, chunk_rows: int = SHAP_CHUNK_ROWS, start: int = 0) -> Iterator[Tuple[int, int]]:
+    """(start, end) row ranges of consecutive blocks, from row `start` on"""
+    for begin in range(start, rows, chunk_rows):
+        yield begin, min(begin + chunk_rows, rows)
+
+
+def merge_explanations(chunks: List[shap.Explanation]) -> shap.Explanation:
+    """Concatenate the Explanations of consecutive row blocks"""
+    first = chunks[0]
+    if len(chunks) == 1:
+        return first
+    return shap.Explanation(
+        values=np.concatenate([c.values for c in chunks]),
+        base_values=np.concatenate([np.atleast_1d(c.base_values) for c in chunks]),
+        data=np.concatenate([c.data for c in chunks]),
+        feature_names=first.feature_names
+    )
+
+
+def mean_abs_importance(chunks: List[shap.Explanation]) -> np.ndarray:
+    """Mean |SHAP value| per feature over the rows explained so far"""
+    total = sum(np.abs(c.values).sum(axis=0) for c in chunks)
+    return total / sum(len(c.values) for c in chunks)
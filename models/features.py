@@ -0,0 +1,84 @@
+"""
+Feature encoding utilities
+"""
+import os
+import pandas as pd
+from typing import List
+
+
+# Get baseline categories from config
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import BASELINE_CATEGORIES, BOOLEAN_COLS, CATEGORICAL_COLS, FEATURE_NAMES
+
+
+def decode_one_hot(X: pd.DataFrame, prefix: str) -> pd.Series:
+    """
+    Recover a categorical column from its one-hot encoded columns
+    
+    Rows with no active dummy column belong to the category dropped
+    during encoding (see BASELINE_CATEGORIES).
+    
+    Args:
+        X: One-hot encoded feature frame
+        prefix: Original column name (e.g. 'Crop')
+        
+    Returns:
+        Series of category names aligned to X.index
+    """
+    dummy_cols: List[str] = [c for c in X.columns if c.startswith(f"{prefix}_")]
+    baseline = BASELINE_CATEGORIES.get(prefix)
+    
+    if not dummy_cols:
+        return pd.Series(baseline, index=X.index, dtype=object)
+    
+    dummies = X[dummy_cols].astype(bool)
+    decoded = dummies.idxmax(axis=1).str[len(prefix) + 1:]
+    return decoded.where(dummies.any(axis=1), baseline)
+
+
+def decode_features(X: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert one-hot encoded features back to the raw dataset layout
+    
+    Args:
+        X: One-hot encoded feature frame
+        
+    Returns:
+        DataFrame with FEATURE_NAMES columns (flags as bool)
+    """
+    raw = pd.DataFrame(index=X.index)
+    for col in FEATURE_NAMES:
+        if col in CATEGORICAL_COLS:
+            raw[col] = decode_one_hot(X, col)
+        elif col in BOOLEAN_COLS:
+            raw[col] = X[col].astype(bool)
+        else:
+            raw[col] = X[col]
+    return raw
+
+
+def encode_records(raw: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    One-hot encode raw records into a given training column layout
+    
+    Inverse of decode_features: categories without a column (the dropped
+    baseline) leave every dummy at zero, and unseen categories are ignored.
+    
+    Args:
+        raw: Records in the dataset layout (FEATURE_NAMES columns)
+        columns: Training column order (e.g. X_train.columns)
+        
+    Returns:
+        Encoded DataFrame with exactly `columns`
+    """
+    encoded = pd.DataFrame(index=raw.index)
+    for col in columns:
+        prefix = next((p for p in CATEGORICAL_COLS if col.startswith(f"{p}_")), None)
+        if prefix is not None:
+            encoded[col] = raw[prefix].astype(str) == col[len(prefix) + 1:]
+        elif col in BOOLEAN_COLS:
+            encoded[col] = raw[col].astype(bool).astype(int)
+        else:
+            encoded[col] = raw[col]
+    return encoded
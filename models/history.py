@@ -0,0 +1,216 @@
+"""
+Disk-backed prediction history: SQLite in WAL mode, written off the script thread
+"""
+import os
+import time
+import queue
+import atexit
+import logging
+import sqlite3
+import threading
+import pandas as pd
+from collections import deque
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Get paths and history settings from config
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import (
+    HISTORY_DB_PATH, HISTORY_RING_SIZE, HISTORY_BATCH_SIZE, HISTORY_FLUSH_SECONDS, HISTORY_PAGE_SIZE
+)
+
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('ts', 'session', 'model', 'crop', 'soil', 'weather', 'rainfall', 'temperature',
+           'fertilizer', 'irrigation', 'days', 'prediction', 'lower', 'upper')
+
+# Single-column indexes also order by rowid, so a filtered page in id
+# order is an index range scan
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    session TEXT,
+    model TEXT NOT NULL,
+    crop TEXT,
+    soil TEXT,
+    weather TEXT,
+    rainfall REAL,
+    temperature REAL,
+    fertilizer INTEGER,
+    irrigation INTEGER,
+    days INTEGER,
+    prediction REAL NOT NULL,
+    lower REAL,
+    upper REAL
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_ts ON predictions (ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_model ON predictions (model);
+CREATE INDEX IF NOT EXISTS idx_predictions_crop ON predictions (crop);
+CREATE INDEX IF NOT EXISTS idx_predictions_model_crop ON predictions (model, crop);
+CREATE INDEX IF NOT EXISTS idx_predictions_session ON predictions (session);
+"""
+
+_INSERT = f"INSERT INTO predictions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+# Filters accepted by count_history / read_page, as column -> value
+FILTER_COLUMNS = ('model', 'crop', 'session')
+
+
+def connect(path: str = HISTORY_DB_PATH) -> sqlite3.Connection:
+    """Open the history database, creating it in WAL mode if needed"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL makes NORMAL durable against application crashes; only an OS crash
+    # can lose the last commits
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class HistoryWriter:
+    """
+    Background writer batching inserts into one transaction
+
+    Rows are queued without touching the database; a daemon thread takes
+    the first queued row, lingers up to `flush_seconds` for more (at most
+    `batch_size`) and commits them together.
+    """
+
+    def __init__(self, path: str = HISTORY_DB_PATH, batch_size: int = HISTORY_BATCH_SIZE,
+                 flush_seconds: float = HISTORY_FLUSH_SECONDS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def put(self, row: Tuple) -> None:
+        """Queue one row (values in COLUMNS order)"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+                    self._thread.start()
+        self._queue.put(row)
+
+    def flush(self) -> None:
+        """Block until every queued row is committed"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _run(self) -> None:
+        conn = connect(self.path)
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    conn.executemany(_INSERT, batch)
+            except sqlite3.Error as e:
+                logger.error(f"Dropped {len(batch)} prediction history rows: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+_writers: Dict[str, HistoryWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(path: str = HISTORY_DB_PATH) -> HistoryWriter:
+    """Process-wide writer for a database (flushed at exit)"""
+    with _writers_lock:
+        if path not in _writers:
+            _writers[path] = HistoryWriter(path)
+        return _writers[path]
+
+
+@atexit.register
+def _flush_all() -> None:
+    for writer in list(_writers.values()):
+        writer.flush()
+
+
+def history_row(entry: Dict[str, Any], session: Optional[str], ts: float) -> Tuple:
+    """Database row for a history entry as kept in the session ring buffer"""
+    inputs = entry['inputs']
+    interval = entry.get('interval')
+    return (
+        ts, session, entry['model'], inputs['crop'], inputs['soil'], inputs['weather'],
+        float(inputs['rainfall']), float(inputs['temperature']), int(bool(inputs['fertilizer'])),
+        int(bool(inputs['irrigation'])), int(inputs['days']), float(entry['prediction']),
+        float(interval[0]) if interval is not None else None,
+        float(interval[1]) if interval is not None else None
+    )
+
+
+def record_prediction(state: Any, entry: Dict[str, Any], session: Optional[str],
+                      ring_size: int = HISTORY_RING_SIZE, path: str = HISTORY_DB_PATH) -> None:
+    """
+    Add a prediction to the session's recent history and queue it for the database
+
+    The session keeps only the latest `ring_size` entries (a deque under
+    'prediction_history'); the full history is in the database.
+    """
+    ring = state.get('prediction_history')
+    if not isinstance(ring, deque) or ring.maxlen != ring_size:
+        ring = deque(ring or [], maxlen=ring_size)
+        state['prediction_history'] = ring
+    ring.append(entry)
+    get_writer(path).put(history_row(entry, session, time.time()))
+
+
+def _where(filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+    clauses, params = [], []
+    for column in FILTER_COLUMNS:
+        if filters.get(column) is not None:
+            clauses.append(f"{column} = ?")
+            params.append(filters[column])
+    return clauses, params
+
+
+def count_history(filters: Dict[str, Any], path: str = HISTORY_DB_PATH) -> int:
+    """Number of stored predictions matching the filters"""
+    if not os.path.exists(path):
+        return 0
+    clauses, params = _where(filters)
+    sql = "SELECT COUNT(*) FROM predictions" + (f" WHERE {' AND '.join(clauses)}" if clauses else "")
+    with closing(connect(path)) as conn:
+        return conn.execute(sql, params).fetchone()[0]
+
+
+def read_page(filters: Dict[str, Any], before_id: Optional[int] = None, limit: int = HISTORY_PAGE_SIZE,
+              path: str = HISTORY_DB_PATH) -> pd.DataFrame:
+    """
+    One page of stored predictions, newest first
+
+    Keyset pagination: the next (older) page starts below the smallest id of
+    this one, so every page costs the same however deep it is.
+
+    Args:
+        filters: Column -> value for any of FILTER_COLUMNS (None = any)
+        before_id: Only rows with a smaller id (None for the newest page)
+        limit: Page size
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=('id',) + COLUMNS)
+    clauses, params = _where(filters)
+    if before_id is not None:
+        clauses.append("id < ?")
+        params.append(before_id)
+    sql = (f"SELECT id, {', '.join(COLUMNS)} FROM predictions"
+           + (f" WHERE {' AND '.join(clauses)}" if clauses else "")
+           + " ORDER BY id DESC LIMIT ?")
+    with closing(connect(path)) as conn:
+        return pd.read_sql_query(sql, conn, params=params + [limit])
@@ -2,29 +2,77 @@
 Model loading utilities
 """
 import os
+import time
 import pickle
 import joblib
 import streamlit as st
 import xgboost as xgb
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 # Get model paths from config
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 from config.settings import MODEL_PATHS
+from models.data_loader import get_data_version, load_metrics
+from utils.profiling import timed
+from utils.metrics import cache_metrics, observe_prediction, PREDICTION_ERRORS
 
 
-@st.cache_resource
+# Caches built from the loaded models, cleared when a model file changes
+_DEPENDENT_CACHES: List[Callable] = []
+_loaded_versions: Optional[Tuple] = None
+
+
+def register_model_cache(cached_func: Callable) -> Callable:
+    """
+    Register a cached function whose results derive from the loaded models
+    
+    Use as a decorator above the @cache_metrics(st.cache_*) loader so the
+    cache is cleared whenever load_models picks up a changed model file.
+    """
+    _DEPENDENT_CACHES.append(cached_func)
+    return cached_func
+
+
+# The metrics file is rewritten together with the models (the dataset and
+# split loaders are keyed on their own file versions)
+register_model_cache(load_metrics)
+
+
+def get_model_versions() -> Tuple:
+    """(model name, file version) pairs for every configured model file"""
+    return tuple((name, get_data_version(path)) for name, path in MODEL_PATHS.items())
+
+
+@timed()
 def load_models() -> Dict[str, Any]:
     """
     Load all trained models
     
+    Models are cached per model file version, so a model file swapped in
+    place (e.g. by scripts/update_model.py) is picked up on the next call.
+    
     Returns:
         Dict mapping model names to loaded model objects
     """
+    global _loaded_versions
+    
+    versions = get_model_versions()
+    if _loaded_versions is not None and versions != _loaded_versions:
+        for cached_func in _DEPENDENT_CACHES:
+            cached_func.clear()
+    _loaded_versions = versions
+    
+    return _load_models(versions)
+
+
+@cache_metrics(st.cache_resource(max_entries=1))
+@timed('load_models (cache miss)')
+def _load_models(versions: Tuple) -> Dict[str, Any]:
+    """Load all trained models (cached per model file versions)"""
     models = {}
     
     for model_name, model_path in MODEL_PATHS.items():
@@ -32,28 +80,35 @@ def load_models() -> Dict[str, Any]:
             if not os.path.exists(model_path):
                 st.warning(f"⚠️ Model file not found: {model_path}")
                 continue
-                
-            if model_name == 'XGBoost':
-                # Load XGBoost model from JSON
-                model = xgb.XGBRegressor()
-                model.load_model(model_path)
-                models[model_name] = model
-            else:
-                # Load joblib/pickle models (Decision Tree, etc.)
-                try:
-                    # Try joblib first (preferred for sklearn models)
-                    models[model_name] = joblib.load(model_path)
-                except Exception:
-                    # Fallback to pickle
-                    with open(model_path, 'rb') as f:
-                        models[model_name] = pickle.load(f)
-                    
+            models[model_name] = load_model_file(model_name, model_path)
         except Exception as e:
             st.error(f"❌ Error loading {model_name}: {str(e)}")
             
     return models
 
 
+def load_model_file(model_name: str, model_path: str) -> Any:
+    """
+    Load one trained model from its file (uncached)
+    
+    Used by load_models and by worker processes that keep their own copy.
+    """
+    if model_name == 'XGBoost':
+        # Load XGBoost model from JSON
+        model = xgb.XGBRegressor()
+        model.load_model(model_path)
+        return model
+    # Load joblib/pickle models (Decision Tree, etc.)
+    try:
+        # Try joblib first (preferred for sklearn models)
+        return joblib.load(model_path)
+    except Exception:
+        # Fallback to pickle
+        with open(model_path, 'rb') as f:
+            return pickle.load(f)
+
+
+@timed()
 def predict(model: Any, input_data: pd.DataFrame) -> Optional[np.ndarray]:
     """
     Make prediction using the provided model
@@ -65,8 +120,11 @@ def predict(model: Any, input_data: pd.DataFrame) -> Optional[np.ndarray]:
     Returns:
         Predicted values as numpy array or None if error occurs
     """
+    model_label = type(model).__name__
     try:
+        start = time.perf_counter()
         prediction = model.predict(input_data)
+        observe_prediction(model_label, len(input_data), time.perf_counter() - start)
         
         # Ensure prediction is a numpy array
         if isinstance(prediction, np.ndarray):
@@ -75,5 +133,6 @@ def predict(model: Any, input_data: pd.DataFrame) -> Optional[np.ndarray]:
             return np.array([prediction])
             
     except Exception as e:
+        PREDICTION_ERRORS.inc(model_label)
         st.error(f"❌ Prediction error: {str(e)}")
         return None
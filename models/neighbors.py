@@ -0,0 +1,160 @@
+"""
+Nearest historical farms lookup
+"""
+import os
+import joblib
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sklearn.neighbors import KDTree
+from typing import Any, Dict, Optional
+
+
+# Get paths and index settings from config
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import (
+    NEIGHBOR_INDEX_PATH, NEIGHBOR_PARTITION_LEVELS,
+    NEIGHBOR_NUMERIC_COLS, NEIGHBOR_K
+)
+from models.data_loader import load_dataset, get_data_version
+from utils.metrics import cache_metrics
+
+
+def _partition_key(values) -> tuple:
+    """Normalize a partition key so groupby keys and query keys compare equal"""
+    if not isinstance(values, tuple):
+        values = (values,)
+    return tuple(bool(v) if isinstance(v, (bool, np.bool_)) else str(v) for v in values)
+
+
+def build_neighbor_index(df: pd.DataFrame, version: Optional[str] = None,
+                         levels=NEIGHBOR_PARTITION_LEVELS,
+                         numeric_cols=NEIGHBOR_NUMERIC_COLS) -> Dict[str, Any]:
+    """
+    Build the partitioned KD-tree index over historical records
+
+    Each level partitions the rows by exact match on its key columns and
+    builds one KD-tree per partition over the standardized numeric columns.
+    Coarser levels serve queries whose exact partition is too small.
+
+    Args:
+        df: Raw dataset (as returned by load_dataset)
+        version: Data version the index was built from
+        levels: Partition key columns, most specific first
+        numeric_cols: Columns the distance is computed on
+
+    Returns:
+        Index dict consumed by query_neighbors
+    """
+    numeric = df[numeric_cols].to_numpy(dtype=np.float64)
+    mean = numeric.mean(axis=0)
+    std = numeric.std(axis=0)
+    std[std == 0] = 1.0
+    scaled = (numeric - mean) / std
+
+    index_levels = []
+    for keys in levels:
+        if keys:
+            groups = df.groupby(keys, sort=False, observed=True).indices
+        else:
+            groups = {(): np.arange(len(df))}
+
+        partitions = {}
+        for key, rows in groups.items():
+            rows = np.asarray(rows, dtype=np.int64)
+            partitions[_partition_key(key)] = {
+                'rows': rows,
+                'tree': KDTree(scaled[rows])
+            }
+        index_levels.append({'keys': list(keys), 'partitions': partitions})
+
+    return {
+        'version': version,
+        'numeric_cols': list(numeric_cols),
+        'mean': mean,
+        'std': std,
+        'levels': index_levels
+    }
+
+
+def save_neighbor_index(index: Dict[str, Any], path: str = NEIGHBOR_INDEX_PATH) -> None:
+    """Persist the index atomically"""
+    tmp_path = f"{path}.tmp"
+    joblib.dump(index, tmp_path)
+    os.replace(tmp_path, path)
+
+
+@cache_metrics(st.cache_resource)
+def _load_neighbor_index(version: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Index for a data version (cached; the version is the cache key)"""
+    if version is None:
+        return None
+
+    try:
+        if os.path.exists(NEIGHBOR_INDEX_PATH):
+            index = joblib.load(NEIGHBOR_INDEX_PATH)
+            if index.get('version') == version:
+                return index
+    except Exception:
+        pass  # Corrupt or incompatible file: rebuild below
+
+    df = load_dataset()
+    if df is None:
+        return None
+
+    index = build_neighbor_index(df, version)
+    try:
+        save_neighbor_index(index)
+    except OSError as e:
+        st.warning(f"⚠️ Could not persist neighbor index: {str(e)}")
+    return index
+
+
+def load_neighbor_index() -> Optional[Dict[str, Any]]:
+    """
+    Load the index for the current data version
+
+    The persisted index is reused while it matches the dataset; a changed
+    dataset is a new cache entry, rebuilt from it.
+
+    Returns:
+        Index dict or None if the dataset is unavailable
+    """
+    return _load_neighbor_index(get_data_version())
+
+
+def query_neighbors(index: Dict[str, Any], df: pd.DataFrame, record: Dict[str, Any],
+                    k: int = NEIGHBOR_K) -> pd.DataFrame:
+    """
+    Find the k most similar historical records
+
+    Uses the most specific partition level that holds at least k records
+    matching the query's categorical values and flags.
+
+    Args:
+        index: Index from load_neighbor_index
+        df: Dataset the index was built from
+        record: Raw feature values keyed by dataset column name
+        k: Number of neighbors
+
+    Returns:
+        Matching rows with Distance and Match_Level columns, nearest first
+    """
+    point = np.array([[record[c] for c in index['numeric_cols']]], dtype=np.float64)
+    point = (point - index['mean']) / index['std']
+
+    for level in index['levels']:
+        key = _partition_key(tuple(record[c] for c in level['keys']))
+        partition = level['partitions'].get(key)
+        if partition is None or len(partition['rows']) < k:
+            continue
+
+        dist, pos = partition['tree'].query(point, k=k)
+        neighbors = df.iloc[partition['rows'][pos[0]]].copy()
+        neighbors['Distance'] = dist[0]
+        neighbors['Match_Level'] = ', '.join(level['keys']) or 'All records'
+        return neighbors
+
+    return df.iloc[:0].assign(Distance=[], Match_Level=[])
+
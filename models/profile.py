@@ -0,0 +1,307 @@
+"""
+Dataset profile: summary statistics computed once per data version
+"""
+import os
+import json
+import numpy as np
+import pandas as pd
+import streamlit as st
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+# Get paths and profile settings from config
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import (
+    DATASET_PATH, PROFILE_PATH, PROFILE_HIST_BINS, PROFILE_DIGEST_COMPRESSION, PROFILE_TOP_VALUES,
+    PROFILE_SAMPLE_ROWS, PROFILE_BLOCK_BYTES
+)
+from models.data_loader import get_data_version
+from models.splitting import append_marker, read_appended, read_header, iter_blocks, parse_block, line_offsets
+from models.sketches import Moments, BinnedHistogram, TDigest, HeavyHitters
+from utils.metrics import cache_metrics
+from utils.profiling import timed
+
+
+DESCRIBE_INDEX = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+_QUANTILES = {'25%': 0.25, '50%': 0.5, '75%': 0.75}
+
+# Profile entries holding a sketch, by key
+_SKETCHES = {'moments': Moments, 'histogram': BinnedHistogram, 'digest': TDigest, 'top': HeavyHitters}
+
+
+def _new_sketches(frame: pd.DataFrame) -> Dict[str, Any]:
+    """Empty profile with live sketches for the columns of a first chunk"""
+    numeric = frame.select_dtypes(include=[np.number]).columns.tolist()
+    return {
+        'rows': 0,
+        'columns': frame.columns.tolist(),
+        'numeric': {col: {'nulls': 0, 'moments': Moments(1), 'histogram': BinnedHistogram(PROFILE_HIST_BINS),
+                          'digest': TDigest(PROFILE_DIGEST_COMPRESSION)} for col in numeric},
+        'categorical': {col: {'nulls': 0, 'top': HeavyHitters(PROFILE_TOP_VALUES)}
+                        for col in frame.columns if col not in numeric},
+        'comoments': {'columns': numeric, 'moments': Moments(len(numeric))},
+        'sample': []
+    }
+
+
+def _update_sketches(sketches: Dict[str, Any], frame: pd.DataFrame) -> None:
+    """Add a chunk of rows to live sketches"""
+    sketches['rows'] += len(frame)
+    for col, stats in sketches['numeric'].items():
+        values = pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=np.float64)
+        stats['nulls'] += int(np.isnan(values).sum())
+        for key in ('moments', 'histogram', 'digest'):
+            stats[key].update(values)
+    for col, stats in sketches['categorical'].items():
+        stats['nulls'] += int(frame[col].isna().sum())
+        stats['top'].update(frame[col])
+    comoments = sketches['comoments']
+    comoments['moments'].update(frame[comoments['columns']].apply(pd.to_numeric, errors='coerce')
+                                .to_numpy(dtype=np.float64))
+    if len(sketches['sample']) < PROFILE_SAMPLE_ROWS:
+        rows = frame.head(PROFILE_SAMPLE_ROWS - len(sketches['sample']))
+        sketches['sample'] += json.loads(rows.to_json(orient='split', index=False))['data']
+
+
+def _convert(profile: Dict[str, Any], convert) -> Dict[str, Any]:
+    """Copy of a profile with convert(cls, sketch) applied to every sketch entry"""
+    def entry(stats):
+        return {k: convert(_SKETCHES[k], v) if k in _SKETCHES else v for k, v in stats.items()}
+    return {
+        **profile,
+        'numeric': {col: entry(stats) for col, stats in profile['numeric'].items()},
+        'categorical': {col: entry(stats) for col, stats in profile['categorical'].items()},
+        'comoments': entry(profile['comoments'])
+    }
+
+
+def _to_json(sketches: Dict[str, Any]) -> Dict[str, Any]:
+    return _convert(sketches, lambda cls, sketch: sketch.to_dict())
+
+
+def _from_json(profile: Dict[str, Any]) -> Dict[str, Any]:
+    return _convert(profile, lambda cls, data: cls.from_dict(data))
+
+
+def build_profile(chunks: Iterable[pd.DataFrame]) -> Optional[Dict[str, Any]]:
+    """
+    Profile a dataset chunk by chunk
+
+    Returns:
+        JSON-serializable dict: shape, per-column null counts, numeric
+        moments, histograms and quantile digests, heavy-hitter counts of the
+        other columns, co-moments of the numeric columns (for correlations)
+        and the first PROFILE_SAMPLE_ROWS rows; None for no chunks
+    """
+    sketches = None
+    for frame in chunks:
+        if sketches is None:
+            sketches = _new_sketches(frame)
+        _update_sketches(sketches, frame)
+    return _to_json(sketches) if sketches is not None else None
+
+
+def merge_profile(profile: Dict[str, Any], new_rows: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    """
+    Extend a profile with appended rows, without rereading the old ones
+
+    Returns:
+        Updated profile, or None if the columns differ (needs a full rebuild)
+    """
+    if new_rows.columns.tolist() != profile['columns']:
+        return None
+    sketches = _from_json(profile)
+    _update_sketches(sketches, new_rows)
+    return _to_json(sketches)
+
+
+def merge_profiles(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Combine the profiles of two consecutive parts of a dataset
+
+    Raises:
+        ValueError: If the parts have different columns
+    """
+    if first['columns'] != second['columns']:
+        raise ValueError("Cannot merge profiles of datasets with different columns")
+    a, b = _from_json(first), _from_json(second)
+    for section in ('numeric', 'categorical'):
+        for col, stats in a[section].items():
+            for key, value in stats.items():
+                if key == 'nulls':
+                    stats[key] += b[section][col][key]
+                else:
+                    value.merge(b[section][col][key])
+    a['comoments']['moments'].merge(b['comoments']['moments'])
+    a['rows'] += b['rows']
+    a['sample'] = (a['sample'] + b['sample'])[:PROFILE_SAMPLE_ROWS]
+    return _to_json(a)
+
+
+def profile_range(source: str, start: int, end: Optional[int] = None,
+                  block_bytes: int = PROFILE_BLOCK_BYTES) -> Optional[Dict[str, Any]]:
+    """Profile the records of a dataset CSV between two line-start byte offsets"""
+    header = read_header(source)[0]
+    return build_profile(parse_block(block, header)
+                         for block, _ in iter_blocks(source, start, block_bytes, end=end))
+
+
+def profile_file(source: str, workers: int = 1, block_bytes: int = PROFILE_BLOCK_BYTES) -> Optional[Dict[str, Any]]:
+    """
+    Profile a whole dataset CSV, streaming it in blocks
+
+    With several workers the file is split into line-aligned byte ranges
+    that are profiled in parallel processes and merged in order.
+    """
+    start = read_header(source)[1]
+    offsets = line_offsets(source, start, max(workers, 1))
+    if len(offsets) <= 2:
+        return profile_range(source, start, block_bytes=block_bytes)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(profile_range, [source] * (len(offsets) - 1), offsets[:-1], offsets[1:],
+                              [block_bytes] * (len(offsets) - 1)))
+    parts = [part for part in parts if part is not None]
+    profile = parts[0] if parts else None
+    for part in parts[1:]:
+        profile = merge_profiles(profile, part)
+    return profile
+
+
+def save_profile(profile: Dict[str, Any], path: str = PROFILE_PATH) -> None:
+    """Persist the profile atomically"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(profile, f)
+    os.replace(tmp_path, path)
+
+
+def refresh_profile(source: str = DATASET_PATH, path: str = PROFILE_PATH, workers: int = 1) -> Optional[Dict[str, Any]]:
+    """
+    Profile of the current dataset, updating the saved artifact as needed
+
+    The saved profile is reused while the data version is unchanged. When
+    the dataset has only been appended to, just the new bytes are parsed
+    and merged in; otherwise the profile is rebuilt from the whole file.
+
+    Returns:
+        Profile dict or None if the dataset does not exist or is empty
+    """
+    version = get_data_version(source)
+    if version is None:
+        return None
+
+    profile = None
+    if os.path.exists(path):
+        with open(path) as f:
+            profile = json.load(f)
+        if profile.get('data_version') == version:
+            return profile
+
+    # Profiles saved in an older layout have no sketches to extend
+    resumable = profile is not None and 'moments' in profile.get('comoments', {})
+    new_rows = read_appended(source, profile) if resumable else None
+    merged = merge_profile(profile, new_rows) if new_rows is not None else None
+    if merged is None:
+        merged = profile_file(source, workers)
+    if merged is None:
+        return None
+
+    merged.update({'data_version': version, **append_marker(source)})
+    save_profile(merged, path)
+    return merged
+
+
+@cache_metrics(st.cache_data)
+@timed()
+def _load_profile(version: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Profile for a data version (cached; the version is the cache key)"""
+    try:
+        return refresh_profile()
+    except Exception as e:
+        st.error(f"❌ Error profiling dataset: {str(e)}")
+        return None
+
+
+def load_dataset_profile() -> Optional[Dict[str, Any]]:
+    """
+    Load the dataset profile for the current data version
+
+    Returns:
+        Profile dict (see build_profile) or None if the dataset is unavailable
+    """
+    return _load_profile(get_data_version())
+
+
+def column_summary(profile: Dict[str, Any], col: str) -> Dict[str, float]:
+    """Count, mean, standard deviation, min and max of a numeric column"""
+    stats = profile['numeric'][col]
+    moments = Moments.from_dict(stats['moments'])
+    n = moments.n
+    return {
+        'count': n,
+        'mean': float(moments.mean[0]) if n else np.nan,
+        'std': float(np.sqrt(moments.variance()[0])) if n > 1 else np.nan,
+        'min': stats['histogram']['min'] if n else np.nan,
+        'max': stats['histogram']['max'] if n else np.nan
+    }
+
+
+def describe_frame(profile: Dict[str, Any]) -> pd.DataFrame:
+    """The profile's numeric summary laid out like DataFrame.describe() (quartiles from the digests)"""
+    columns = {}
+    for col, stats in profile['numeric'].items():
+        summary = column_summary(profile, col)
+        digest = TDigest.from_dict(stats['digest'])
+        columns[col] = [summary['count'], summary['mean'], summary['std'], summary['min'],
+                        *[digest.quantile(q) for q in _QUANTILES.values()], summary['max']]
+    return pd.DataFrame(columns, index=DESCRIBE_INDEX, dtype=np.float64)
+
+
+def correlation_frame(profile: Dict[str, Any]) -> pd.DataFrame:
+    """Pearson correlation matrix of the numeric columns (over complete rows)"""
+    columns = profile['comoments']['columns']
+    corr = Moments.from_dict(profile['comoments']['moments']).correlation()
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def histogram_bins(profile: Dict[str, Any], col: str, max_bins: int = 40) -> Tuple[np.ndarray, np.ndarray]:
+    """Edges and counts of a numeric column's histogram, coarsened to at most max_bins bins"""
+    return BinnedHistogram.from_dict(profile['numeric'][col]['histogram']).bins(max_bins)
+
+
+def box_stats(profile: Dict[str, Any], col: str) -> Dict[str, float]:
+    """Quartiles, mean, std and Tukey fences (1.5 IQR, within the range) of a numeric column"""
+    summary = column_summary(profile, col)
+    digest = TDigest.from_dict(profile['numeric'][col]['digest'])
+    q1, median, q3 = (digest.quantile(q) for q in _QUANTILES.values())
+    return {
+        'q1': q1, 'median': median, 'q3': q3, 'mean': summary['mean'], 'sd': summary['std'],
+        'lowerfence': max(summary['min'], q1 - 1.5 * (q3 - q1)),
+        'upperfence': min(summary['max'], q3 + 1.5 * (q3 - q1))
+    }
+
+
+def category_counts(profile: Dict[str, Any], col: str) -> pd.Series:
+    """
+    Counts of a column's most frequent values, largest first
+
+    Exact unless the column has more than PROFILE_TOP_VALUES distinct
+    values; then rare ones are dropped and counts may be low by at most
+    HeavyHitters.error_bound().
+    """
+    items = HeavyHitters.from_dict(profile['categorical'][col]['top']).most_common()
+    return pd.Series([count for _, count in items], index=[value for value, _ in items], name=col, dtype=np.int64)
+
+
+def sample_frame(profile: Dict[str, Any], rows: int = PROFILE_SAMPLE_ROWS) -> pd.DataFrame:
+    """The first rows of the dataset as stored in the profile"""
+    return pd.DataFrame(profile['sample'][:rows], columns=profile['columns'])
+
+
+def missing_counts(profile: Dict[str, Any]) -> pd.Series:
+    """Null count per column, in dataset column order"""
+    nulls = {col: stats['nulls'] for col, stats in {**profile['numeric'], **profile['categorical']}.items()}
+    return pd.Series([nulls[col] for col in profile['columns']], index=profile['columns'])
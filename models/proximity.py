@@ -0,0 +1,244 @@
+"""
+Leaf co-occurrence proximity index for explaining predictions by example
+"""
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Any, Dict, Optional
+
+# Get proximity settings from config
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import PROXIMITY_BLOCK_TREES, PROXIMITY_K
+from models.tree_ensemble import model_leaves
+from models.model_loader import register_model_cache
+from utils.metrics import cache_metrics
+
+
+# Block signatures are mixed-radix integers and must fit in int64
+_MAX_SIGNATURE = 2 ** 62
+
+
+def _tree_blocks(radix: np.ndarray, block_trees: int):
+    """Group consecutive trees into blocks whose signatures fit in int64"""
+    blocks = []
+    start, size = 0, 1
+    for t, r in enumerate(radix):
+        if t > start and (t - start >= block_trees or size * int(r) > _MAX_SIGNATURE):
+            blocks.append((start, t))
+            start, size = t, 1
+        size *= int(r)
+    blocks.append((start, len(radix)))
+    return blocks
+
+
+def build_proximity_index(train_leaves: np.ndarray,
+                          block_trees: int = PROXIMITY_BLOCK_TREES) -> Dict[str, Any]:
+    """
+    Build the inverted (tree block, leaf combination) -> training rows index
+
+    A shallow tree has only a handful of leaves, so a per-tree posting list
+    covers a large share of the training set. Keying postings on the leaf
+    combination of a block of trees keeps every list short; with
+    block_trees=1 this is a plain (tree, leaf) index.
+
+    Args:
+        train_leaves: (n_rows, n_trees) leaf index matrix of the training rows
+        block_trees: Maximum number of trees per block
+
+    Returns:
+        Index dict consumed by query_proximity
+    """
+    n_rows, n_trees = train_leaves.shape
+    # The dtype's max value is reserved for leaves no training row reached
+    dtype = np.uint8 if train_leaves.max() < 255 else np.uint16
+    leaves = np.ascontiguousarray(train_leaves, dtype=dtype)
+    radix = leaves.max(axis=0).astype(np.int64) + 1
+
+    blocks = []
+    for start, stop in _tree_blocks(radix, block_trees):
+        weights = np.cumprod(np.concatenate([[1], radix[start:stop - 1]]))
+        signatures = leaves[:, start:stop].astype(np.int64) @ weights
+
+        keys, inverse = np.unique(signatures, return_inverse=True)
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(inverse, minlength=len(keys)), out=offsets[1:])
+
+        blocks.append({
+            'start': start,
+            'stop': stop,
+            'weights': weights,
+            'keys': keys,
+            'postings': np.argsort(inverse, kind='stable').astype(np.int32),
+            'offsets': offsets
+        })
+
+    return {
+        'leaves': leaves,
+        'radix': radix,
+        'blocks': blocks,
+        'n_rows': n_rows,
+        'n_trees': n_trees
+    }
+
+
+def _block_postings(index: Dict[str, Any], query: np.ndarray):
+    """
+    Training rows sharing the query's full leaf combination, per block
+
+    Blocks whose combination no training row has yield an empty list.
+    Lists are returned shortest first.
+    """
+    sentinel = np.iinfo(index['leaves'].dtype).max
+    empty = np.empty(0, dtype=np.int32)
+
+    lists = []
+    for block in index['blocks']:
+        leaves = query[block['start']:block['stop']]
+        if np.any(leaves == sentinel):
+            lists.append(empty)
+            continue
+
+        signature = leaves.astype(np.int64) @ block['weights']
+        pos = np.searchsorted(block['keys'], signature)
+        if pos < len(block['keys']) and block['keys'][pos] == signature:
+            lists.append(block['postings'][block['offsets'][pos]:block['offsets'][pos + 1]])
+        else:
+            lists.append(empty)
+
+    lists.sort(key=len)
+    return lists
+
+
+def _shared_leaves(leaves: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Number of trees in which each row lands in the same leaf as the query"""
+    count_dtype = np.uint8 if leaves.shape[1] < 256 else np.uint16
+    return (leaves == query).sum(axis=1, dtype=count_dtype)
+
+
+def _top_k(counts: np.ndarray, rows: np.ndarray, k: int):
+    """Rows with the k highest counts, best first"""
+    k = min(k, len(counts))
+    top = np.argpartition(counts, -k)[-k:]
+    top = top[np.argsort(counts[top], kind='stable')[::-1]]
+    return rows[top], counts[top]
+
+
+def _query_one(index: Dict[str, Any], query: np.ndarray, k: int):
+    """
+    Exact top-k rows by number of shared leaves for one query
+
+    If the current k-th best row mismatches the query in m trees, any row
+    at least as close mismatches at most m blocks, so it must fully match
+    one of any m + 1 blocks. Candidates therefore come from the m + 1
+    shortest posting lists and are rescored exactly; when the bound cannot
+    be met the whole training set is counted.
+    """
+    leaves, n_trees = index['leaves'], index['n_trees']
+    lists = _block_postings(index, query)
+
+    used = 1
+    while used <= len(lists):
+        candidates = np.unique(np.concatenate(lists[:used])) if used > 1 else lists[0]
+        if len(candidates) < k:
+            used += 1
+            continue
+
+        counts = _shared_leaves(leaves[candidates], query)
+        rows, top_counts = _top_k(counts, candidates, k)
+        needed = n_trees - int(top_counts[-1]) + 1
+        if needed <= used:
+            return rows, top_counts
+        used = needed
+
+    counts = _shared_leaves(leaves, query)
+    return _top_k(counts, np.arange(index['n_rows']), k)
+
+
+def query_proximity(index: Dict[str, Any], query_leaves: np.ndarray, k: int = PROXIMITY_K) -> pd.DataFrame:
+    """
+    Top-k training rows sharing the most leaves with each query row
+
+    Args:
+        index: Index from build_proximity_index
+        query_leaves: (n_queries, n_trees) leaf index matrix
+        k: Number of similar rows per query
+
+    Returns:
+        Long DataFrame with Query, Train_Row, Shared_Leaves and Proximity
+        (fraction of trees in which the rows share a leaf)
+    """
+    dtype = index['leaves'].dtype
+    sentinel = np.iinfo(dtype).max
+    query_leaves = np.asarray(query_leaves)
+    query_leaves = np.where(query_leaves >= index['radix'], sentinel, query_leaves).astype(dtype)
+
+    matches = [_query_one(index, query, k) for query in query_leaves]
+    rows = np.concatenate([m[0] for m in matches])
+    counts = np.concatenate([m[1] for m in matches]).astype(np.int64)
+
+    return pd.DataFrame({
+        'Query': np.repeat(np.arange(len(matches)), [len(m[0]) for m in matches]),
+        'Train_Row': rows,
+        'Shared_Leaves': counts,
+        'Proximity': counts / index['n_trees']
+    })
+
+
+@register_model_cache
+@cache_metrics(st.cache_resource)
+def load_proximity_index(model_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Build the proximity index for a model over X_train once per process
+
+    Args:
+        model_name: Name of a model returned by load_models
+
+    Returns:
+        Index dict or None if the model or training split is unavailable
+    """
+    from models.model_loader import load_models
+    from models.data_loader import load_train_test_data
+
+    model = load_models().get(model_name)
+    data = load_train_test_data()
+    if model is None or 'X_train' not in data:
+        return None
+
+    try:
+        return build_proximity_index(model_leaves(model, data['X_train']))
+    except Exception as e:
+        st.error(f"❌ Error building proximity index for {model_name}: {str(e)}")
+        return None
+
+
+def similar_training_rows(model: Any, model_name: str, X: pd.DataFrame,
+                          k: int = PROXIMITY_K) -> Optional[pd.DataFrame]:
+    """
+    Most similar training examples for the first row of X, in raw layout
+
+    Returns:
+        Decoded training rows with actual yield and proximity (empty when
+        no training row shares a leaf), or None
+    """
+    from models.data_loader import load_train_test_data
+    from models.features import decode_features
+
+    index = load_proximity_index(model_name)
+    if index is None:
+        return None
+
+    matches = query_proximity(index, model_leaves(model, X.iloc[:1]), k)
+    # Rows sharing no leaf are not similar (a single tree pads with them)
+    matches = matches[matches['Shared_Leaves'] > 0]
+    if matches.empty:
+        return pd.DataFrame()
+    data = load_train_test_data()
+    rows = matches['Train_Row'].values
+
+    similar = decode_features(data['X_train'].iloc[rows]).reset_index(drop=True)
+    if 'y_train' in data:
+        similar['Actual_Yield'] = data['y_train'].iloc[rows, 0].values
+    similar['Proximity'] = matches['Proximity'].values
+    return similar
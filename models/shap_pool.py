@@ -0,0 +1,187 @@
+"""
+SHAP jobs in a dedicated process pool, shared between identical requests
+"""
+import time
+import hashlib
+import threading
+import multiprocessing
+import numpy as np
+import pandas as pd
+import shap
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+# Get model paths and SHAP settings from config
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import MODEL_PATHS, SHAP_CHUNK_ROWS, SHAP_WORKERS, SHAP_JOB_TTL_SECONDS
+from models.data_loader import get_data_version
+from models.explain import make_explainer, iter_chunks
+from utils.metrics import SHAP_SECONDS
+
+
+# Worker side: models and explainers loaded once per worker process
+_worker_models: Dict[Tuple[str, Optional[str]], Any] = {}
+_worker_explainers: Dict[Tuple[str, Optional[str], str], Any] = {}
+
+
+def _worker_explainer(model_name: str, model_version: Optional[str], background: pd.DataFrame, digest: str):
+    """This worker's explainer for a model file version and background (built on first use)"""
+    from models.model_loader import load_model_file
+
+    key = (model_name, model_version, digest)
+    explainer = _worker_explainers.get(key)
+    if explainer is None:
+        model_key = (model_name, model_version)
+        if model_key not in _worker_models:
+            _worker_models[model_key] = load_model_file(model_name, MODEL_PATHS[model_name])
+        explainer = _worker_explainers[key] = make_explainer(_worker_models[model_key], background)
+    return explainer
+
+
+def _explain_block(model_name: str, model_version: Optional[str], background: pd.DataFrame, digest: str,
+                   start: int, block: pd.DataFrame) -> Dict[str, Any]:
+    """Explain one row block in a worker; returns plain arrays (cheap to send back)"""
+    explainer = _worker_explainer(model_name, model_version, background, digest)
+    began = time.perf_counter()
+    explanation = explainer(block)
+    return {
+        'start': start,
+        'values': explanation.values,
+        'base_values': np.atleast_1d(explanation.base_values),
+        'data': explanation.data,
+        'seconds': time.perf_counter() - began
+    }
+
+
+def block_explanation(part: Dict[str, Any], feature_names: List[str]) -> shap.Explanation:
+    """Explanation of a finished block"""
+    return shap.Explanation(values=part['values'], base_values=part['base_values'], data=part['data'],
+                            feature_names=feature_names)
+
+
+# Server side: one pool per process and the jobs currently running in it
+_pool: Optional[ProcessPoolExecutor] = None
+_jobs: Dict[str, 'PoolJob'] = {}
+_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    # A worker that died (e.g. killed for memory) breaks the whole pool; start a new one
+    if _pool is None or getattr(_pool, '_broken', False):
+        # Spawned, not forked: the server process runs many threads
+        _pool = ProcessPoolExecutor(max_workers=SHAP_WORKERS,
+                                    mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def _digest(*frames: pd.DataFrame) -> str:
+    """Content hash of frames (values, index and columns)"""
+    h = hashlib.sha1()
+    for frame in frames:
+        h.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+        h.update(repr(list(frame.columns)).encode())
+    return h.hexdigest()
+
+
+class PoolJob:
+    """Row blocks of one SHAP request, dispatched to the pool and shared by its subscribers"""
+
+    def __init__(self, key: str, model_name: str, rows: int, futures: List[Future]):
+        self.key = key
+        self.model_name = model_name
+        self.rows = rows
+        self.futures = futures
+        self.subscribers = 0
+        self.touched = time.monotonic()
+        self._observed = set()
+
+    def done_parts(self) -> List[Dict[str, Any]]:
+        """Results of the finished blocks, in row order (raises a block's error)"""
+        parts = [f.result() for f in self.futures if f.done() and not f.cancelled()]
+        for part in parts:
+            if part['start'] not in self._observed:
+                self._observed.add(part['start'])
+                SHAP_SECONDS.observe(part['seconds'], self.model_name)
+        return sorted(parts, key=lambda part: part['start'])
+
+    @property
+    def finished(self) -> bool:
+        return all(f.done() for f in self.futures)
+
+
+def _sweep() -> None:
+    """Drop finished jobs nobody has looked at for SHAP_JOB_TTL_SECONDS (caller holds the lock)"""
+    now = time.monotonic()
+    for key, job in list(_jobs.items()):
+        if job.finished and now - job.touched > SHAP_JOB_TTL_SECONDS:
+            del _jobs[key]
+
+
+def submit(model_name: str, background: pd.DataFrame, features: pd.DataFrame,
+           block_rows: int = SHAP_CHUNK_ROWS) -> PoolJob:
+    """
+    Explain rows in the worker pool, one task per block of rows
+
+    Identical requests (same model file, background and rows) share one
+    job: a second caller, e.g. another session, subscribes to the running
+    job instead of computing again. Call release() when done with it.
+
+    Returns:
+        The (possibly shared) job
+    """
+    model_version = get_data_version(MODEL_PATHS[model_name])
+    background_digest = _digest(background)
+    key = f"{model_name}:{model_version}:{background_digest}:{_digest(features)}"
+    with _lock:
+        _sweep()
+        job = _jobs.get(key)
+        if job is None or any(f.cancelled() for f in job.futures):
+            pool = _get_pool()
+            futures = [pool.submit(_explain_block, model_name, model_version, background, background_digest,
+                                   start, features.iloc[start:end])
+                       for start, end in iter_chunks(len(features), block_rows)]
+            job = _jobs[key] = PoolJob(key, model_name, len(features), futures)
+        job.subscribers += 1
+        job.touched = time.monotonic()
+    return job
+
+
+def attach(key: str) -> Optional[PoolJob]:
+    """Running job by key (e.g. after a rerun), or None if it is gone"""
+    with _lock:
+        job = _jobs.get(key)
+        if job is not None:
+            job.touched = time.monotonic()
+        return job
+
+
+def release(job: PoolJob, cancel: bool = False) -> None:
+    """
+    Unsubscribe from a job
+
+    The job is dropped once it has no subscribers; with cancel=True its
+    blocks not yet started are cancelled then too (blocks already running
+    finish in their worker).
+    """
+    with _lock:
+        job.subscribers -= 1
+        if job.subscribers > 0:
+            return
+        if cancel:
+            for f in job.futures:
+                f.cancel()
+        if _jobs.get(job.key) is job:
+            del _jobs[job.key]
+
+
+def shutdown() -> None:
+    """Stop the worker pool (e.g. at the end of a script or load test)"""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+        _jobs.clear()
@@ -0,0 +1,340 @@
+"""
+Mergeable streaming statistics: moments, histograms, quantile and frequency sketches
+
+Every sketch consumes data a chunk at a time (update) and combines with a
+sketch of the same kind built elsewhere (merge), so a dataset can be
+summarized block by block or in parallel shards merged afterwards, in
+memory independent of its length. All of them round-trip through
+JSON-serializable dicts (to_dict / from_dict).
+"""
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _finite(values) -> np.ndarray:
+    x = np.asarray(values, dtype=np.float64).ravel()
+    return x[np.isfinite(x)]
+
+
+class Moments:
+    """
+    Count, means and co-moment matrix of k columns
+
+    Chunks are reduced with NumPy and combined with the pairwise update of
+    Chan et al. (Welford's update generalized to batches), which stays
+    accurate where the textbook sum-of-squares formula cancels. Rows with a
+    missing value in any column are skipped.
+    """
+
+    def __init__(self, k: int = 1):
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    def update(self, values) -> 'Moments':
+        """Add the rows of an (n, k) array (or the values of a 1-d one when k = 1)"""
+        x = np.asarray(values, dtype=np.float64).reshape(-1, len(self.mean))
+        x = x[np.isfinite(x).all(axis=1)]
+        if len(x):
+            batch = Moments(x.shape[1])
+            batch.n = len(x)
+            batch.mean = x.mean(axis=0)
+            centered = x - batch.mean
+            batch.comoment = centered.T @ centered
+            self.merge(batch)
+        return self
+
+    def merge(self, other: 'Moments') -> 'Moments':
+        """Combine with moments of other rows of the same columns"""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.comoment = other.n, other.mean.copy(), other.comoment.copy()
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * self.n * other.n / n
+        self.mean = self.mean + delta * other.n / n
+        self.n = n
+        return self
+
+    def variance(self) -> np.ndarray:
+        """Sample variance of each column (NaN below two rows)"""
+        return np.diag(self.comoment) / (self.n - 1) if self.n > 1 else np.full(len(self.mean), np.nan)
+
+    def correlation(self) -> np.ndarray:
+        """Pearson correlation matrix"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scale = np.sqrt(np.diag(self.comoment))
+            return self.comoment / np.outer(scale, scale)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'n': self.n, 'mean': self.mean.tolist(), 'comoment': self.comoment.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Moments':
+        moments = cls(len(data['mean']))
+        moments.n = data['n']
+        moments.mean = np.asarray(data['mean'], dtype=np.float64)
+        moments.comoment = np.asarray(data['comoment'], dtype=np.float64).reshape(len(moments.mean), -1)
+        return moments
+
+
+class BinnedHistogram:
+    """
+    Fixed-width histogram that widens its bins as the range grows
+
+    Bin i covers [i * w, (i + 1) * w) with w a power of two, so histograms
+    of any two chunks line up: the finer one is coarsened by merging bin
+    pairs until both have the same width. The width is the smallest that
+    keeps the observed range within max_bins bins, which bounds every
+    quantile's error by one bin width.
+    """
+
+    def __init__(self, max_bins: int = 1024):
+        self.max_bins = max_bins
+        self.exponent: Optional[int] = None
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def width(self) -> float:
+        return 2.0 ** self.exponent if self.exponent is not None else np.nan
+
+    def _exponent_for(self, lo: float, hi: float) -> int:
+        """Smallest exponent whose bins span [lo, hi] in at most max_bins bins"""
+        span = hi - lo
+        # Never finer than 2^-40 of the magnitude, so bin indices fit in int64
+        floor = int(np.floor(np.log2(max(abs(lo), abs(hi), np.finfo(np.float64).tiny)))) - 40
+        exponent = max(int(np.ceil(np.log2(span / self.max_bins))), floor) if span > 0 else floor
+        while np.floor(hi / 2.0 ** exponent) - np.floor(lo / 2.0 ** exponent) + 1 > self.max_bins:
+            exponent += 1
+        return exponent
+
+    def _rebinned(self, exponent: int) -> Tuple[int, np.ndarray]:
+        """(offset, counts) of this histogram at a coarser or equal bin width"""
+        shift = exponent - self.exponent
+        if shift == 0 or not len(self.counts):
+            return self.offset >> shift if len(self.counts) else 0, self.counts
+        index = (self.offset + np.arange(len(self.counts))) >> shift
+        return int(index[0]), np.bincount(index - index[0], weights=self.counts).astype(np.int64)
+
+    def _absorb(self, exponent: int, parts: List[Tuple[int, np.ndarray]]) -> None:
+        parts = [(offset, counts) for offset, counts in parts if len(counts)]
+        start = min(offset for offset, _ in parts)
+        stop = max(offset + len(counts) for offset, counts in parts)
+        merged = np.zeros(stop - start, dtype=np.int64)
+        for offset, counts in parts:
+            merged[offset - start:offset - start + len(counts)] += counts
+        self.exponent, self.offset, self.counts = exponent, start, merged
+
+    def update(self, values) -> 'BinnedHistogram':
+        """Add values (NaN and infinities are skipped)"""
+        x = _finite(values)
+        if not len(x):
+            return self
+        lo, hi = min(self.min, x.min()), max(self.max, x.max())
+        exponent = self._exponent_for(lo, hi)
+        parts = []
+        if self.exponent is not None:
+            exponent = max(exponent, self.exponent)
+            parts.append(self._rebinned(exponent))
+
+        index = np.floor(x / 2.0 ** exponent).astype(np.int64)
+        first = int(index.min())
+        parts.append((first, np.bincount(index - first)))
+        self._absorb(exponent, parts)
+        self.n += len(x)
+        self.min, self.max = float(lo), float(hi)
+        return self
+
+    def merge(self, other: 'BinnedHistogram') -> 'BinnedHistogram':
+        """Combine with a histogram of other values"""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.exponent, self.offset, self.counts = other.exponent, other.offset, other.counts.copy()
+            self.n, self.min, self.max = other.n, other.min, other.max
+            return self
+        lo, hi = min(self.min, other.min), max(self.max, other.max)
+        exponent = max(self._exponent_for(lo, hi), self.exponent, other.exponent)
+        self._absorb(exponent, [self._rebinned(exponent), other._rebinned(exponent)])
+        self.n += other.n
+        self.min, self.max = lo, hi
+        return self
+
+    def bins(self, max_bins: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bin edges and counts, coarsened to at most max_bins bins
+
+        Returns:
+            (edges of length m + 1, counts of length m)
+        """
+        if self.n == 0:
+            return np.zeros(1), np.zeros(0, dtype=np.int64)
+        exponent = self.exponent
+        if max_bins is not None:
+            exponent = max(exponent, BinnedHistogram(max_bins)._exponent_for(self.min, self.max))
+        offset, counts = self._rebinned(exponent)
+        edges = (offset + np.arange(len(counts) + 1)) * 2.0 ** exponent
+        return edges, counts
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile q, interpolated within its bin (error at most one bin width)"""
+        if self.n == 0:
+            return np.nan
+        cumulative = np.cumsum(self.counts)
+        target = q * self.n
+        i = min(int(np.searchsorted(cumulative, target)), len(self.counts) - 1)
+        below = cumulative[i - 1] if i else 0
+        share = (target - below) / self.counts[i] if self.counts[i] else 0.0
+        value = (self.offset + i + share) * self.width
+        return float(min(max(value, self.min), self.max))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'max_bins': self.max_bins, 'exponent': self.exponent, 'offset': self.offset,
+                'counts': self.counts.tolist(), 'n': self.n,
+                'min': self.min if self.n else None, 'max': self.max if self.n else None}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BinnedHistogram':
+        hist = cls(data['max_bins'])
+        hist.exponent, hist.offset, hist.n = data['exponent'], data['offset'], data['n']
+        hist.counts = np.asarray(data['counts'], dtype=np.int64)
+        if hist.n:
+            hist.min, hist.max = data['min'], data['max']
+        return hist
+
+
+class TDigest:
+    """
+    Merging t-digest: weighted centroids that are small near the tails
+
+    Values and centroids are sorted and grouped so no group spans more than
+    one unit of the k1 scale k(q) = compression / (2 pi) * asin(2q - 1).
+    A centroid around quantile q then holds at most about
+    2 pi sqrt(q (1 - q)) / compression of the weight, which bounds the rank
+    error of a quantile estimate (pi / compression at the median, far less
+    in the tails), with about compression / 2 centroids.
+    """
+
+    def __init__(self, compression: float = 500):
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def n(self) -> int:
+        return int(round(self.weights.sum()))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+        group = np.floor(k + self.compression / 4).astype(np.int64)
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(group)) + 1])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def update(self, values) -> 'TDigest':
+        """Add values (NaN and infinities are skipped)"""
+        x = _finite(values)
+        if len(x):
+            self.min, self.max = min(self.min, float(x.min())), max(self.max, float(x.max()))
+            self._compress(np.concatenate([self.means, x]), np.concatenate([self.weights, np.ones(len(x))]))
+        return self
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        """Combine with a digest of other values"""
+        if len(other.weights):
+            self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile q, interpolated between centroid centers"""
+        if not len(self.weights):
+            return np.nan
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * total, np.concatenate([[0], centers, [total]]),
+                               np.concatenate([[self.min], self.means, [self.max]])))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'compression': self.compression, 'means': self.means.tolist(), 'weights': self.weights.tolist(),
+                'min': self.min if len(self.weights) else None, 'max': self.max if len(self.weights) else None}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TDigest':
+        digest = cls(data['compression'])
+        digest.means = np.asarray(data['means'], dtype=np.float64)
+        digest.weights = np.asarray(data['weights'], dtype=np.float64)
+        if len(digest.weights):
+            digest.min, digest.max = data['min'], data['max']
+        return digest
+
+
+class HeavyHitters:
+    """
+    Misra-Gries frequent-value counters (mergeable)
+
+    Keeps at most `capacity` counters. When a chunk or merge leaves more,
+    the (capacity + 1)-th largest count is subtracted from all of them and
+    the ones that drop to zero are removed. Each count is then low by at
+    most error_bound() = (n - sum of counters) / (capacity + 1), so every
+    value with a share above 1 / (capacity + 1) is kept; with no more
+    distinct values than counters the counts are exact.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.n = 0
+
+    def _add(self, counts: Dict[str, int], n: int) -> None:
+        merged = dict(self.counts)
+        for value, count in counts.items():
+            merged[value] = merged.get(value, 0) + count
+        if len(merged) > self.capacity:
+            cut = sorted(merged.values(), reverse=True)[self.capacity]
+            merged = {value: count - cut for value, count in merged.items() if count > cut}
+        self.counts = merged
+        self.n += n
+
+    def update(self, values) -> 'HeavyHitters':
+        """Add values (missing ones are skipped)"""
+        counts = pd.Series(values).dropna().astype(str).value_counts()
+        self._add({value: int(count) for value, count in counts.items()}, int(counts.sum()))
+        return self
+
+    def merge(self, other: 'HeavyHitters') -> 'HeavyHitters':
+        """Combine with counters of other values"""
+        self._add(other.counts, other.n)
+        return self
+
+    def error_bound(self) -> float:
+        """Most any count (or any dropped value's frequency) can be low by"""
+        return (self.n - sum(self.counts.values())) / (self.capacity + 1)
+
+    def most_common(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(value, count) pairs, largest count first"""
+        return sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'capacity': self.capacity, 'counts': self.counts, 'n': self.n}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HeavyHitters':
+        hitters = cls(data['capacity'])
+        hitters.counts = {str(k): int(v) for k, v in data['counts'].items()}
+        hitters.n = data['n']
+        return hitters
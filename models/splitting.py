@@ -0,0 +1,306 @@
+"""
+Deterministic hash-based train/test split for datasets of any size
+"""
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# Get dataset layout and split settings from config
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import (
+    FEATURE_NAMES, TARGET_COL, ENCODED_COLUMNS, BOOLEAN_COLS, CATEGORICAL_COLS,
+    SPLIT_DIR, SPLIT_TEST_FRACTION, SPLIT_BLOCK_BYTES, SPLIT_HASH_KEY
+)
+from models.features import encode_records
+
+
+MANIFEST_NAME = 'manifest.json'
+SPLITS = ('train', 'test')
+
+# Bytes before the processed offset remembered to detect a rewritten source
+_TAIL_BYTES = 4096
+
+
+def hash_records(keys: np.ndarray, hash_key: str = SPLIT_HASH_KEY) -> np.ndarray:
+    """Stable 64-bit SipHash of every key (bytes or str), identical across runs and machines"""
+    return pd.util.hash_array(keys, hash_key=hash_key, categorize=False)
+
+
+def assign_test(hashes: np.ndarray, test_fraction: float = SPLIT_TEST_FRACTION) -> np.ndarray:
+    """True for records whose hash, read as a uniform draw in [0, 1), falls in the test share"""
+    return (hashes >> np.uint64(11)).astype(np.float64) * 2.0 ** -53 < test_fraction
+
+
+def read_header(path: str) -> Tuple[List[str], int]:
+    """Column names of a dataset CSV and the byte offset of its first record"""
+    with open(path, 'rb') as f:
+        line = f.readline()
+    names = line.decode('utf-8-sig').strip().split(';')
+    return names, len(line)
+
+
+def iter_blocks(path: str, start: int, block_bytes: int = SPLIT_BLOCK_BYTES,
+                end: Optional[int] = None) -> Iterator[Tuple[bytes, int]]:
+    """
+    Read a file from a byte offset in blocks of whole lines
+
+    Args:
+        end: Stop at this offset (a line start, e.g. from line_offsets)
+            instead of the end of the file
+
+    Yields:
+        (block, offset just past the block); a final line without a
+        trailing newline is yielded as the last block
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        offset, carry = start, b''
+        while True:
+            size = block_bytes if end is None else min(block_bytes, end - offset - len(carry))
+            chunk = f.read(size) if size > 0 else b''
+            if not chunk:
+                break
+            data = carry + chunk
+            cut = data.rfind(b'\n') + 1
+            block, carry = data[:cut], data[cut:]
+            if block:
+                offset += len(block)
+                yield block, offset
+        if carry:
+            yield carry, offset + len(carry)
+
+
+def line_offsets(path: str, start: int, parts: int) -> List[int]:
+    """
+    Split a file from a byte offset into byte ranges of whole lines
+
+    Returns:
+        parts + 1 increasing offsets (fewer for small files), each the
+        start of a line, the last one the file size
+    """
+    size = os.path.getsize(path)
+    offsets = [start]
+    with open(path, 'rb') as f:
+        for i in range(1, parts):
+            f.seek(max(start + (size - start) * i // parts - 1, offsets[-1]))
+            f.readline()
+            if f.tell() < size and f.tell() > offsets[-1]:
+                offsets.append(f.tell())
+    return offsets + [size]
+
+
+def parse_block(block: bytes, header: List[str]) -> pd.DataFrame:
+    """Parse a block of dataset lines (; separated, decimal commas) with fixed dtypes"""
+    column_types = {col: pa.string() for col in CATEGORICAL_COLS if col in header}
+    column_types.update({col: pa.bool_() for col in BOOLEAN_COLS if col in header})
+    table = pa_csv.read_csv(
+        pa.py_buffer(block),
+        read_options=pa_csv.ReadOptions(column_names=header),
+        parse_options=pa_csv.ParseOptions(delimiter=';'),
+        convert_options=pa_csv.ConvertOptions(
+            decimal_point=',', column_types=column_types,
+            true_values=['TRUE', 'True', 'true'], false_values=['FALSE', 'False', 'false']
+        )
+    )
+    return table.to_pandas()
+
+
+def _block_keys(block: bytes, raw: pd.DataFrame, id_column: Optional[str]) -> np.ndarray:
+    """Hash keys of a parsed block: the id column, or else each record's line bytes"""
+    if id_column is not None:
+        return raw[id_column].astype(str).to_numpy(dtype=object)
+    lines = block.splitlines()
+    keys = np.array(lines, dtype=object)
+    # Blank lines are skipped by the parser too
+    keys = keys[np.fromiter(map(len, lines), dtype=np.int64, count=len(lines)) > 0]
+    if len(keys) != len(raw):
+        raise ValueError(f"Parsed {len(raw)} records from {len(keys)} lines")
+    return keys
+
+
+def tail_fingerprint(path: str, offset: int) -> str:
+    """Fingerprint of the bytes just before an offset"""
+    with open(path, 'rb') as f:
+        f.seek(max(0, offset - _TAIL_BYTES))
+        data = f.read(min(offset, _TAIL_BYTES))
+    return format(int(hash_records(np.array([data], dtype=object))[0]), '016x')
+
+
+def append_marker(path: str) -> Dict[str, Any]:
+    """
+    Where a derived artifact can later resume reading a file from
+
+    Returns:
+        {'bytes': file size, or None if the last line is incomplete (an
+        append could not be told apart from a rewrite), 'tail': fingerprint}
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.seek(max(0, size - 1))
+        ends_with_newline = f.read(1) == b'\n'
+    return {'bytes': size if ends_with_newline else None, 'tail': tail_fingerprint(path, size)}
+
+
+def read_appended(path: str, marker: Dict[str, Any]) -> Optional[pd.DataFrame]:
+    """
+    Records appended to a dataset since an append_marker was taken
+
+    Returns:
+        Parsed new records, or None if the file was changed in any other way
+        (or the new bytes do not parse) and has to be read in full
+    """
+    offset = marker.get('bytes')
+    if offset is None or os.path.getsize(path) <= offset or tail_fingerprint(path, offset) != marker.get('tail'):
+        return None
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        block = f.read()
+    try:
+        return parse_block(block, read_header(path)[0])
+    except ValueError:
+        return None
+
+
+def _save_manifest(manifest: Dict[str, Any], out_dir: str) -> None:
+    """Write the manifest atomically (it is the resume point)"""
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_manifest(out_dir: str = SPLIT_DIR) -> Optional[Dict[str, Any]]:
+    """Manifest of a hash split directory, or None if there is none"""
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _resume_point(manifest: Optional[Dict[str, Any]], source: str, settings: Dict[str, Any]) -> bool:
+    """
+    True if an existing split can be extended with the source's new bytes
+
+    Raises:
+        ValueError: If the split was made with other settings, or the source
+            was changed (not just appended to) since
+    """
+    if manifest is None:
+        return False
+    for key, value in settings.items():
+        if manifest[key] != value:
+            raise ValueError(f"Existing split has {key}={manifest[key]!r}, not {value!r}; "
+                             f"rerun with a fresh output directory or restart")
+    size = os.path.getsize(source)
+    if size < manifest['bytes'] or tail_fingerprint(source, manifest['bytes']) != manifest['tail']:
+        raise ValueError(f"{source} changed before the last processed byte, "
+                         f"not only appended to; restart the split")
+    return True
+
+
+def hash_split(source: str, out_dir: str = SPLIT_DIR, test_fraction: float = SPLIT_TEST_FRACTION,
+               id_column: Optional[str] = None, block_bytes: int = SPLIT_BLOCK_BYTES,
+               restart: bool = False, progress=None) -> Dict[str, Any]:
+    """
+    Split a dataset CSV into encoded train/test Parquet shards, streaming
+
+    Each record goes to test when the hash of its line (or of its id
+    column) falls below test_fraction, so its side never depends on any
+    other record: rerunning, reordering or appending rows leaves every
+    existing assignment unchanged, and duplicate lines always land on the
+    same side. The file is read in blocks of whole lines and each block is
+    written as one shard per side, so memory use is bounded by the block
+    size. The manifest is updated after every block, so a rerun on a
+    source that has only been appended to processes just the new bytes.
+
+    Args:
+        source: Dataset CSV (; separated, decimal commas)
+        out_dir: Output directory (train/ and test/ shards plus manifest)
+        test_fraction: Share of records assigned to test
+        id_column: Column whose value identifies a record (default: the
+            whole line)
+        block_bytes: Bytes read per block
+        restart: Discard an existing split in out_dir
+        progress: Optional callback receiving the manifest after each block
+
+    Returns:
+        Manifest dict with byte offset, row counts and shard names per side
+    """
+    header, data_start = read_header(source)
+    missing = [c for c in FEATURE_NAMES + [TARGET_COL] if c not in header]
+    if missing or (id_column is not None and id_column not in header):
+        raise ValueError(f"{source} is missing columns: {missing or [id_column]}")
+
+    settings = {'header': header, 'test_fraction': test_fraction,
+                'hash_key': SPLIT_HASH_KEY, 'id_column': id_column}
+    if restart and os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+
+    manifest = load_manifest(out_dir)
+    if not _resume_point(manifest, source, settings):
+        manifest = {**settings, 'source': os.path.abspath(source), 'bytes': data_start, 'tail': None,
+                    'blocks': 0, 'rows': {s: 0 for s in SPLITS}, 'shards': {s: [] for s in SPLITS}}
+    for split in SPLITS:
+        os.makedirs(os.path.join(out_dir, split), exist_ok=True)
+
+    for block, offset in iter_blocks(source, manifest['bytes'], block_bytes):
+        raw = parse_block(block, header)
+        is_test = assign_test(hash_records(_block_keys(block, raw, id_column)), test_fraction)
+
+        encoded = encode_records(raw[FEATURE_NAMES], ENCODED_COLUMNS)
+        encoded[TARGET_COL] = raw[TARGET_COL].astype(np.float64)
+
+        for split, rows in (('train', ~is_test), ('test', is_test)):
+            if not rows.any():
+                continue
+            name = f"{split}/part-{manifest['blocks']:06d}.parquet"
+            path = os.path.join(out_dir, name)
+            encoded[rows].to_parquet(f"{path}.tmp", index=False)
+            os.replace(f"{path}.tmp", path)
+            manifest['shards'][split].append(name)
+            manifest['rows'][split] += int(rows.sum())
+
+        manifest['blocks'] += 1
+        manifest['bytes'] = offset
+        manifest['tail'] = tail_fingerprint(source, offset)
+        _save_manifest(manifest, out_dir)
+        if progress is not None:
+            progress(manifest)
+
+    if manifest['tail'] is None:
+        manifest['tail'] = tail_fingerprint(source, manifest['bytes'])
+        _save_manifest(manifest, out_dir)
+    return manifest
+
+
+def iter_split(split: str, out_dir: str = SPLIT_DIR,
+               columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Encoded shards of one side of a hash split, one DataFrame at a time"""
+    manifest = load_manifest(out_dir)
+    if manifest is None:
+        return
+    for name in manifest['shards'][split]:
+        yield pd.read_parquet(os.path.join(out_dir, name), columns=columns)
+
+
+def read_split(split: str, out_dir: str = SPLIT_DIR) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Load one side of a hash split into memory
+
+    Returns:
+        Encoded features (ENCODED_COLUMNS) and target array
+    """
+    frames = list(iter_split(split, out_dir))
+    if not frames:
+        return pd.DataFrame(columns=ENCODED_COLUMNS), np.empty(0)
+    data = pd.concat(frames, ignore_index=True)
+    return data[ENCODED_COLUMNS], data[TARGET_COL].to_numpy()
@@ -0,0 +1,204 @@
+"""
+Synthetic harvest records fitted to the real dataset, for scale testing
+"""
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from typing import Any, Dict, Iterator, List
+
+
+# Get dataset layout and generator settings from config
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import (
+    FEATURE_NAMES, TARGET_COL, CATEGORICAL_COLS, NUMERIC_COLS, INTEGER_COLS, BOOLEAN_COLS,
+    BASELINE_CATEGORIES, RANDOM_STATE, SYNTHETIC_CHUNK_ROWS, SYNTHETIC_QUANTILES
+)
+
+
+# Dataset column order (features as in FEATURE_NAMES, then the target)
+COLUMNS = FEATURE_NAMES + [TARGET_COL]
+
+# Categorical features drawn conditionally on the crop
+_CONDITIONED = [c for c in CATEGORICAL_COLS if c != 'Crop']
+
+
+def _yield_design(frame: pd.DataFrame, categories: Dict[str, List[str]]) -> np.ndarray:
+    """Design matrix of the per-crop yield regression: intercept, numerics, flags, dummies"""
+    columns = [np.ones(len(frame))]
+    columns += [frame[col].to_numpy(dtype=np.float64) for col in NUMERIC_COLS + BOOLEAN_COLS]
+    for col in _CONDITIONED:
+        values = frame[col].astype(str).to_numpy()
+        columns += [(values == c).astype(np.float64)
+                    for c in categories[col] if c != BASELINE_CATEGORIES[col]]
+    return np.column_stack(columns)
+
+
+def fit_profile(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Fit the distributions the generator samples from
+
+    Per crop: frequencies of every other categorical feature, the share of
+    fertilized and irrigated fields, SYNTHETIC_QUANTILES quantiles of each
+    numeric feature (so sampled values follow the observed shape and range),
+    and a linear regression of yield on all features with its residual
+    spread and observed yield range.
+
+    Args:
+        df: Dataset in the raw layout (as load_dataset returns it)
+
+    Returns:
+        JSON-serializable profile dict
+    """
+    categories = {col: sorted(df[col].astype(str).unique()) for col in CATEGORICAL_COLS}
+    levels = np.linspace(0, 1, SYNTHETIC_QUANTILES)
+    crops = df['Crop'].astype(str)
+
+    by_crop = {}
+    for crop in categories['Crop']:
+        group = df[crops == crop]
+        design = _yield_design(group, categories)
+        target = group[TARGET_COL].to_numpy(dtype=np.float64)
+        coef = np.linalg.lstsq(design, target, rcond=None)[0]
+
+        by_crop[crop] = {
+            'categories': {col: group[col].astype(str).value_counts(normalize=True)
+                           .reindex(categories[col], fill_value=0.0).tolist()
+                           for col in _CONDITIONED},
+            'flags': {col: float(group[col].astype(bool).mean()) for col in BOOLEAN_COLS},
+            'quantiles': {col: np.quantile(group[col].astype(float), levels).tolist()
+                          for col in NUMERIC_COLS},
+            'yield': {'coef': coef.tolist(), 'sigma': float(np.std(target - design @ coef)),
+                      'min': float(target.min()), 'max': float(target.max())}
+        }
+
+    return {
+        'rows': len(df),
+        'categories': categories,
+        'crop_freq': crops.value_counts(normalize=True).reindex(categories['Crop'], fill_value=0.0).tolist(),
+        'by_crop': by_crop
+    }
+
+
+def generate_chunk(profile: Dict[str, Any], n: int, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Draw n records from a fitted profile
+
+    Returns:
+        DataFrame in the dataset layout; categorical columns use the
+        pandas category dtype
+    """
+    categories = profile['categories']
+    crop_codes = rng.choice(len(categories['Crop']), size=n, p=profile['crop_freq'])
+
+    codes = {col: np.zeros(n, dtype=np.int8) for col in _CONDITIONED}
+    values = {col: np.zeros(n) for col in NUMERIC_COLS + BOOLEAN_COLS + [TARGET_COL]}
+    levels = np.linspace(0, 1, SYNTHETIC_QUANTILES)
+
+    for k, crop in enumerate(categories['Crop']):
+        idx = np.flatnonzero(crop_codes == k)
+        if not len(idx):
+            continue
+        fit = profile['by_crop'][crop]
+        m = len(idx)
+
+        for col in _CONDITIONED:
+            codes[col][idx] = rng.choice(len(categories[col]), size=m, p=fit['categories'][col])
+        for col in BOOLEAN_COLS:
+            values[col][idx] = rng.random(m) < fit['flags'][col]
+        for col in NUMERIC_COLS:
+            drawn = np.interp(rng.random(m), levels, fit['quantiles'][col])
+            values[col][idx] = np.round(drawn) if col in INTEGER_COLS else drawn
+
+        group = pd.DataFrame({col: values[col][idx] for col in NUMERIC_COLS + BOOLEAN_COLS})
+        for col in _CONDITIONED:
+            group[col] = np.asarray(categories[col], dtype=object)[codes[col][idx]]
+        mean = _yield_design(group, categories) @ np.asarray(fit['yield']['coef'])
+        noisy = mean + rng.normal(0.0, fit['yield']['sigma'], m)
+        values[TARGET_COL][idx] = np.clip(noisy, fit['yield']['min'], fit['yield']['max'])
+
+    frame = {}
+    for col in COLUMNS:
+        if col == 'Crop':
+            frame[col] = pd.Categorical.from_codes(crop_codes, categories['Crop'])
+        elif col in _CONDITIONED:
+            frame[col] = pd.Categorical.from_codes(codes[col], categories[col])
+        elif col in BOOLEAN_COLS:
+            frame[col] = values[col].astype(bool)
+        elif col in INTEGER_COLS:
+            frame[col] = values[col].astype(np.int64)
+        else:
+            frame[col] = values[col]
+    return pd.DataFrame(frame)
+
+
+def iter_synthetic(profile: Dict[str, Any], rows: int, seed: int = RANDOM_STATE,
+                   chunk_rows: int = SYNTHETIC_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Generate `rows` records chunk by chunk
+
+    Chunk i is drawn from its own generator seeded with (seed, i), so the
+    output for a given seed, size and chunk size is identical on every run
+    and machine, and chunks could be generated in any order.
+    """
+    for i, start in enumerate(range(0, rows, chunk_rows)):
+        rng = np.random.default_rng([seed, i])
+        yield generate_chunk(profile, min(chunk_rows, rows - start), rng)
+
+
+def format_csv_chunk(chunk: pd.DataFrame) -> bytes:
+    """
+    Records as dataset CSV lines (; separated, decimal commas, TRUE/FALSE)
+
+    Formatting is done column-wise in Arrow and the lines are taken
+    straight from the resulting string buffer.
+    """
+    fields = []
+    for col in COLUMNS:
+        values = chunk[col]
+        if col in BOOLEAN_COLS:
+            fields.append(pa.array(np.where(values.to_numpy(), 'TRUE', 'FALSE')))
+        elif col in CATEGORICAL_COLS:
+            fields.append(pa.array(values).dictionary_decode())
+        elif col in INTEGER_COLS:
+            fields.append(pc.cast(pa.array(values), pa.string()))
+        else:
+            text = pc.cast(pc.round(pa.array(values), 6), pa.string())
+            fields.append(pc.replace_substring(text, '.', ','))
+
+    fields = [pc.cast(field, pa.string()) for field in fields]
+    lines = pc.binary_join_element_wise(*fields, ';')
+    lines = pc.binary_join_element_wise(lines, pa.scalar('\n'), '')
+    _, offsets, data = lines.buffers()
+    offsets = np.frombuffer(offsets, dtype=np.int32)[lines.offset:lines.offset + len(lines) + 1]
+    return data.slice(offsets[0], offsets[-1] - offsets[0]).to_pybytes()
+
+
+def write_csv(chunks: Iterator[pd.DataFrame], path: str) -> int:
+    """Stream chunks to a dataset-dialect CSV; returns rows written"""
+    rows = 0
+    with open(path, 'wb') as f:
+        f.write((';'.join(COLUMNS) + '\n').encode())
+        for chunk in chunks:
+            f.write(format_csv_chunk(chunk))
+            rows += len(chunk)
+    return rows
+
+
+def write_parquet(chunks: Iterator[pd.DataFrame], path: str) -> int:
+    """Stream chunks to one Parquet file, one row group per chunk; returns rows written"""
+    rows, writer = 0, None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
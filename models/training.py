@@ -0,0 +1,653 @@
+"""
+Model training pipeline
+"""
+import os
+import json
+import math
+import time
+import itertools
+import shutil
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from joblib import Parallel, delayed
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold, ShuffleSplit
+from sklearn.tree import DecisionTreeRegressor
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Get paths and training settings from config
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from config.settings import (
+    X_TRAIN_PATH, X_TEST_PATH, Y_TRAIN_PATH, Y_TEST_PATH,
+    MODEL_PATHS, NUMERIC_COLS, INTEGER_COLS, BOOLEAN_COLS, METRICS_PATH, BEST_PARAMS_PATH,
+    RANDOM_STATE, XGB_PARAM_GRID, CV_FOLDS, EARLY_STOPPING_ROUNDS, EARLY_STOPPING_FRACTION,
+    HALVING_ETA, BAYES_TRIALS, BAYES_INITIAL,
+    DATASET_PATH, UPDATE_MAX_ROUNDS, UPDATE_VALID_FRACTION
+)
+from utils.helpers import calculate_metrics
+
+
+def load_training_data() -> Dict[str, Any]:
+    """
+    Read the encoded train/test splits once
+
+    Returns:
+        Dict with X_train, X_test DataFrames and y_train, y_test arrays
+    """
+    return {
+        'X_train': pd.read_csv(X_TRAIN_PATH),
+        'X_test': pd.read_csv(X_TEST_PATH),
+        'y_train': pd.read_csv(Y_TRAIN_PATH).values.ravel(),
+        'y_test': pd.read_csv(Y_TEST_PATH).values.ravel()
+    }
+
+
+def synthetic_training_data(data: Dict[str, Any], rows: int, seed: int = RANDOM_STATE) -> Dict[str, Any]:
+    """
+    Large synthetic stand-in for the encoded splits, for benchmarks
+
+    Rows are resampled from X_train with numeric features redrawn
+    uniformly over their observed range, and labelled by the committed
+    XGBoost model plus noise matching its test residuals. A further 20%
+    of rows is generated as the test split.
+
+    Args:
+        data: Splits from load_training_data
+        rows: Number of training rows
+        seed: Random seed
+
+    Returns:
+        Dict with the same keys as load_training_data (float32 features)
+    """
+    model = xgb.XGBRegressor()
+    model.load_model(MODEL_PATHS['XGBoost'])
+    sigma = np.std(data['y_test'] - model.predict(data['X_test']))
+
+    source = data['X_train']
+    rng = np.random.default_rng(seed)
+    n_total = int(rows * 1.25)
+    picks = rng.integers(0, len(source), n_total)
+    X = pd.DataFrame({col: source[col].to_numpy(np.float32)[picks] for col in source.columns})
+    for col in NUMERIC_COLS:
+        low, high = source[col].min(), source[col].max()
+        if col in INTEGER_COLS:
+            X[col] = rng.integers(low, high + 1, n_total).astype(np.float32)
+        else:
+            X[col] = rng.uniform(low, high, n_total).astype(np.float32)
+
+    y = model.predict(X) + rng.normal(0, sigma, n_total).astype(np.float32)
+    return {'X_train': X.iloc[:rows], 'y_train': y[:rows],
+            'X_test': X.iloc[rows:], 'y_test': y[rows:]}
+
+
+def resolve_cpu_budget(n_jobs: int) -> int:
+    """Number of CPUs to use; n_jobs <= 0 means all available"""
+    available = os.cpu_count() or 1
+    return available if n_jobs <= 0 else min(n_jobs, available)
+
+
+def split_cpu_budget(n_jobs: int, n_tasks: int) -> Tuple[int, int]:
+    """
+    Split a CPU budget into concurrent workers x threads per worker
+
+    Independent configs parallelize better than XGBoost's per-tree threads
+    on small data, so workers take the budget first.
+    """
+    workers = max(1, min(n_jobs, n_tasks))
+    return workers, max(1, n_jobs // workers)
+
+
+def build_cv_folds(X: pd.DataFrame, y: np.ndarray, n_splits: int = CV_FOLDS,
+                   seed: int = RANDOM_STATE, max_bin: int = 256) -> List[Dict[str, Any]]:
+    """
+    Quantize every CV fold once for reuse across all configs
+
+    Each training fold gives up an EARLY_STOPPING_FRACTION share as the
+    early-stopping set; the validation fold is only scored, so choosing
+    the best round does not inflate its R².
+
+    Args:
+        X: Training features
+        y: Training target
+        n_splits: Number of folds; 1 means a single 80/20 holdout split
+            (for data too large to cross-validate)
+        seed: Shuffle seed
+        max_bin: Histogram bins (must match the training params)
+
+    Returns:
+        List of dicts with dtrain, dstop (early stopping), dvalid and
+        y_valid per fold
+    """
+    if n_splits > 1:
+        splitter = KFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    else:
+        splitter = ShuffleSplit(n_splits=1, test_size=0.2, random_state=seed)
+
+    rng = np.random.default_rng(seed)
+    folds = []
+    for train_idx, valid_idx in splitter.split(X):
+        stop_mask = rng.random(len(train_idx)) < EARLY_STOPPING_FRACTION
+        fit_idx, stop_idx = train_idx[~stop_mask], train_idx[stop_mask]
+        dtrain = xgb.QuantileDMatrix(X.iloc[fit_idx], y[fit_idx], max_bin=max_bin)
+        dstop = xgb.QuantileDMatrix(X.iloc[stop_idx], y[stop_idx], ref=dtrain)
+        dvalid = xgb.QuantileDMatrix(X.iloc[valid_idx], y[valid_idx], ref=dtrain)
+        folds.append({'dtrain': dtrain, 'dstop': dstop, 'dvalid': dvalid, 'y_valid': y[valid_idx]})
+    return folds
+
+
+def expand_grid(param_grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """All combinations of a parameter grid, without n_estimators"""
+    grid = {k: v for k, v in param_grid.items() if k != 'n_estimators'}
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def booster_params(config: Dict[str, Any], threads: int = 1, seed: int = RANDOM_STATE,
+                   max_bin: int = 256) -> Dict[str, Any]:
+    """xgb.train parameters for a search config (XGBRegressor names accepted)"""
+    params = {'objective': 'reg:squarederror', 'tree_method': 'hist', 'max_bin': max_bin,
+              'seed': seed, 'nthread': threads}
+    for key, value in config.items():
+        if key == 'learning_rate':
+            key = 'eta'
+        if key != 'n_estimators':
+            params[key] = value
+    return params
+
+
+def evaluate_config(config: Dict[str, Any], folds: List[Dict[str, Any]], checkpoints: List[int],
+                    early_stopping_rounds: Optional[int] = EARLY_STOPPING_ROUNDS,
+                    threads: int = 1, seed: int = RANDOM_STATE) -> List[Dict[str, Any]]:
+    """
+    Cross-validate one config at several n_estimators checkpoints
+
+    Boosting is sequential, so the first n trees of a longer run are the
+    model n_estimators=n would train; one run per fold scores every
+    checkpoint. Training stops early once the fold's early-stopping set
+    has not improved for early_stopping_rounds, and later checkpoints are
+    scored on the validation fold at the best iteration.
+
+    Returns:
+        One result per checkpoint: params (with n_estimators), cv_r2 and
+        rounds (mean boosting rounds actually used)
+    """
+    scores = np.zeros((len(folds), len(checkpoints)))
+    rounds = np.zeros((len(folds), len(checkpoints)))
+
+    for i, fold in enumerate(folds):
+        booster = xgb.train(
+            booster_params(config, threads, seed), fold['dtrain'],
+            num_boost_round=max(checkpoints),
+            evals=[(fold['dstop'], 'stop')],
+            early_stopping_rounds=early_stopping_rounds,
+            verbose_eval=False
+        )
+        best = booster.best_iteration + 1 if early_stopping_rounds else booster.num_boosted_rounds()
+        for j, n in enumerate(checkpoints):
+            rounds[i, j] = min(n, best)
+            pred = booster.predict(fold['dvalid'], iteration_range=(0, int(rounds[i, j])))
+            scores[i, j] = r2_score(fold['y_valid'], pred)
+
+    return [{
+        'params': {**config, 'n_estimators': n},
+        'cv_r2': float(scores[:, j].mean()),
+        'rounds': float(rounds[:, j].mean())
+    } for j, n in enumerate(checkpoints)]
+
+
+def grid_search(folds: List[Dict[str, Any]], param_grid: Dict[str, List[Any]] = XGB_PARAM_GRID,
+                n_jobs: int = -1, early_stopping_rounds: Optional[int] = EARLY_STOPPING_ROUNDS,
+                seed: int = RANDOM_STATE) -> pd.DataFrame:
+    """
+    Exhaustive search over a parameter grid under a CPU budget
+
+    Configs run concurrently on threads (xgb.train releases the GIL), so
+    every worker shares the same quantized fold matrices.
+
+    Returns:
+        One row per (config, n_estimators) with cv_r2, rounds and elapsed
+        (seconds into the search when the score was known), best first
+    """
+    configs = expand_grid(param_grid)
+    checkpoints = sorted(param_grid.get('n_estimators', [100]))
+    workers, threads = split_cpu_budget(resolve_cpu_budget(n_jobs), len(configs))
+    start = time.perf_counter()
+
+    def run(config):
+        results = evaluate_config(config, folds, checkpoints, early_stopping_rounds, threads, seed)
+        return [{**r, 'elapsed': time.perf_counter() - start} for r in results]
+
+    results = Parallel(n_jobs=workers, backend='threading')(delayed(run)(c) for c in configs)
+    return _results_frame([r for result in results for r in result])
+
+
+def _results_frame(results: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Flatten search results into one row per evaluation, best first"""
+    rows = [{**r['params'], **{k: v for k, v in r.items() if k != 'params'}} for r in results]
+    return pd.DataFrame(rows).sort_values('cv_r2', ascending=False, ignore_index=True)
+
+
+def _advance(config: Dict[str, Any], state: Dict[str, Any], folds: List[Dict[str, Any]],
+             rounds: int, early_stopping_rounds: Optional[int], threads: int,
+             seed: int) -> Dict[str, Any]:
+    """
+    Continue boosting a config's per-fold models up to `rounds` and score them
+
+    Fold models resume from where the previous call left them (xgb_model
+    warm start), and folds that already stopped early are not trained again.
+
+    Args:
+        state: Per-config dict holding 'boosters' and 'stopped' lists
+            (filled on the first call)
+
+    Returns:
+        Result dict with params, cv_r2, rounds and converged (every fold
+        stopped early)
+    """
+    params = booster_params(config, threads, seed)
+    boosters = state.setdefault('boosters', [None] * len(folds))
+    stopped = state.setdefault('stopped', [False] * len(folds))
+    scores, used = [], []
+
+    for i, fold in enumerate(folds):
+        booster = boosters[i]
+        done = booster.num_boosted_rounds() if booster is not None else 0
+        if not stopped[i] and rounds > done:
+            booster = xgb.train(
+                params, fold['dtrain'],
+                num_boost_round=rounds - done,
+                evals=[(fold['dstop'], 'stop')],
+                early_stopping_rounds=early_stopping_rounds,
+                verbose_eval=False,
+                xgb_model=booster
+            )
+            boosters[i] = booster
+            stopped[i] = booster.num_boosted_rounds() < rounds
+
+        best = booster.best_iteration + 1 if early_stopping_rounds else booster.num_boosted_rounds()
+        pred = booster.predict(fold['dvalid'], iteration_range=(0, best))
+        scores.append(r2_score(fold['y_valid'], pred))
+        used.append(best)
+
+    return {
+        'params': {**config, 'n_estimators': rounds},
+        'cv_r2': float(np.mean(scores)),
+        'rounds': float(np.mean(used)),
+        'converged': all(stopped)
+    }
+
+
+def halving_schedule(n_configs: int, max_rounds: int, eta: int = HALVING_ETA) -> List[int]:
+    """Boosting rounds per rung, e.g. 27 configs, 300 rounds, eta 3 -> [11, 33, 100, 300]"""
+    n_rungs = int(math.floor(math.log(max(n_configs, 1), eta) + 1e-9)) + 1
+    return [max(1, int(round(max_rounds / eta ** (n_rungs - 1 - k)))) for k in range(n_rungs)]
+
+
+def successive_halving(folds: List[Dict[str, Any]], param_grid: Dict[str, List[Any]] = XGB_PARAM_GRID,
+                       n_jobs: int = -1, early_stopping_rounds: Optional[int] = EARLY_STOPPING_ROUNDS,
+                       seed: int = RANDOM_STATE, eta: int = HALVING_ETA) -> pd.DataFrame:
+    """
+    Successive halving over the grid with boosting rounds as the budget
+
+    Every config starts with a few rounds; after each rung only the best
+    1/eta continue, resuming their fold models with eta times more rounds,
+    up to max(n_estimators). Early stopping still applies inside each rung.
+
+    Returns:
+        One row per (config, rung) evaluation, with the columns of
+        grid_search plus rung
+    """
+    configs = expand_grid(param_grid)
+    schedule = halving_schedule(len(configs), max(param_grid.get('n_estimators', [100])), eta)
+    budget = resolve_cpu_budget(n_jobs)
+    states = [{} for _ in configs]
+    alive = list(range(len(configs)))
+    start = time.perf_counter()
+    results = []
+
+    for rung, rounds in enumerate(schedule):
+        workers, threads = split_cpu_budget(budget, len(alive))
+
+        def run(c):
+            result = _advance(configs[c], states[c], folds, rounds, early_stopping_rounds, threads, seed)
+            return {**result, 'rung': rung, 'elapsed': time.perf_counter() - start}
+
+        rung_results = Parallel(n_jobs=workers, backend='threading')(delayed(run)(c) for c in alive)
+        results.extend(rung_results)
+
+        ranked = sorted(zip(alive, rung_results), key=lambda cr: cr[1]['cv_r2'], reverse=True)
+        alive = [c for c, _ in ranked[:max(1, len(alive) // eta)]]
+
+    return _results_frame(results)
+
+
+def _encode_configs(configs: List[Dict[str, Any]], param_grid: Dict[str, List[Any]]) -> np.ndarray:
+    """Map configs to [0, 1]^d by each value's rank within its grid axis"""
+    axes = {k: sorted(v) for k, v in param_grid.items() if k != 'n_estimators'}
+    return np.array([[axes[k].index(c[k]) / max(len(axes[k]) - 1, 1) for k in axes]
+                     for c in configs], dtype=float)
+
+
+def _expected_improvement(mean: np.ndarray, std: np.ndarray, best: float) -> np.ndarray:
+    """Expected improvement over `best` for a maximization problem"""
+    from scipy.stats import norm
+
+    std = np.maximum(std, 1e-9)
+    z = (mean - best) / std
+    return (mean - best) * norm.cdf(z) + std * norm.pdf(z)
+
+
+def bayesian_search(folds: List[Dict[str, Any]], param_grid: Dict[str, List[Any]] = XGB_PARAM_GRID,
+                    n_jobs: int = -1, early_stopping_rounds: Optional[int] = EARLY_STOPPING_ROUNDS,
+                    seed: int = RANDOM_STATE, n_trials: int = BAYES_TRIALS,
+                    n_initial: int = BAYES_INITIAL) -> pd.DataFrame:
+    """
+    Gaussian-process guided search over the grid with partial-round pruning
+
+    After n_initial seeded random configs, each trial picks the untried
+    config with the highest expected improvement under a GP fitted to the
+    CV scores so far. Every trial first boosts to a third of the round
+    budget; if it is then below the median of earlier trials at that point
+    it is pruned, otherwise it resumes to the full budget. Trials run one
+    after another, each using the whole CPU budget.
+
+    Returns:
+        One row per trial stage, with the columns of grid_search plus
+        trial and pruned
+    """
+    from sklearn.gaussian_process import GaussianProcessRegressor
+    from sklearn.gaussian_process.kernels import Matern, WhiteKernel
+
+    configs = expand_grid(param_grid)
+    encoded = _encode_configs(configs, param_grid)
+    max_rounds = max(param_grid.get('n_estimators', [100]))
+    checkpoint = max(1, max_rounds // 3)
+    threads = resolve_cpu_budget(n_jobs)
+
+    rng = np.random.default_rng(seed)
+    order = list(rng.permutation(len(configs))[:n_initial])
+    tried, observed, partial_scores = [], [], []
+    start = time.perf_counter()
+    results = []
+
+    for trial in range(min(n_trials, len(configs))):
+        if trial < len(order):
+            c = int(order[trial])
+        else:
+            gp = GaussianProcessRegressor(kernel=Matern(nu=2.5) + WhiteKernel(1e-4),
+                                          normalize_y=True, random_state=seed)
+            gp.fit(encoded[tried], observed)
+            untried = [i for i in range(len(configs)) if i not in tried]
+            mean, std = gp.predict(encoded[untried], return_std=True)
+            c = untried[int(np.argmax(_expected_improvement(mean, std, max(observed))))]
+
+        state = {}
+        partial = _advance(configs[c], state, folds, checkpoint, early_stopping_rounds, threads, seed)
+        pruned = bool(partial_scores) and partial['cv_r2'] < np.median(partial_scores)
+        partial_scores.append(partial['cv_r2'])
+        results.append({**partial, 'trial': trial, 'pruned': pruned,
+                        'elapsed': time.perf_counter() - start})
+
+        final = partial
+        if not pruned and not partial['converged'] and checkpoint < max_rounds:
+            final = _advance(configs[c], state, folds, max_rounds, early_stopping_rounds, threads, seed)
+            results.append({**final, 'trial': trial, 'pruned': False,
+                            'elapsed': time.perf_counter() - start})
+
+        tried.append(c)
+        observed.append(final['cv_r2'])
+
+    return _results_frame(results)
+
+
+SEARCH_MODES = {
+    'grid': grid_search,
+    'halving': successive_halving,
+    'bayes': bayesian_search
+}
+
+
+def best_params(results: pd.DataFrame, param_grid: Dict[str, List[Any]] = XGB_PARAM_GRID) -> Dict[str, Any]:
+    """
+    Winning config of a search result frame as plain Python values
+
+    n_estimators is the number of rounds the CV score was measured at,
+    which early stopping may have cut below the grid value.
+    """
+    # Per-column access keeps integer params integer
+    params = {k: results[k].iloc[0].item() for k in param_grid}
+    params['n_estimators'] = int(round(results['rounds'].iloc[0]))
+    return params
+
+
+def fit_xgboost(X: pd.DataFrame, y: np.ndarray, params: Dict[str, Any],
+                n_jobs: int = -1, seed: int = RANDOM_STATE) -> xgb.XGBRegressor:
+    """Refit the chosen XGBoost config on the full training split"""
+    model = xgb.XGBRegressor(**params, random_state=seed, n_jobs=resolve_cpu_budget(n_jobs))
+    model.fit(X, y)
+    return model
+
+
+def fit_decision_tree(X: pd.DataFrame, y: np.ndarray, seed: int = RANDOM_STATE) -> DecisionTreeRegressor:
+    """Fit the baseline Decision Tree"""
+    model = DecisionTreeRegressor(random_state=seed)
+    model.fit(X, y)
+    return model
+
+
+def evaluate_models(models: Dict[str, Any], X_test: pd.DataFrame, y_test: np.ndarray) -> pd.DataFrame:
+    """Test-set metrics in the model_comparison.csv layout"""
+    rows = []
+    for name, model in models.items():
+        metrics = calculate_metrics(y_test, model.predict(X_test))
+        rows.append({'Model': name, 'R²': metrics['R2'], 'MAE': metrics['MAE'],
+                     'RMSE': metrics['RMSE'], 'MAPE': metrics['MAPE']})
+    return pd.DataFrame(rows)
+
+
+def _tmp_path(path: str) -> str:
+    """Temporary sibling path that keeps the extension (XGBoost picks the format from it)"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.tmp{ext}"
+
+
+def save_artifacts(models: Dict[str, Any], metrics: pd.DataFrame,
+                   search: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    Write models, metrics and the search summary atomically
+
+    Everything is written to temporary files first and only then renamed
+    into place, so each file is replaced atomically and the app never loads
+    a half-written one. The files are renamed one by one: a rerun between
+    two renames can still pair a new file with an old one.
+
+    Args:
+        models: Dict mapping MODEL_PATHS names to fitted models
+        metrics: Test-set metrics (see evaluate_models)
+        search: Best params with search metadata, written to BEST_PARAMS_PATH
+
+    Returns:
+        Paths written
+    """
+    pending = []
+
+    for name, model in models.items():
+        path = MODEL_PATHS[name]
+        tmp = _tmp_path(path)
+        if isinstance(model, xgb.XGBModel):
+            model.save_model(tmp)
+        else:
+            joblib.dump(model, tmp)
+        pending.append((tmp, path))
+
+    tmp = _tmp_path(METRICS_PATH)
+    metrics.to_csv(tmp, index=False)
+    pending.append((tmp, METRICS_PATH))
+
+    if search is not None:
+        tmp = _tmp_path(BEST_PARAMS_PATH)
+        with open(tmp, 'w') as f:
+            json.dump(search, f, indent=2)
+        pending.append((tmp, BEST_PARAMS_PATH))
+
+    for tmp, path in pending:
+        os.replace(tmp, path)
+    return [path for _, path in pending]
+
+
+def read_records(path: str) -> pd.DataFrame:
+    """Read raw harvest records in the dataset's CSV dialect (; separated, decimal commas)"""
+    return pd.read_csv(path, sep=';', decimal=',')
+
+
+def _tree_depth(booster: xgb.Booster) -> int:
+    """Deepest leaf of any tree (text dumps indent one tab per level)"""
+    depth = 0
+    for tree in booster.get_dump():
+        for line in tree.splitlines():
+            if 'leaf=' in line:
+                depth = max(depth, len(line) - len(line.lstrip('\t')))
+    return depth
+
+
+def saved_params(booster: xgb.Booster) -> Dict[str, Any]:
+    """
+    XGBRegressor parameters of a saved model
+
+    The JSON model file does not keep its training parameters, so they come
+    from best_params.json, with max_depth read off the trees if missing.
+    """
+    config = {}
+    if os.path.exists(BEST_PARAMS_PATH):
+        with open(BEST_PARAMS_PATH) as f:
+            config = {k: v for k, v in json.load(f)['params'].items() if k in XGB_PARAM_GRID}
+    config.setdefault('max_depth', _tree_depth(booster))
+    config['n_estimators'] = booster.num_boosted_rounds()
+    return config
+
+
+def update_params(booster: xgb.Booster, threads: int = 1, seed: int = RANDOM_STATE) -> Dict[str, Any]:
+    """xgb.train parameters for continuing a saved model"""
+    return booster_params(saved_params(booster), threads, seed)
+
+
+def update_xgboost(booster: xgb.Booster, X_new: pd.DataFrame, y_new: np.ndarray,
+                   mode: str = 'continue', max_rounds: int = UPDATE_MAX_ROUNDS,
+                   X_old: Optional[pd.DataFrame] = None, y_old: Optional[np.ndarray] = None,
+                   n_jobs: int = -1, seed: int = RANDOM_STATE) -> Tuple[xgb.Booster, Dict[str, Any]]:
+    """
+    Update a trained XGBoost model with new records instead of retraining
+
+    'continue' adds trees fitted to the new records only (xgb_model warm
+    start). 'refit' first refreshes every existing leaf value on the old and
+    new records together, keeping the tree structure, then adds trees on
+    both. Either way at most max_rounds trees are added, early-stopped on a
+    UPDATE_VALID_FRACTION slice of the new records, and trees past the best
+    round are dropped.
+
+    Args:
+        booster: Current model (not modified)
+        X_new: New records, encoded in the training column layout
+        y_new: New targets
+        mode: 'continue' or 'refit'
+        max_rounds: Most trees to add
+        X_old: Existing training features (required for 'refit')
+        y_old: Existing training target (required for 'refit')
+        n_jobs: CPU budget
+        seed: Seed for the validation slice and row sampling
+
+    Returns:
+        Updated booster and a dict with mode, trees_before, trees_added
+        and rows
+    """
+    if mode not in ('continue', 'refit'):
+        raise ValueError(f"Unknown update mode: {mode}")
+    if mode == 'refit' and X_old is None:
+        raise ValueError("Refit mode needs the existing training data")
+
+    params = update_params(booster, resolve_cpu_budget(n_jobs), seed)
+    trees_before = booster.num_boosted_rounds()
+
+    splitter = ShuffleSplit(n_splits=1, test_size=UPDATE_VALID_FRACTION, random_state=seed)
+    fit_idx, valid_idx = next(splitter.split(X_new))
+    X_fit, y_fit = X_new.iloc[fit_idx], y_new[fit_idx]
+    if mode == 'refit':
+        X_fit = pd.concat([X_old, X_fit], ignore_index=True)
+        y_fit = np.concatenate([y_old, y_fit])
+
+    dtrain = xgb.DMatrix(X_fit, y_fit)
+    dvalid = xgb.DMatrix(X_new.iloc[valid_idx], y_new[valid_idx])
+
+    # Work on a copy so the caller's model stays usable if the update is rejected
+    model = booster.copy()
+    if mode == 'refit':
+        refresh = {**params, 'process_type': 'update', 'updater': 'refresh', 'refresh_leaf': True}
+        with warnings.catch_warnings():
+            # XGBoost warns that an explicit updater overrides tree_method, which is the point
+            warnings.simplefilter('ignore', UserWarning)
+            model = xgb.train(refresh, dtrain, num_boost_round=trees_before, xgb_model=model)
+
+    if max_rounds > 0:
+        model = xgb.train(params, dtrain, num_boost_round=max_rounds,
+                          evals=[(dvalid, 'valid')], early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+                          verbose_eval=False, xgb_model=model)
+        # best_iteration counts from the first tree of the original model
+        model = model[:max(model.best_iteration + 1, trees_before)]
+
+    return model, {
+        'mode': mode,
+        'trees_before': trees_before,
+        'trees_added': model.num_boosted_rounds() - trees_before,
+        'rows': len(y_fit)
+    }
+
+
+def as_regressor(booster: xgb.Booster) -> xgb.XGBRegressor:
+    """Wrap a booster as the XGBRegressor load_models returns"""
+    model = xgb.XGBRegressor()
+    model.load_model(bytearray(booster.save_raw(raw_format='json')))
+    return model
+
+
+def _append_csv(path: str, frame: pd.DataFrame, **kwargs) -> str:
+    """Copy a CSV to its temporary path and append rows to the copy, keeping existing lines byte for byte"""
+    tmp = _tmp_path(path)
+    shutil.copyfile(path, tmp)
+    with open(tmp, 'a', newline='') as f:
+        frame.to_csv(f, header=False, index=False, **kwargs)
+    return tmp
+
+
+def append_records(raw: pd.DataFrame, X_new: pd.DataFrame, y_new: np.ndarray) -> List[str]:
+    """
+    Append new records to the dataset and the training split atomically
+
+    The held-out test split is left alone so later updates are validated
+    against the same records.
+
+    Args:
+        raw: New records in the dataset layout
+        X_new: The same records encoded in the training column layout
+        y_new: Their targets
+
+    Returns:
+        Paths written
+    """
+    # The dataset spells booleans TRUE/FALSE
+    raw = raw.copy()
+    for col in BOOLEAN_COLS:
+        raw[col] = np.where(raw[col].astype(bool), 'TRUE', 'FALSE')
+    pending = [
+        (_append_csv(DATASET_PATH, raw, sep=';', decimal=','), DATASET_PATH),
+        (_append_csv(X_TRAIN_PATH, X_new), X_TRAIN_PATH),
+        (_append_csv(Y_TRAIN_PATH, pd.DataFrame({'y': y_new})), Y_TRAIN_PATH)
+    ]
+
+    for tmp, path in pending:
+        os.replace(tmp, path)
+    return [path for _, path in pending]
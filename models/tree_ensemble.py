@@ -0,0 +1,226 @@
+"""
+Tree ensemble structure utilities
+"""
+import copy
+import json
+import numpy as np
+import xgboost as xgb
+from typing import Any, Dict
+
+
+def get_booster(model: Any) -> xgb.Booster:
+    """Return the underlying Booster of an XGBoost model"""
+    return model.get_booster() if hasattr(model, 'get_booster') else model
+
+
+def parse_booster(booster: xgb.Booster) -> Dict[str, Any]:
+    """
+    Flatten every tree of a booster into padded node arrays
+
+    Node ids are the ones returned by `predict(..., pred_leaf=True)`, so
+    any per-node array can be indexed directly with a leaf-index matrix.
+
+    Args:
+        booster: Trained XGBoost Booster
+
+    Returns:
+        Dict with (n_trees, max_nodes) arrays: left, right, feature,
+        threshold, default_left, is_leaf, value; plus base_score and
+        feature_names
+    """
+    model_json = json.loads(booster.save_raw('json'))
+    learner = model_json['learner']
+    trees = learner['gradient_booster']['model']['trees']
+
+    n_trees = len(trees)
+    max_nodes = max(int(t['tree_param']['num_nodes']) for t in trees)
+
+    left = np.full((n_trees, max_nodes), -1, dtype=np.int32)
+    right = np.full((n_trees, max_nodes), -1, dtype=np.int32)
+    feature = np.full((n_trees, max_nodes), -1, dtype=np.int32)
+    threshold = np.zeros((n_trees, max_nodes), dtype=np.float32)
+    default_left = np.zeros((n_trees, max_nodes), dtype=bool)
+    value = np.zeros((n_trees, max_nodes), dtype=np.float32)
+
+    for i, tree in enumerate(trees):
+        n = int(tree['tree_param']['num_nodes'])
+        left[i, :n] = tree['left_children']
+        right[i, :n] = tree['right_children']
+        feature[i, :n] = tree['split_indices']
+        threshold[i, :n] = tree['split_conditions']
+        default_left[i, :n] = np.asarray(tree['default_left'], dtype=bool)
+        # For leaves, split_conditions holds the leaf weight
+        value[i, :n] = tree['split_conditions']
+
+    is_leaf = left == -1
+    value[~is_leaf] = 0.0
+
+    # base_score is stored as "[4.65E0]" (xgboost >= 2) or "4.65E0"
+    base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+
+    return {
+        'left': left,
+        'right': right,
+        'feature': feature,
+        'threshold': threshold,
+        'default_left': default_left,
+        'is_leaf': is_leaf,
+        'value': value,
+        'base_score': base_score,
+        'feature_names': booster.feature_names,
+        'n_trees': n_trees,
+    }
+
+
+def parse_sklearn_tree(model: Any) -> Dict[str, Any]:
+    """
+    Flatten a fitted scikit-learn regression tree into parse_booster's layout
+
+    scikit-learn sends float32(x) <= t left while XGBoost sends x < t left;
+    thresholds become the smallest float32 above t so both share the strict
+    "<" convention.
+
+    Args:
+        model: Fitted DecisionTreeRegressor
+
+    Returns:
+        Dict with the same keys as parse_booster (a single tree)
+    """
+    tree = model.tree_
+    is_leaf = tree.children_left == -1
+    threshold = tree.threshold.astype(np.float32)
+    below = threshold <= tree.threshold
+    threshold[below] = np.nextafter(threshold[below], np.float32(np.inf))
+    threshold[is_leaf] = 0.0
+
+    return {
+        'left': tree.children_left.astype(np.int32)[None, :],
+        'right': tree.children_right.astype(np.int32)[None, :],
+        'feature': np.where(is_leaf, -1, tree.feature).astype(np.int32)[None, :],
+        'threshold': threshold[None, :],
+        'default_left': np.zeros((1, tree.node_count), dtype=bool),
+        'is_leaf': is_leaf[None, :],
+        'value': np.where(is_leaf, tree.value[:, 0, 0], 0.0).astype(np.float32)[None, :],
+        'base_score': 0.0,
+        'feature_names': list(getattr(model, 'feature_names_in_', range(tree.n_features))),
+        'n_trees': 1,
+    }
+
+
+def parse_model(model: Any) -> Dict[str, Any]:
+    """Parse an XGBoost model or scikit-learn tree into flat node arrays"""
+    if hasattr(model, 'get_booster') or isinstance(model, xgb.Booster):
+        return parse_booster(get_booster(model))
+    return parse_sklearn_tree(model)
+
+
+def leaf_boxes(parsed: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Feature-space box of every leaf
+
+    A row reaches a leaf iff lower <= x < upper on every feature.
+
+    Args:
+        parsed: Output of parse_model
+
+    Returns:
+        Dict with per-leaf tree, value, lower and upper (n_leaves, n_features)
+        arrays; leaves are ordered by tree
+    """
+    n_features = len(parsed['feature_names'])
+    trees, values, lowers, uppers = [], [], [], []
+
+    for t in range(parsed['n_trees']):
+        stack = [(0, np.full(n_features, -np.inf), np.full(n_features, np.inf))]
+        while stack:
+            node, lower, upper = stack.pop()
+            if parsed['is_leaf'][t, node]:
+                trees.append(t)
+                values.append(parsed['value'][t, node])
+                lowers.append(lower)
+                uppers.append(upper)
+                continue
+
+            f, thr = parsed['feature'][t, node], parsed['threshold'][t, node]
+            left_upper = upper.copy()
+            left_upper[f] = min(upper[f], thr)
+            right_lower = lower.copy()
+            right_lower[f] = max(lower[f], thr)
+            stack.append((parsed['left'][t, node], lower, left_upper))
+            stack.append((parsed['right'][t, node], right_lower, upper))
+
+    return {
+        'tree': np.asarray(trees, dtype=np.int32),
+        'value': np.asarray(values, dtype=np.float64),
+        'lower': np.asarray(lowers),
+        'upper': np.asarray(uppers)
+    }
+
+
+def predict_leaves(booster: xgb.Booster, X) -> np.ndarray:
+    """
+    Leaf index reached in every tree for every row
+
+    Returns:
+        (n_rows, n_trees) int32 matrix of node ids
+    """
+    return booster.predict(xgb.DMatrix(X), pred_leaf=True).astype(np.int32)
+
+
+def model_leaves(model: Any, X) -> np.ndarray:
+    """
+    Leaf index matrix for any supported tree model
+
+    XGBoost models use pred_leaf; scikit-learn trees and forests use apply().
+
+    Returns:
+        (n_rows, n_trees) int32 matrix of node ids
+    """
+    if hasattr(model, 'get_booster'):
+        return predict_leaves(get_booster(model), X)
+
+    leaves = model.apply(X)
+    return np.asarray(leaves, dtype=np.int32).reshape(len(X), -1)
+
+
+def build_moment_booster(booster: xgb.Booster) -> xgb.Booster:
+    """
+    Two-output twin of a single-target booster
+
+    Output 0 is the original prediction; output 1 is the sum of squared
+    per-tree leaf values. Each iteration holds the original tree followed by
+    a copy whose leaf weights are squared, so one inplace_predict pass yields
+    the first two moments of the per-tree contributions.
+
+    Args:
+        booster: Trained single-target XGBoost Booster
+
+    Returns:
+        Booster with num_target=2 and base_score/n_trees attributes
+    """
+    model_json = json.loads(booster.save_raw('json'))
+    learner = model_json['learner']
+    model = learner['gradient_booster']['model']
+
+    trees = []
+    for i, tree in enumerate(model['trees']):
+        squared = copy.deepcopy(tree)
+        is_leaf = [left == -1 for left in tree['left_children']]
+        for key in ('split_conditions', 'base_weights'):
+            squared[key] = [v * v if leaf else v for leaf, v in zip(is_leaf, tree[key])]
+        tree['id'], squared['id'] = 2 * i, 2 * i + 1
+        trees.extend([tree, squared])
+
+    model['trees'] = trees
+    model['tree_info'] = [0, 1] * (len(trees) // 2)
+    model['iteration_indptr'] = list(range(0, len(trees) + 1, 2))
+    model['gbtree_model_param']['num_trees'] = str(len(trees))
+
+    base_score = learner['learner_model_param']['base_score'].strip('[]')
+    learner['learner_model_param']['num_target'] = '2'
+    learner['learner_model_param']['base_score'] = f"[{base_score},0E0]"
+
+    twin = xgb.Booster()
+    twin.load_model(bytearray(json.dumps(model_json).encode()))
+    twin.set_attr(base_score=str(float(base_score)), n_trees=str(len(trees) // 2))
+    return twin
@@ -0,0 +1,120 @@
+"""
+Per-tree ensemble spread as a fast uncertainty signal
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Any, Dict, Optional
+
+from models.tree_ensemble import get_booster, parse_booster, predict_leaves, build_moment_booster
+from models.model_loader import register_model_cache
+from utils.metrics import cache_metrics
+
+
+def _load_booster(model_name: str):
+    """Return the Booster of a loaded XGBoost model, or None"""
+    from models.model_loader import load_models
+
+    model = load_models().get(model_name)
+    if model is None or not hasattr(model, 'get_booster'):
+        return None
+    return get_booster(model)
+
+
+@register_model_cache
+@cache_metrics(st.cache_resource)
+def load_leaf_value_table(model_name: str = 'XGBoost') -> Optional[Dict[str, Any]]:
+    """
+    Build the (tree, node) -> leaf value lookup table for a boosted model
+
+    Args:
+        model_name: Name of an XGBoost model returned by load_models
+
+    Returns:
+        Parsed tree arrays (see parse_booster) or None if unavailable
+    """
+    try:
+        booster = _load_booster(model_name)
+        return parse_booster(booster) if booster is not None else None
+    except Exception as e:
+        st.error(f"❌ Error parsing {model_name} trees: {str(e)}")
+        return None
+
+
+@register_model_cache
+@cache_metrics(st.cache_resource)
+def load_moment_booster(model_name: str = 'XGBoost'):
+    """
+    Build the two-output (prediction, sum of squared leaves) twin booster
+
+    Args:
+        model_name: Name of an XGBoost model returned by load_models
+
+    Returns:
+        Booster (see build_moment_booster) or None if unavailable
+    """
+    try:
+        booster = _load_booster(model_name)
+        return build_moment_booster(booster) if booster is not None else None
+    except Exception as e:
+        st.error(f"❌ Error building {model_name} spread model: {str(e)}")
+        return None
+
+
+def tree_contributions(model: Any, X: pd.DataFrame, table: Dict[str, Any]) -> np.ndarray:
+    """
+    Per-tree contribution of every row via the leaf-index matrix
+
+    Returns:
+        (n_rows, n_trees) float32 matrix; rows sum to prediction - base_score
+    """
+    leaves = predict_leaves(get_booster(model), X)
+    return table['value'][np.arange(table['n_trees']), leaves]
+
+
+def contribution_stats(model: Any, X: pd.DataFrame, table: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Full per-row statistics of the per-tree contributions
+
+    Materializes the (rows x trees) contribution matrix, so it is meant for
+    single rows and small batches; use tree_spread for large batches.
+
+    Returns:
+        DataFrame with Prediction, Tree_Std, Tree_Min and Tree_Max columns
+    """
+    contribs = tree_contributions(model, X, table)
+    return pd.DataFrame({
+        'Prediction': table['base_score'] + contribs.sum(axis=1),
+        'Tree_Std': contribs.std(axis=1),
+        'Tree_Min': contribs.min(axis=1),
+        'Tree_Max': contribs.max(axis=1)
+    }, index=X.index)
+
+
+def tree_spread(X: pd.DataFrame, moment_booster) -> pd.DataFrame:
+    """
+    Prediction plus per-row std of the per-tree contributions
+
+    One inplace_predict pass over the moment booster returns the prediction
+    and the sum of squared leaf values, from which the std follows without
+    materializing the (rows x trees) matrix.
+
+    Args:
+        X: Encoded features aligned to the training columns
+        moment_booster: Booster from load_moment_booster
+
+    Returns:
+        DataFrame with Prediction and Tree_Std columns
+    """
+    base_score = float(moment_booster.attr('base_score'))
+    n_trees = int(moment_booster.attr('n_trees'))
+
+    outputs = moment_booster.inplace_predict(X)
+    prediction = outputs[:, 0]
+    mean = (prediction - base_score) / n_trees
+    variance = np.maximum(outputs[:, 1] / n_trees - mean * mean, 0.0)
+
+    return pd.DataFrame({
+        'Prediction': prediction,
+        'Tree_Std': np.sqrt(variance)
+    }, index=X.index)
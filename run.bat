@@ -11,13 +11,16 @@ if "%MODE%"=="notebook" (
     echo  Starting Jupyter Notebook...
 ) else if "%MODE%"=="execute" (
     echo  Executing Jupyter Notebooks...
+) else if "%MODE%"=="train" (
+    echo  Training Models...
 ) else if "%MODE%"=="app" (
     echo  Starting Application with Notebooks...
 ) else (
-    echo Usage: run.bat [app^|notebook^|execute]
+    echo Usage: run.bat [app^|notebook^|execute^|train]
     echo   app      - Start Streamlit application with notebooks ^(default^)
     echo   notebook - Start Jupyter Notebook server
     echo   execute  - Execute all Jupyter notebooks
+    echo   train    - Train and save models with scripts/train.py
     echo.
     pause
     exit /b 1
@@ -114,6 +117,19 @@ if "%MODE%"=="notebook" (
     echo ========================================
     echo.
     pause
+) else if "%MODE%"=="train" (
+    REM FIX: Add current directory to PYTHONPATH so models module can be found
+    for %%i in ("%~dp0.") do set "SCRIPT_DIR=%%~fi"
+    set PYTHONPATH=%PYTHONPATH%;%SCRIPT_DIR%
+
+    python scripts/train.py %2 %3 %4 %5 %6 %7 %8 %9
+    if errorlevel 1 (
+        echo ERROR: Training failed
+        pause
+        exit /b 1
+    )
+    echo.
+    pause
 ) else (
     echo Checking if packages are installed...
     python -c "import streamlit, jupyter, nbconvert, ipykernel" 2>nul
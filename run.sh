@@ -10,13 +10,16 @@ if [ "$MODE" = "notebook" ]; then
     echo " Starting Jupyter Notebook..."
 elif [ "$MODE" = "execute" ]; then
     echo " Executing Jupyter Notebooks..."
+elif [ "$MODE" = "train" ]; then
+    echo " Training Models..."
 elif [ "$MODE" = "app" ]; then
     echo " Starting Application with Notebooks..."
 else
-    echo "Usage: $0 [app|notebook|execute]"
+    echo "Usage: $0 [app|notebook|execute|train]"
     echo "  app      - Start Streamlit application with notebooks (default)"
     echo "  notebook - Start Jupyter Notebook server"
     echo "  execute  - Execute all Jupyter notebooks"
+    echo "  train    - Train and save models with scripts/train.py"
     exit 1
 fi
 echo "========================================"
@@ -69,6 +72,13 @@ export PYTHONPATH="${PYTHONPATH}:${SCRIPT_DIR}"
 # Menjalankan aplikasi atau notebook dari root directory
 if [ "$MODE" = "notebook" ]; then
     jupyter notebook
+elif [ "$MODE" = "train" ]; then
+    shift
+    python scripts/train.py "$@"
+    if [ $? -ne 0 ]; then
+        echo "ERROR: Training failed"
+        exit 1
+    fi
 elif [ "$MODE" = "execute" ]; then
     echo "[1/3] Executing EDA_Preprocessing.ipynb..."
     jupyter nbconvert --execute --to notebook --inplace notebooks/EDA_Preprocessing.ipynb
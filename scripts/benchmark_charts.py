@@ -0,0 +1,73 @@
+"""
+Benchmark chart payload size and build time, raw traces vs reduced chart data.
+
+For each size, builds the Feature Analysis scatter (x, y, color) and a
+histogram the way the views did before (every value in the trace) and
+through utils.chart_data, then serializes each figure exactly as
+st.plotly_chart does (plotly.io.to_json). Reports the payload size and
+the best-of-N build + serialize time; browser render time is not
+measured here, but it follows the payload (and WebGL vs SVG for points).
+
+Usage: python scripts/benchmark_charts.py [--sizes 10000 1000000 10000000] [--raw-limit 10000000]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import plotly.io as pio
+import plotly.graph_objects as go
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from utils.chart_data import scatter_trace, histogram_trace
+from config.settings import RANDOM_STATE
+
+
+def _measure(build, repeats):
+    """(best seconds to build and serialize, payload bytes)"""
+    best, size = float('inf'), 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        payload = pio.to_json(build(), validate=False)
+        best = min(best, time.perf_counter() - start)
+        size = len(payload)
+        del payload
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--raw-limit', type=int, default=10_000_000,
+                        help="Skip raw traces above this many points (they need several GB)")
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(RANDOM_STATE)
+    print(f"{'chart':<10} {'points':>12} {'mode':<8} {'payload':>12} {'build+json':>12}")
+    for n in args.sizes:
+        x = rng.normal(25, 5, n)
+        y = rng.normal(550, 250, n)
+        z = rng.normal(4.6, 1.7, n)
+        repeats = args.repeats if n <= 1_000_000 else 1
+
+        cases = {
+            'scatter': (lambda: go.Figure(go.Scatter(x=x, y=y, mode='markers', marker=dict(color=z))),
+                        lambda: go.Figure(scatter_trace(x, y, color=z, colorscale='Viridis'))),
+            'histogram': (lambda: go.Figure(go.Histogram(x=x, nbinsx=30)),
+                          lambda: go.Figure(histogram_trace(x)))
+        }
+        for chart, (raw, reduced) in cases.items():
+            for mode, build in (('raw', raw), ('reduced', reduced)):
+                if mode == 'raw' and n > args.raw_limit:
+                    print(f"{chart:<10} {n:>12,} {mode:<8} {'skipped':>12}")
+                    continue
+                seconds, size = _measure(build, repeats)
+                print(f"{chart:<10} {n:>12,} {mode:<8} {size / 1e6:>10.3f}MB {seconds * 1e3:>10.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
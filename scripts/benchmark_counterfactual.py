@@ -0,0 +1,77 @@
+"""
+Benchmark counterfactual search latency on the test split.
+
+For every test row, searches for the cheapest changes that raise and lower
+the prediction by --delta t/ha with the categorical features fixed, and
+checks every returned counterfactual against the model's own prediction.
+
+Usage: python scripts/benchmark_counterfactual.py [--model XGBoost] [--delta 1.0]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from config.settings import CATEGORICAL_COLS, NUMERIC_COLS, BOOLEAN_COLS
+from models.model_loader import load_models
+from models.data_loader import load_train_test_data
+from models.counterfactual import build_counterfactual_space, find_counterfactuals
+
+
+def _encode(template, result):
+    """Apply a counterfactual row (raw layout) to a one-row encoded frame"""
+    encoded = template.copy()
+    for col in NUMERIC_COLS + BOOLEAN_COLS:
+        encoded[col] = result[col]
+    for prefix in CATEGORICAL_COLS:
+        for col in encoded.columns:
+            if col.startswith(f"{prefix}_"):
+                encoded[col] = col == f"{prefix}_{result[prefix]}"
+    return encoded.astype(template.dtypes.to_dict())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--model', default='XGBoost')
+    parser.add_argument('--delta', type=float, default=1.0)
+    args = parser.parse_args()
+
+    model = load_models()[args.model]
+    data = load_train_test_data()
+    X_test = data['X_test']
+
+    start = time.perf_counter()
+    space = build_counterfactual_space(model, data['X_train'])
+    print(f"Search space build: {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({len(space['boxes']['tree'])} leaves)")
+
+    latencies, found, wrong = [], 0, 0
+    for i in range(len(X_test)):
+        row = X_test.iloc[[i]]
+        prediction = float(model.predict(row)[0])
+
+        for target in (prediction + args.delta, prediction - args.delta):
+            start = time.perf_counter()
+            results = find_counterfactuals(space, row, target, fixed=CATEGORICAL_COLS)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            for _, result in results.iterrows():
+                actual = float(model.predict(_encode(row, result))[0])
+                reached = actual >= target if target > prediction else actual <= target
+                wrong += not reached or abs(actual - result['Predicted_Yield']) > 1e-4
+            found += not results.empty
+
+    latencies = np.array(latencies)
+    print(f"Search latency ({len(latencies)} searches): median {np.median(latencies):.1f} ms, "
+          f"p90 {np.percentile(latencies, 90):.1f} ms, max {latencies.max():.1f} ms")
+    print(f"Searches with a counterfactual: {found}/{len(latencies)}; "
+          f"results disagreeing with the model: {wrong}")
+
+
+if __name__ == '__main__':
+    main()
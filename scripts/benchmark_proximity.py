@@ -0,0 +1,78 @@
+"""
+Benchmark leaf proximity queries against a synthetic training set.
+
+Resamples X_train up to --rows with jittered numeric features, builds the
+proximity index for the chosen model and reports per-row query latency
+for the test split, checking results against a brute-force count.
+
+Usage: python scripts/benchmark_proximity.py [--rows 1000000] [--model XGBoost]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from models.model_loader import load_models
+from models.data_loader import load_train_test_data
+from models.tree_ensemble import model_leaves
+from models.proximity import build_proximity_index, query_proximity
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--model', default='XGBoost')
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    model = load_models()[args.model]
+    data = load_train_test_data()
+    X_train, X_test = data['X_train'], data['X_test']
+
+    rng = np.random.default_rng(args.seed)
+    X = X_train.iloc[rng.integers(0, len(X_train), args.rows)].reset_index(drop=True)
+    for col in ['Rainfall_mm', 'Temperature_Celsius']:
+        X[col] = rng.uniform(X_train[col].min(), X_train[col].max(), args.rows)
+    X['Days_to_Harvest'] = rng.integers(X_train['Days_to_Harvest'].min(),
+                                        X_train['Days_to_Harvest'].max() + 1, args.rows)
+
+    train_leaves = model_leaves(model, X)
+    query_leaves = model_leaves(model, X_test)
+    del X
+
+    start = time.perf_counter()
+    index = build_proximity_index(train_leaves)
+    print(f"Index build ({args.rows:,} rows, {len(index['blocks'])} blocks): "
+          f"{time.perf_counter() - start:.2f}s")
+    del train_leaves
+
+    start = time.perf_counter()
+    result = query_proximity(index, query_leaves, args.k)
+    per_row = (time.perf_counter() - start) * 1000 / len(query_leaves)
+    print(f"Batched query latency: {per_row:.3f} ms per row ({len(query_leaves)} rows)")
+
+    latencies = []
+    for q in range(len(query_leaves)):
+        start = time.perf_counter()
+        query_proximity(index, query_leaves[q:q + 1], args.k)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies = np.array(latencies)
+    print(f"Single-row query latency: median {np.median(latencies):.3f} ms, "
+          f"p90 {np.percentile(latencies, 90):.3f} ms, max {latencies.max():.3f} ms")
+
+    mismatches = 0
+    for q in range(len(query_leaves)):
+        found = result.loc[result['Query'] == q, 'Shared_Leaves'].values
+        brute = np.sort((index['leaves'] == query_leaves[q]).sum(axis=1))[::-1][:args.k]
+        mismatches += not np.array_equal(found, brute)
+    print(f"Exactness vs brute force: {len(query_leaves) - mismatches}/{len(query_leaves)} queries")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Warm rerun time of a page, per lazy tab, in Streamlit's app test harness.
+
+Runs the view once to fill the caches (clicking the --click button
+first, e.g. to generate the SHAP analysis, timed until its results
+show), then times further reruns (the median of --runs) with each tab
+of its lazy_tabs selector selected in turn, or of the whole page when
+it has no selector with --key. The harness runs the script like the
+server does, including element serialization, but without a browser.
+
+Usage: python scripts/benchmark_reruns.py [--view data_visualization]
+                                          [--key visualization_tab] [--runs 7]
+                                          [--click "🔬 Generate SHAP Analysis"]
+"""
+import os
+import time
+import argparse
+import statistics
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+from streamlit.testing.v1 import AppTest
+
+
+_SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+sys.path.insert(0, {src!r})
+from views import {view}
+{view}.render()
+"""
+
+
+def _median_rerun(app, runs):
+    """Median wall time of `runs` reruns of the app, in seconds"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - start)
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--view', default='data_visualization', help="Module in src/views")
+    parser.add_argument('--key', default='visualization_tab', help="Session key of the page's lazy_tabs")
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--click', help="Label of a button to click before timing")
+    args = parser.parse_args()
+
+    root = os.path.abspath(project_root)
+    script = _SCRIPT.format(root=root, src=os.path.join(root, 'src'), view=args.view)
+    app = AppTest.from_string(script, default_timeout=300)
+    app.run()
+    if args.click:
+        start = time.perf_counter()
+        next(button for button in app.button if button.label == args.click).click().run()
+        # Pages waiting on a background job rerun until it is collected
+        # (shown as the lazy_tabs selector, or st.tabs on pages without one)
+        for _ in range(120):
+            if any(radio.key == args.key for radio in app.radio) or app.tabs or app.exception:
+                break
+            time.sleep(0.5)
+            app.run()
+        print(f"  {'click ' + args.click:<28s} {(time.perf_counter() - start) * 1000:8.1f} ms")
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+
+    selectors = [radio for radio in app.radio if radio.key == args.key]
+    if not selectors:
+        print(f"  {'whole page':<28s} {_median_rerun(app, args.runs) * 1000:8.1f} ms")
+        return
+
+    for label in selectors[0].options:
+        app.radio(key=args.key).set_value(label).run()
+        print(f"  {label:<28s} {_median_rerun(app, args.runs) * 1000:8.1f} ms", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark hyperparameter search modes by time to reach the grid's R².
+
+Runs the exhaustive grid, successive halving and Bayesian-style search on
+the same quantized folds, and reports for each mode its total time, best
+CV R², the time at which it first came within --tolerance of the grid's
+best CV R², and the test R² of the refitted winner.
+
+With --rows N, trains on N synthetic rows instead (see
+models.training.synthetic_training_data), with a further 20% as test.
+The full grid grows linearly with the rows (about 11 minutes at 1M rows
+on one CPU), so at 10M rows expect hours for the grid alone; give the
+reference of a smaller run with --target-r2 and skip the grid instead.
+
+Usage: python scripts/benchmark_search.py [--rows 1000000 --folds 1]
+                                          [--modes grid halving bayes]
+"""
+import os
+import sys
+import time
+import argparse
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from sklearn.metrics import r2_score
+from config.settings import XGB_PARAM_GRID, CV_FOLDS
+from models.training import (
+    SEARCH_MODES, load_training_data, synthetic_training_data, resolve_cpu_budget,
+    build_cv_folds, best_params, fit_xgboost
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=0, help="Synthetic training rows (0 = real data)")
+    parser.add_argument('--modes', nargs='+', choices=list(SEARCH_MODES), default=list(SEARCH_MODES))
+    parser.add_argument('--folds', type=int, default=CV_FOLDS, help="CV folds (1 = 80/20 holdout)")
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--tolerance', type=float, default=0.001)
+    parser.add_argument('--target-r2', type=float, help="Reference CV R² when grid is not run")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    data = load_training_data()
+    if args.rows:
+        start = time.perf_counter()
+        data = synthetic_training_data(data, args.rows, args.seed)
+        print(f"Synthetic data: {args.rows:,} train rows ({time.perf_counter() - start:.1f}s)")
+
+    n_jobs = resolve_cpu_budget(args.n_jobs)
+    start = time.perf_counter()
+    folds = build_cv_folds(data['X_train'], data['y_train'], args.folds)
+    print(f"Quantized {len(folds)} fold(s) in {time.perf_counter() - start:.1f}s, CPU budget {n_jobs}\n")
+
+    runs = {}
+    for mode in args.modes:
+        start = time.perf_counter()
+        results = SEARCH_MODES[mode](folds, XGB_PARAM_GRID, n_jobs)
+        total = time.perf_counter() - start
+        params = best_params(results)
+        model = fit_xgboost(data['X_train'], data['y_train'], params, n_jobs)
+        test_r2 = r2_score(data['y_test'], model.predict(data['X_test']))
+        runs[mode] = {'results': results, 'total': total, 'test_r2': test_r2, 'params': params}
+        print(f"{mode}: {total:.1f}s, {len(results)} evaluations, best CV R² "
+              f"{results['cv_r2'].iloc[0]:.4f}, test R² {test_r2:.4f}, {params}")
+
+    reference = runs['grid']['results']['cv_r2'].iloc[0] if 'grid' in runs else args.target_r2
+    if reference is None:
+        return
+
+    target = reference - args.tolerance
+    print(f"\nTime to CV R² >= {target:.4f} (reference {reference:.4f} - {args.tolerance}):")
+    for mode, run in runs.items():
+        reached = run['results'].loc[run['results']['cv_r2'] >= target, 'elapsed']
+        when = f"{reached.min():.1f}s" if len(reached) else "not reached"
+        print(f"  {mode:<8s} {when:>12s}   (total {run['total']:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
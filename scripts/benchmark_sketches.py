@@ -0,0 +1,120 @@
+"""
+Check the streaming sketches' error bounds and measure their throughput.
+
+Feeds skewed synthetic data (a lognormal/normal mixture for the numeric
+sketches, Zipf values for the heavy hitters) to every sketch in chunks,
+once as a single stream and once as shards merged afterwards, and compares
+the results with exact NumPy answers:
+
+  BinnedHistogram  quantile value error <= one bin width
+  TDigest          quantile rank error <= 2 pi sqrt(q (1 - q)) / compression
+  HeavyHitters     every count low by at most error_bound(), never high;
+                   every dropped value at most error_bound() frequent
+  Moments          correlation and variance within 1e-9 of NumPy
+
+Exits with status 1 if any bound is violated.
+
+Usage: python scripts/benchmark_sketches.py [--rows 2000000] [--chunks 40] [--shards 4]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from models.sketches import Moments, BinnedHistogram, TDigest, HeavyHitters
+from config.settings import PROFILE_HIST_BINS, PROFILE_DIGEST_COMPRESSION, PROFILE_TOP_VALUES, RANDOM_STATE
+
+
+QUANTILES = [0.001, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999]
+
+
+def _build(make, chunks, shards):
+    """(streamed sketch, sharded-and-merged sketch, seconds per value streamed)"""
+    start = time.perf_counter()
+    streamed = make()
+    for chunk in chunks:
+        streamed.update(chunk)
+    seconds = time.perf_counter() - start
+
+    parts = [make() for _ in range(shards)]
+    for i, chunk in enumerate(chunks):
+        parts[i % shards].update(chunk)
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    return streamed, merged, seconds / sum(len(c) for c in chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--chunks', type=int, default=40)
+    parser.add_argument('--shards', type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(RANDOM_STATE)
+    x = np.concatenate([rng.lognormal(0, 1, args.rows // 2), rng.normal(50, 5, args.rows - args.rows // 2)])
+    rng.shuffle(x)
+    y = 2 * x + rng.normal(0, 1, len(x))
+    chunks = np.array_split(x, args.chunks)
+    exact = np.sort(x)
+    failures = []
+
+    print(f"{'sketch':<16} {'build':<8} {'ns/value':>9} {'worst error':>14} {'bound':>14}")
+
+    for name, make in (('BinnedHistogram', lambda: BinnedHistogram(PROFILE_HIST_BINS)),
+                       ('TDigest', lambda: TDigest(PROFILE_DIGEST_COMPRESSION))):
+        streamed, merged, per_value = _build(make, chunks, args.shards)
+        for build, sketch in (('stream', streamed), ('shards', merged)):
+            worst, bound = 0.0, 0.0
+            for q in QUANTILES:
+                estimate = sketch.quantile(q)
+                if name == 'BinnedHistogram':
+                    error, limit = abs(estimate - np.quantile(x, q)), sketch.width
+                else:
+                    # Rank of the estimate among the data, against the scale function's bound
+                    lo = np.searchsorted(exact, estimate, side='left') / len(x)
+                    hi = np.searchsorted(exact, estimate, side='right') / len(x)
+                    error = max(0.0, lo - q, q - hi)
+                    limit = 2 * np.pi * np.sqrt(q * (1 - q)) / sketch.compression
+                if error > limit:
+                    failures.append(f"{name} ({build}) q={q}: error {error:.3g} > {limit:.3g}")
+                worst, bound = max(worst, error), max(bound, limit)
+            print(f"{name:<16} {build:<8} {per_value * 1e9:>9.1f} {worst:>14.4g} {bound:>14.4g}")
+
+    values = rng.zipf(1.5, args.rows)
+    counts = dict(zip(*np.unique(values, return_counts=True)))
+    streamed, merged, per_value = _build(lambda: HeavyHitters(PROFILE_TOP_VALUES),
+                                         np.array_split(values, args.chunks), args.shards)
+    for build, sketch in (('stream', streamed), ('shards', merged)):
+        bound = sketch.error_bound()
+        low = max(counts[int(v)] - c for v, c in sketch.counts.items())
+        high = max(c - counts[int(v)] for v, c in sketch.counts.items())
+        dropped = max((c for v, c in counts.items() if str(v) not in sketch.counts), default=0)
+        if low > bound or high > 0 or dropped > bound:
+            failures.append(f"HeavyHitters ({build}): low by {low}, high by {high}, "
+                            f"dropped count {dropped}, bound {bound:.0f}")
+        print(f"{'HeavyHitters':<16} {build:<8} {per_value * 1e9:>9.1f} {max(low, dropped):>14,} {bound:>14,.0f}")
+
+    data = np.column_stack([x, y])
+    streamed, merged, per_value = _build(lambda: Moments(2), np.array_split(data, args.chunks), args.shards)
+    for build, sketch in (('stream', streamed), ('shards', merged)):
+        error = max(abs(sketch.correlation()[0, 1] - np.corrcoef(x, y)[0, 1]),
+                    abs(sketch.variance()[0] / np.var(x, ddof=1) - 1))
+        if error > 1e-9:
+            failures.append(f"Moments ({build}): error {error:.3g}")
+        print(f"{'Moments':<16} {build:<8} {per_value * 1e9:>9.1f} {error:>14.4g} {1e-9:>14.4g}")
+
+    if failures:
+        print("\nBound violations:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nAll sketch errors within their bounds")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,415 @@
+"""
+Benchmark suite for the app's hot paths, with JSON results per run.
+
+Times dataset and split parsing, batch one-hot encoding, model prediction
+for both models at batch sizes 1 to 1M, SHAP values, native per-row
+contributions of whole batches (compare with predict at the same batch
+size: explaining should stay within a small multiple), metric calculation
+and every page's figures (built from an empty figure cache and served
+from a warm one: the difference is the rerun time the figure factory
+saves) on fixed-seed synthetic data (see models.synthetic) at several
+sizes. Each case is timed timeit-style: calls are looped until a run
+lasts long enough to measure, and runs are repeated within a time
+budget. Results are written to benchmarks/<timestamp>-<commit>.json;
+--compare reports the change in median time against an earlier results
+file from the same machine.
+
+Usage: python scripts/benchmark_suite.py [--quick] [--filter predict]
+                                         [--compare benchmarks/<file>.json]
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import tempfile
+import statistics
+import itertools
+from datetime import datetime
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit import logger as streamlit_logger
+from config.settings import (
+    DATASET_PATH, FEATURE_NAMES, TARGET_COL, ENCODED_COLUMNS, RANDOM_STATE, BENCHMARK_DIR
+)
+import models.data_loader as data_loader
+from models.model_loader import load_models, predict
+from models.training import read_records
+from models.features import encode_records
+from models.contributions import iter_contributions
+from models.explain import compute_shap_values
+from models.synthetic import fit_profile, iter_synthetic, write_csv
+from models.profile import build_profile
+from models.cube import build_cube
+from utils.helpers import calculate_metrics
+from components.figures import clear_figure_cache, show_figure
+from views import batch_prediction, shap_analysis, data_visualization, home, model_performance, model_comparison
+
+
+# Sizes per case group; --quick keeps only the first of each
+DATASET_ROWS = [1_000, 100_000, 1_000_000]
+PREDICT_BATCHES = [1, 100, 10_000, 1_000_000]
+SHAP_SAMPLES = [50, 100, 200]
+CONTRIB_BATCHES = [100, 10_000, 1_000_000]
+FIGURE_ROWS = [1_000, 100_000]
+MODEL_NAMES = ['XGBoost', 'Decision Tree']
+
+CASES = []
+
+
+def case(group, size, sizes, **variants):
+    """
+    Register a benchmark for every size and combination of variants
+
+    The decorated fn(ctx, **params) does the setup and returns the
+    zero-argument call to time.
+    """
+    def register(fn):
+        keys = list(variants)
+        for values in itertools.product(*variants.values()):
+            for i, value in enumerate(sizes):
+                params = {**dict(zip(keys, values)), size: value}
+                CASES.append((group, params, i == 0, fn))
+        return fn
+    return register
+
+
+class Context:
+    """Fixed-seed datasets shared by all cases, built on first use"""
+
+    def __init__(self, workdir, seed):
+        self.workdir = workdir
+        self.seed = seed
+        self.profile = fit_profile(read_records(DATASET_PATH))
+        self.models = load_models()
+        self._cache = {}
+
+    def _cached(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def raw(self, rows):
+        """Raw records in the dataset layout, parsed like load_dataset returns them"""
+        return self._cached(('raw', rows), lambda: pd.read_csv(self.csv(rows), sep=';', decimal=','))
+
+    def csv(self, rows):
+        """Path of a dataset-dialect CSV with `rows` records"""
+        def build():
+            path = os.path.join(self.workdir, f"dataset_{rows}.csv")
+            write_csv(iter_synthetic(self.profile, rows, self.seed), path)
+            return path
+        return self._cached(('csv', rows), build)
+
+    def encoded(self, rows):
+        """Encoded features (X_train layout) and target"""
+        def build():
+            raw = self.raw(rows)
+            return encode_records(raw[FEATURE_NAMES], ENCODED_COLUMNS), raw[TARGET_COL].to_numpy()
+        return self._cached(('encoded', rows), build)
+
+    def split_files(self, rows):
+        """X/y train and test CSVs as split_dataset.py writes them (80/20)"""
+        def build():
+            X, y = self.encoded(rows)
+            cut = int(rows * 0.8)
+            paths = {}
+            for name, frame in [('X_TRAIN_PATH', X.iloc[:cut]), ('X_TEST_PATH', X.iloc[cut:]),
+                                ('Y_TRAIN_PATH', pd.DataFrame({TARGET_COL: y[:cut]})),
+                                ('Y_TEST_PATH', pd.DataFrame({TARGET_COL: y[cut:]}))]:
+                paths[name] = os.path.join(self.workdir, f"{name.lower()}_{rows}.csv")
+                frame.to_csv(paths[name], index=False)
+            return paths
+        return self._cached(('split', rows), build)
+
+
+def _patched(module, values, fn):
+    """Call fn with module attributes temporarily replaced"""
+    def call():
+        saved = {k: getattr(module, k) for k in values}
+        for k, v in values.items():
+            setattr(module, k, v)
+        try:
+            return fn()
+        finally:
+            for k, v in saved.items():
+                setattr(module, k, v)
+    return call
+
+
+@case('load_dataset', 'rows', DATASET_ROWS)
+def bench_load_dataset(ctx, rows):
+    load = data_loader._load_dataset.__wrapped__
+    return _patched(data_loader, {'DATASET_PATH': ctx.csv(rows)}, lambda: load(None))
+
+
+@case('load_train_test_data', 'rows', DATASET_ROWS)
+def bench_load_train_test_data(ctx, rows):
+    load = data_loader._load_train_test_data.__wrapped__
+    return _patched(data_loader, ctx.split_files(rows), lambda: load(()))
+
+
+@case('batch_one_hot', 'rows', DATASET_ROWS)
+def bench_batch_one_hot(ctx, rows):
+    raw = ctx.raw(rows)[FEATURE_NAMES]
+    return lambda: batch_prediction._encode_uploaded(raw, ENCODED_COLUMNS)
+
+
+@case('predict', 'batch', PREDICT_BATCHES, model=MODEL_NAMES)
+def bench_predict(ctx, model, batch):
+    X = ctx.encoded(max(batch, DATASET_ROWS[0]))[0].iloc[:batch]
+    return lambda: predict(ctx.models[model], X)
+
+
+@case('shap', 'samples', SHAP_SAMPLES, model=MODEL_NAMES)
+def bench_shap(ctx, model, samples):
+    X = ctx.encoded(DATASET_ROWS[0])[0]
+    X_train, X_test = shap_analysis._prepare_data_for_shap(X.iloc[:800], X.iloc[800:])
+    sample = X_test.sample(min(samples, len(X_test)), random_state=RANDOM_STATE)
+
+    def call():
+        # The background rows are drawn from the global RNG
+        np.random.seed(RANDOM_STATE)
+        return compute_shap_values(ctx.models[model], X_train, sample)
+    return call
+
+
+@case('contributions', 'batch', CONTRIB_BATCHES, model=MODEL_NAMES, interactions=[False, True])
+def bench_contributions(ctx, model, batch, interactions):
+    X = ctx.encoded(max(batch, DATASET_ROWS[0]))[0].iloc[:batch]
+
+    def call():
+        for _ in iter_contributions(ctx.models[model], model, X, interactions):
+            pass
+    return call
+
+
+@case('calculate_metrics', 'rows', DATASET_ROWS)
+def bench_calculate_metrics(ctx, rows):
+    y = ctx.encoded(rows)[1]
+    y_pred = y + np.random.default_rng(ctx.seed).normal(0, 0.5, len(y))
+    return lambda: calculate_metrics(y, y_pred)
+
+
+def _figure_calls(figures, cached):
+    """Call figure builders (builder, args) and display their JSON, from a warm or an emptied figure cache"""
+    def call():
+        if not cached:
+            clear_figure_cache()
+        for builder, args in figures:
+            show_figure(builder(*args))
+    return call
+
+
+@case('figures', 'rows', FIGURE_ROWS, view=['overview', 'distribution', 'correlation', 'feature_analysis'],
+      cached=[False, True])
+def bench_figures(ctx, view, rows, cached):
+    df = ctx.raw(rows)
+    profile, cube = build_profile([df]), build_cube(df)
+    render = getattr(data_visualization, f"_render_{view}")
+    # Overview, distribution and correlation render from the dataset profile
+    args = () if view == 'feature_analysis' else (profile,)
+
+    def call():
+        if not cached:
+            clear_figure_cache()
+        render(*args)
+    # Figures are keyed on the data version, so give each size its own
+    return _patched(data_visualization, {
+        'load_dataset_profile': lambda: profile,
+        'load_yield_cube': lambda: cube,
+        'load_dataset': lambda: df,
+        'get_data_version': lambda: f"synthetic-{ctx.seed}-{rows}"
+    }, call)
+
+
+@case('page_figures', 'rows', FIGURE_ROWS,
+      page=['home', 'model_performance', 'model_comparison', 'batch_prediction'], cached=[False, True])
+def bench_page_figures(ctx, page, rows, cached):
+    y = ctx.encoded(rows)[1]
+    rng = np.random.default_rng(ctx.seed)
+    pred1, pred2 = y + rng.normal(0, 0.5, len(y)), y + rng.normal(0, 0.6, len(y))
+    metrics = pd.DataFrame([{'Model': name, **calculate_metrics(y, pred)}
+                            for name, pred in zip(MODEL_NAMES, (pred1, pred2))])
+    colors = ('#7dd3fc', '#c4b5fd')
+    figures = {
+        'home': [(home._r2_figure, (metrics, 'R2'))],
+        'model_performance': [
+            *((model_performance._metric_figure, (metrics, col, col, col, colors, '#e0f2fe', 4))
+              for col in ('R2', 'MAE', 'RMSE', 'MAPE')),
+            (model_performance._actual_vs_predicted_figure, (MODEL_NAMES[0], y, pred1)),
+            (model_performance._residual_figure, (y, pred1)),
+            (model_performance._residual_histogram_figure, (y, pred1))
+        ],
+        'model_comparison': [
+            (model_comparison._actual_vs_predicted_figure, (MODEL_NAMES[0], y, pred1, '#667eea')),
+            (model_comparison._actual_vs_predicted_figure, (MODEL_NAMES[1], y, pred2, '#764ba2')),
+            (model_comparison._agreement_figure, (*MODEL_NAMES, y, pred1, pred2))
+        ],
+        'batch_prediction': [
+            (batch_prediction._actual_vs_predicted_figure, (y, pred1)),
+            (batch_prediction._histogram_figure, (y - pred1, 'Errors', 'Error')),
+            (batch_prediction._histogram_figure, (pred1, 'Predictions', 'Predicted Yield'))
+        ]
+    }[page]
+    return _figure_calls(figures, cached)
+
+
+def _autorange(fn, min_run=0.05):
+    """Calls per timed run so that one run lasts at least min_run seconds"""
+    fn()  # Warm-up: first calls pay for imports and caches
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_run or number >= 10 ** 6:
+            return number
+        number *= 10
+
+
+def time_case(fn, repeat, budget):
+    """Per-call seconds of up to `repeat` runs within `budget` seconds (at least one run)"""
+    number = _autorange(fn)
+    times, start = [], time.perf_counter()
+    while len(times) < repeat and (not times or time.perf_counter() - start < budget):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - t0) / number)
+    return {'min': min(times), 'median': statistics.median(times), 'mean': statistics.fmean(times),
+            'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+            'runs': len(times), 'number': number}
+
+
+def _case_name(group, params):
+    return f"{group}[{','.join(f'{k}={v}' for k, v in params.items())}]"
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=project_root, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment():
+    """Machine and library versions, so results are only compared like for like"""
+    import sklearn, xgboost, shap, plotly
+    return {
+        'commit': _git('rev-parse', '--short', 'HEAD'),
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'machine': platform.node(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'versions': {m.__name__: m.__version__ for m in (np, pd, sklearn, xgboost, shap, plotly, st)}
+    }
+
+
+def _format_seconds(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def compare(base, results, threshold):
+    """Print median ratios against a baseline; returns the names of regressed cases"""
+    print(f"\nAgainst {base['environment'].get('commit')} ({base['timestamp']}):")
+    if base['environment'].get('machine') != results['environment']['machine']:
+        print("  ⚠️ Baseline was recorded on a different machine")
+    regressions = []
+    for name, entry in results['results'].items():
+        old = base['results'].get(name)
+        if old is None or 'median' not in old or 'median' not in entry:
+            continue
+        ratio = entry['median'] / old['median']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  ⚠️ slower'
+            regressions.append(name)
+        elif ratio < 1 / (1 + threshold):
+            flag = '  faster'
+        print(f"  {name:<48s} {_format_seconds(old['median']):>10s} → "
+              f"{_format_seconds(entry['median']):>10s}  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--filter', help="Only run cases whose name contains this text")
+    parser.add_argument('--quick', action='store_true', help="Smallest size of every case only")
+    parser.add_argument('--repeat', type=int, default=7, help="Timed runs per case")
+    parser.add_argument('--budget', type=float, default=5.0, help="Seconds of timed runs per case")
+    parser.add_argument('--seed', type=int, default=RANDOM_STATE)
+    parser.add_argument('--out', help="Results file (default: benchmarks/<timestamp>-<commit>.json)")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative slowdown in median time reported as a regression")
+    args = parser.parse_args()
+
+    # Views call Streamlit outside a running app here, and its bare-mode
+    # warnings are noise; the config must be parsed first or it resets the level
+    st.get_option('logger.level')
+    streamlit_logger.set_log_level('error')
+
+    selected = []
+    for group, params, smallest, fn in CASES:
+        name = _case_name(group, params)
+        if (args.quick and not smallest) or (args.filter and args.filter not in name):
+            continue
+        selected.append((name, params, fn))
+
+    results = {'timestamp': datetime.now().isoformat(timespec='seconds'),
+               'seed': args.seed, 'environment': _environment(), 'results': {}}
+    failed = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        ctx = Context(workdir, args.seed)
+        for name, params, fn in selected:
+            # A broken case is recorded as failed; the other cases still run and are saved
+            try:
+                entry = time_case(fn(ctx, **params), args.repeat, args.budget)
+            except Exception as e:
+                failed.append(name)
+                results['results'][name] = {'params': params, 'error': f"{type(e).__name__}: {e}"}
+                print(f"  {name:<48s} {'FAILED':>10s} ({type(e).__name__}: {e})", flush=True)
+                continue
+            results['results'][name] = {'params': params, **entry}
+            print(f"  {name:<48s} {_format_seconds(entry['median']):>10s} "
+                  f"(min {_format_seconds(entry['min'])}, {entry['runs']}x{entry['number']})", flush=True)
+
+    out = args.out
+    if out is None:
+        os.makedirs(BENCHMARK_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        out = os.path.join(BENCHMARK_DIR, f"{stamp}-{results['environment']['commit'] or 'nogit'}.json")
+    with open(out, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Saved {os.path.normpath(out)}")
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than x{1 + args.threshold:.2f}")
+    if failed:
+        print(f"\n{len(failed)} case(s) failed: {', '.join(failed)}")
+    if regressions or failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
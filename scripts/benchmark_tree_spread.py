@@ -0,0 +1,55 @@
+"""
+Benchmark the per-tree spread uncertainty mode against plain prediction.
+
+Tiles the test split up to each batch size and reports the best-of-N wall
+time of model.predict vs tree_spread (target: ratio <= 2x).
+
+Usage: python scripts/benchmark_tree_spread.py [--sizes 1 1000 100000 1000000]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from models.model_loader import load_models
+from models.data_loader import load_train_test_data
+from models.tree_ensemble import get_booster, build_moment_booster
+from models.uncertainty import tree_spread
+
+
+def _best_time(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 1000, 100_000, 1_000_000])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    model = load_models()['XGBoost']
+    moment_booster = build_moment_booster(get_booster(model))
+    X_test = load_train_test_data()['X_test']
+
+    print(f"{'rows':>10} {'predict (s)':>12} {'spread (s)':>12} {'ratio':>7}")
+    for size in args.sizes:
+        idx = np.resize(np.arange(len(X_test)), size)
+        X = X_test.iloc[idx].reset_index(drop=True)
+
+        t_pred = _best_time(lambda: model.predict(X), args.repeats)
+        t_spread = _best_time(lambda: tree_spread(X, moment_booster), args.repeats)
+        print(f"{size:>10,} {t_pred:>12.4f} {t_spread:>12.4f} {t_spread / t_pred:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
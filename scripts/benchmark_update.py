@@ -0,0 +1,83 @@
+"""
+Benchmark incremental model updates against a full retrain.
+
+Splits the training data into an existing season (the first 1 - --new
+share of rows) and newly arrived records, trains a base model on the
+existing rows with the saved model's parameters, then compares update
+time and test accuracy of continuing it on the new records, refitting
+it on all records, and retraining from scratch on all records.
+
+With --rows N, uses N synthetic training rows instead (see
+models.training.synthetic_training_data).
+
+Usage: python scripts/benchmark_update.py [--new 0.2] [--rows 1000000]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from config.settings import MODEL_PATHS, UPDATE_MAX_ROUNDS
+from models.training import (
+    load_training_data, synthetic_training_data, saved_params, update_xgboost,
+    as_regressor, fit_xgboost, evaluate_models
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--new', type=float, default=0.2, help="Share of training rows that are new")
+    parser.add_argument('--rows', type=int, default=0, help="Synthetic training rows (0 = real data)")
+    parser.add_argument('--max-rounds', type=int, default=UPDATE_MAX_ROUNDS)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    data = load_training_data()
+    if args.rows:
+        data = synthetic_training_data(data, args.rows, args.seed)
+
+    saved = xgb.Booster()
+    saved.load_model(MODEL_PATHS['XGBoost'])
+    params = saved_params(saved)
+
+    X, y = data['X_train'], data['y_train']
+    order = np.random.default_rng(args.seed).permutation(len(y))
+    n_old = int(len(y) * (1 - args.new))
+    X_old, y_old = X.iloc[order[:n_old]].reset_index(drop=True), y[order[:n_old]]
+    X_new, y_new = X.iloc[order[n_old:]].reset_index(drop=True), y[order[n_old:]]
+    print(f"Existing rows: {n_old:,} | new rows: {len(y_new):,} | params: {params}\n")
+
+    base = fit_xgboost(X_old, y_old, params, args.n_jobs)
+    models, timings, trees = {'Base (existing rows)': base}, {}, {}
+
+    for mode in ('continue', 'refit'):
+        start = time.perf_counter()
+        booster, info = update_xgboost(base.get_booster(), X_new, y_new, mode, args.max_rounds,
+                                       X_old, y_old, args.n_jobs, args.seed)
+        name = f"Update ({mode})"
+        timings[name] = time.perf_counter() - start
+        trees[name] = booster.num_boosted_rounds()
+        models[name] = as_regressor(booster)
+
+    start = time.perf_counter()
+    models['Full retrain'] = fit_xgboost(pd.concat([X_old, X_new], ignore_index=True),
+                                         np.concatenate([y_old, y_new]), params, args.n_jobs)
+    timings['Full retrain'] = time.perf_counter() - start
+    trees['Full retrain'] = params['n_estimators']
+
+    metrics = evaluate_models(models, data['X_test'], data['y_test'])
+    metrics['Trees'] = metrics['Model'].map(trees).fillna(params['n_estimators']).astype(int)
+    metrics['Time (s)'] = metrics['Model'].map(timings)
+    print(metrics.to_string(index=False, float_format=lambda v: f"{v:.4f}", na_rep='-'))
+
+
+if __name__ == '__main__':
+    main()
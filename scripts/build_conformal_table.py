@@ -0,0 +1,40 @@
+"""
+Build the split-conformal residual table used for prediction intervals.
+
+Calibrates every model on the held-out test split (never seen in training)
+and writes models/conformal_table.json.
+"""
+import os
+import sys
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from models.model_loader import load_models
+from models.data_loader import load_train_test_data
+from models.conformal import build_conformal_table, save_conformal_table
+from config.settings import CONFORMAL_TABLE_PATH
+
+
+def main():
+    models = load_models()
+    data = load_train_test_data()
+
+    if not models or 'X_test' not in data or 'y_test' not in data:
+        print("ERROR: models or test split not found. Run split_dataset.py and train first.")
+        sys.exit(1)
+
+    table = build_conformal_table(models, data['X_test'], data['y_test'])
+    save_conformal_table(table)
+
+    print(f"Calibration rows: {table['calibration_size']}")
+    for model_name, entry in table['models'].items():
+        widths = ", ".join(f"{lvl}: ±{q:.3f}" for lvl, q in entry['global']['q'].items())
+        segs = sum(len(v) for v in entry['segments'].values())
+        print(f"  {model_name}: {widths} ({segs} calibrated segments)")
+    print(f"\n✓ Saved {os.path.normpath(CONFORMAL_TABLE_PATH)}")
+
+
+if __name__ == '__main__':
+    main()
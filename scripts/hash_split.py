@@ -0,0 +1,74 @@
+"""
+Split a dataset CSV into train/test Parquet shards by a stable record hash.
+
+Streaming replacement for split_dataset.py for large or growing datasets:
+reads the CSV in fixed-size blocks, assigns every record by the hash of its
+line (or --id-column), and writes one-hot encoded, typed Parquet shards to
+data/split/{train,test}/. Rerunning after rows were appended to the source
+only processes the new rows; existing assignments never change.
+
+Usage: python scripts/hash_split.py [data/dataset_800.csv] [--out data/split]
+                                    [--id-column Farm_ID] [--restart]
+"""
+import os
+import sys
+import time
+import argparse
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from config.settings import DATASET_PATH, SPLIT_DIR, SPLIT_TEST_FRACTION, SPLIT_BLOCK_BYTES
+from models.splitting import hash_split, load_manifest
+
+
+def _peak_memory() -> str:
+    """Peak resident memory note (not available on Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return ""
+    return f" (peak memory {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('source', nargs='?', default=DATASET_PATH)
+    parser.add_argument('--out', default=SPLIT_DIR)
+    parser.add_argument('--test-fraction', type=float, default=SPLIT_TEST_FRACTION)
+    parser.add_argument('--id-column', help="Hash this column instead of the whole line")
+    parser.add_argument('--block-mb', type=int, default=SPLIT_BLOCK_BYTES // 2 ** 20)
+    parser.add_argument('--restart', action='store_true', help="Discard the existing split first")
+    args = parser.parse_args()
+
+    previous = load_manifest(args.out)
+    start_bytes = previous['bytes'] if previous and not args.restart else 0
+    size = os.path.getsize(args.source)
+    start = time.perf_counter()
+
+    def progress(manifest):
+        done = manifest['bytes'] - start_bytes
+        elapsed = time.perf_counter() - start
+        print(f"  {manifest['bytes'] / 2 ** 20:10,.0f} / {size / 2 ** 20:,.0f} MB "
+              f"({done / 2 ** 20 / max(elapsed, 1e-9):,.0f} MB/s)", flush=True)
+
+    try:
+        manifest = hash_split(args.source, args.out, args.test_fraction, args.id_column,
+                              args.block_mb * 2 ** 20, args.restart, progress)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+    rows = manifest['rows']
+    total = rows['train'] + rows['test']
+    print(f"\nProcessed {(manifest['bytes'] - start_bytes) / 2 ** 20:,.1f} MB in {elapsed:.1f}s"
+          + _peak_memory())
+    print(f"Train: {rows['train']:,} rows | Test: {rows['test']:,} rows "
+          f"({rows['test'] / max(total, 1) * 100:.1f}%) in {manifest['blocks']} blocks")
+    print(f"\n✓ Saved {os.path.normpath(args.out)}")
+
+
+if __name__ == '__main__':
+    main()
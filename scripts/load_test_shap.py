@@ -0,0 +1,120 @@
+"""
+Load test: other sessions' rerun latency while a large SHAP job runs.
+
+Simulates several sessions rerunning a typical page (a single-row
+prediction and a serialized figure) in threads of this process, as
+Streamlit runs sessions, and records their rerun latency in three phases:
+idle, while a SHAP job runs in a server thread (as before the worker
+pool), and while the same job runs in the SHAP worker pool. With the pool
+the latency should stay close to idle; in-process SHAP holds the GIL for
+long stretches and stalls every session.
+
+Usage: python scripts/load_test_shap.py [--rows 5000] [--sessions 4] [--model XGBoost]
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+from concurrent.futures import wait
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+import plotly.graph_objects as go
+from config.settings import MODEL_PATHS, X_TRAIN_PATH, X_TEST_PATH, RANDOM_STATE
+from models.model_loader import load_model_file
+from models.explain import background_sample, make_explainer, iter_chunks
+from models import shap_pool
+from views.shap_analysis import _prepare_data_for_shap
+
+
+def _rerun(model, row, values):
+    """A typical session rerun: predict one row, build and serialize a small figure"""
+    model.predict(row)
+    fig = go.Figure(go.Bar(x=[f"f{i}" for i in range(len(values))], y=values))
+    fig.update_layout(title='Rerun', height=400)
+    pio.to_json(fig, validate=False)
+
+
+def _sessions(count, model, row, stop, latencies):
+    """Session threads rerunning with a short think time until stop is set"""
+    values = np.random.default_rng(RANDOM_STATE).random(20)
+
+    def session():
+        while not stop.is_set():
+            start = time.perf_counter()
+            _rerun(model, row, values)
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.05)
+    threads = [threading.Thread(target=session, daemon=True) for _ in range(count)]
+    for t in threads:
+        t.start()
+    return threads
+
+
+def _phase(name, count, model, row, job=None, seconds=None):
+    """Rerun latencies of `count` sessions while job() runs (or for `seconds`)"""
+    stop, latencies = threading.Event(), []
+    threads = _sessions(count, model, row, stop, latencies)
+    start = time.perf_counter()
+    if job is not None:
+        job()
+    else:
+        time.sleep(seconds)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for t in threads:
+        t.join()
+
+    ms = np.array(latencies) * 1000
+    print(f"{name:<22} {elapsed:>8.1f}s {len(ms):>8,} {np.percentile(ms, 50):>9.2f} "
+          f"{np.percentile(ms, 95):>9.2f} {ms.max():>9.2f}", flush=True)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=5000, help="Rows in the SHAP job (test rows resampled)")
+    parser.add_argument('--sessions', type=int, default=4, help="Concurrent sessions rerunning")
+    parser.add_argument('--model', default='XGBoost', choices=list(MODEL_PATHS))
+    args = parser.parse_args()
+
+    X_train, X_test = _prepare_data_for_shap(pd.read_csv(X_TRAIN_PATH), pd.read_csv(X_TEST_PATH))
+    features = X_test.sample(args.rows, replace=True, random_state=RANDOM_STATE).reset_index(drop=True)
+    background = background_sample(X_train, random_state=RANDOM_STATE)
+    model = load_model_file(args.model, MODEL_PATHS[args.model])
+    row = X_test.iloc[[0]]
+
+    def in_process():
+        explainer = make_explainer(model, background)
+        for start, end in iter_chunks(len(features)):
+            explainer(features.iloc[start:end])
+
+    def in_pool():
+        job = shap_pool.submit(args.model, background, features)
+        wait(job.futures)
+        job.done_parts()
+        shap_pool.release(job)
+
+    # Start the workers and load their models before timing
+    warmup = shap_pool.submit(args.model, background, features.iloc[:10])
+    wait(warmup.futures)
+    shap_pool.release(warmup)
+
+    print(f"{args.sessions} sessions, SHAP job of {args.rows:,} rows ({args.model})\n")
+    print(f"{'phase':<22} {'elapsed':>9} {'reruns':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    try:
+        duration = _phase('SHAP in-process', args.sessions, model, row, job=in_process)
+        _phase('SHAP in worker pool', args.sessions, model, row, job=in_pool)
+        _phase('idle', args.sessions, model, row, seconds=min(duration, 10))
+    finally:
+        shap_pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
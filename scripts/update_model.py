@@ -0,0 +1,121 @@
+"""
+Update the XGBoost model with new harvest records instead of retraining.
+
+Reads new records in the dataset's CSV format, either continues boosting
+the saved model on them (--mode continue) or refreshes its leaf values on
+all records and adds a bounded number of trees (--mode refit), and checks
+the result on the held-out test split. If test RMSE is no more than
+--tolerance worse than the current model's (or --force is given), the
+model file and its model_comparison.csv row are swapped in atomically and
+the conformal table is rebuilt; the running app picks up the new model on
+its next rerun.
+
+Usage: python scripts/update_model.py new_records.csv [--mode continue|refit]
+                                      [--max-rounds 50] [--append] [--compare]
+"""
+import os
+import sys
+import time
+import argparse
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from config.settings import (
+    FEATURE_NAMES, MODEL_PATHS, METRICS_PATH, CONFORMAL_TABLE_PATH,
+    UPDATE_MAX_ROUNDS, UPDATE_TOLERANCE
+)
+from models.features import encode_records
+from models.training import (
+    load_training_data, read_records, saved_params, update_xgboost, as_regressor,
+    fit_xgboost, evaluate_models, save_artifacts, append_records
+)
+from models.conformal import build_conformal_table, save_conformal_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('records', help="CSV of new records (dataset format)")
+    parser.add_argument('--mode', choices=['continue', 'refit'], default='continue')
+    parser.add_argument('--max-rounds', type=int, default=UPDATE_MAX_ROUNDS,
+                        help="Most trees to add")
+    parser.add_argument('--tolerance', type=float, default=UPDATE_TOLERANCE,
+                        help="Largest relative test RMSE increase accepted")
+    parser.add_argument('--force', action='store_true', help="Swap in the update even if it is worse")
+    parser.add_argument('--append', action='store_true',
+                        help="Also append the records to the dataset and training split")
+    parser.add_argument('--compare', action='store_true',
+                        help="Also time a full retrain on the combined training data")
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--dry-run', action='store_true', help="Do not write any files")
+    args = parser.parse_args()
+
+    raw = read_records(args.records)
+    missing = [c for c in FEATURE_NAMES + ['Yield_tons_per_hectare'] if c not in raw.columns]
+    if missing:
+        print(f"ERROR: {args.records} is missing columns: {missing}")
+        sys.exit(1)
+
+    data = load_training_data()
+    X_new = encode_records(raw[FEATURE_NAMES], list(data['X_train'].columns))
+    y_new = raw['Yield_tons_per_hectare'].to_numpy()
+
+    current = xgb.XGBRegressor()
+    current.load_model(MODEL_PATHS['XGBoost'])
+    booster = current.get_booster()
+
+    start = time.perf_counter()
+    updated, info = update_xgboost(booster, X_new, y_new, args.mode, args.max_rounds,
+                                   data['X_train'], data['y_train'], args.n_jobs)
+    update_time = time.perf_counter() - start
+    candidate = as_regressor(updated)
+
+    models = {'Current': current, f'Updated ({args.mode})': candidate}
+    timings = {f'Updated ({args.mode})': update_time}
+
+    if args.compare:
+        start = time.perf_counter()
+        models['Full retrain'] = fit_xgboost(pd.concat([data['X_train'], X_new], ignore_index=True),
+                                             np.concatenate([data['y_train'], y_new]),
+                                             saved_params(booster), args.n_jobs)
+        timings['Full retrain'] = time.perf_counter() - start
+
+    metrics = evaluate_models(models, data['X_test'], data['y_test'])
+    metrics['Time (s)'] = metrics['Model'].map(timings)
+
+    print(f"New records: {len(raw)} | trees: {info['trees_before']} + {info['trees_added']} "
+          f"| training rows: {info['rows']}\n")
+    print(metrics.to_string(index=False, float_format=lambda v: f"{v:.4f}", na_rep='-'))
+
+    rmse = metrics.set_index('Model')['RMSE']
+    limit = rmse['Current'] * (1 + args.tolerance)
+    accepted = rmse[f'Updated ({args.mode})'] <= limit
+    print(f"\nTest RMSE limit {limit:.4f}: update {'accepted' if accepted else 'rejected'}"
+          + (" (forced)" if args.force and not accepted else ""))
+
+    if args.dry_run or not (accepted or args.force):
+        return
+
+    comparison = pd.read_csv(METRICS_PATH)
+    row = metrics.loc[metrics['Model'] == f'Updated ({args.mode})', ['R²', 'MAE', 'RMSE', 'MAPE']]
+    comparison.loc[comparison['Model'] == 'XGBoost', ['R²', 'MAE', 'RMSE', 'MAPE']] = row.to_numpy()
+    written = save_artifacts({'XGBoost': candidate}, comparison)
+
+    calibrated = {name: candidate if name == 'XGBoost' else joblib.load(path)
+                  for name, path in MODEL_PATHS.items()}
+    save_conformal_table(build_conformal_table(calibrated, data['X_test'], data['y_test']))
+    written.append(CONFORMAL_TABLE_PATH)
+
+    if args.append:
+        written += append_records(raw[FEATURE_NAMES + ['Yield_tons_per_hectare']], X_new, y_new)
+
+    print("✓ Saved " + ", ".join(os.path.normpath(p) for p in written))
+
+
+if __name__ == '__main__':
+    main()
@@ -8,9 +8,17 @@ sys.path.insert(0, str(project_root))
 
 import streamlit as st
 
-from config.settings import APP_TITLE, APP_ICON, APP_LAYOUT, PAGES
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from config.settings import (
+    APP_TITLE, APP_ICON, APP_LAYOUT, PAGES, DEV_PANEL, PROFILE_DIR, METRICS_HOST, METRICS_PORT
+)
+from utils.metrics import start_metrics_server
+from utils.memory import register_session, enforce_session_budget, enforce_cache_budget
 from utils.styling import apply_custom_css
+from utils.profiling import record_rerun, span
 from components.sidebar import render_sidebar
+from components.dev_panel import render_dev_panel, profile_requested
 from views import (
     home,
     single_prediction,
@@ -19,6 +27,8 @@ from views import (
     data_visualization,
     batch_prediction,
     model_comparison,
+    prediction_history,
+    admin,
 )
 
 
@@ -36,27 +46,53 @@ def main() -> None:
         },
     )
 
-    # Global theme and custom CSS (glass, gradients, variables)
-    apply_custom_css()
-
-    # Sidebar navigation
-    selected_page = render_sidebar()
-
-    # Route to the chosen view
-    if selected_page == PAGES["home"]:
-        home.render()
-    elif selected_page == PAGES["prediction"]:
-        single_prediction.render()
-    elif selected_page == PAGES["performance"]:
-        model_performance.render()
-    elif selected_page == PAGES["shap"]:
-        shap_analysis.render()
-    elif selected_page == PAGES["visualization"]:
-        data_visualization.render()
-    elif selected_page == PAGES["batch"]:
-        batch_prediction.render()
-    elif selected_page == PAGES["comparison"]:
-        model_comparison.render()
+    # Prometheus endpoint (started once per process) and active session tracking
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT, METRICS_HOST)
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        register_session(ctx.session_id, ctx.session_state)
+
+    # Time the whole rerun when the developer panel is on (spans are no-ops otherwise)
+    profile_dir = PROFILE_DIR if DEV_PANEL and profile_requested() else None
+    with record_rerun(DEV_PANEL, profile_dir=profile_dir) as rerun:
+        # Global theme and custom CSS (glass, gradients, variables)
+        with span("theme"):
+            apply_custom_css()
+
+        # Sidebar navigation
+        with span("sidebar"):
+            selected_page = render_sidebar()
+
+        # Route to the chosen view
+        with span(f"render: {selected_page}"):
+            if selected_page == PAGES["home"]:
+                home.render()
+            elif selected_page == PAGES["prediction"]:
+                single_prediction.render()
+            elif selected_page == PAGES["performance"]:
+                model_performance.render()
+            elif selected_page == PAGES["shap"]:
+                shap_analysis.render()
+            elif selected_page == PAGES["visualization"]:
+                data_visualization.render()
+            elif selected_page == PAGES["batch"]:
+                batch_prediction.render()
+            elif selected_page == PAGES["comparison"]:
+                model_comparison.render()
+            elif selected_page == PAGES["history"]:
+                prediction_history.render()
+            elif selected_page == PAGES.get("admin"):
+                admin.render()
+
+        # Keep this session and the shared caches within their memory budgets
+        with span("memory budgets"):
+            if ctx is not None:
+                enforce_session_budget(ctx.session_id, ctx.session_state)
+            enforce_cache_budget()
+
+    if rerun is not None:
+        render_dev_panel(rerun)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+"""
+Developer panel: rerun timing spans and single-rerun profiling
+"""
+import io
+import os
+import pstats
+import pandas as pd
+import streamlit as st
+
+from utils.profiling import Rerun, span_rows
+
+
+# Session keys: profile the next rerun / files of the last capture
+PROFILE_NEXT_KEY = 'dev_profile_next'
+LAST_PROFILE_KEY = 'dev_last_profile'
+
+
+def profile_requested() -> bool:
+    """True (once) if the previous rerun armed a profile capture"""
+    return st.session_state.pop(PROFILE_NEXT_KEY, False)
+
+
+def _top_functions(profile_path: str, limit: int = 15) -> str:
+    """Functions with the most cumulative time in a cProfile capture"""
+    out = io.StringIO()
+    stats = pstats.Stats(profile_path, stream=out)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(limit)
+    # Drop the header lines before the table
+    text = out.getvalue()
+    return text[text.find('   ncalls'):].rstrip()
+
+
+def render_dev_panel(rerun: Rerun) -> None:
+    """Collapsible sidebar panel with the span tree of the rerun that just finished"""
+    if rerun.files:
+        st.session_state[LAST_PROFILE_KEY] = rerun.files
+
+    with st.sidebar.expander("🛠️ Developer", expanded=False):
+        st.caption(f"Last rerun: **{rerun.root.duration * 1000:,.1f} ms**")
+        rows = pd.DataFrame(span_rows(rerun.root))
+        st.dataframe(
+            rows.style.format({'ms': '{:,.1f}', 'Self ms': '{:,.1f}', '% of rerun': '{:.0f}%'}),
+            hide_index=True,
+            use_container_width=True
+        )
+
+        if st.button("🎯 Profile next rerun", use_container_width=True,
+                     help="Capture the next rerun with cProfile and write it to profiles/"):
+            st.session_state[PROFILE_NEXT_KEY] = True
+            st.rerun()
+
+        files = st.session_state.get(LAST_PROFILE_KEY)
+        if not files or not os.path.exists(files['profile']):
+            return
+
+        st.markdown("**Last capture**")
+        st.caption(f"`{os.path.normpath(files['profile'])}` (snakeviz / pstats)\n\n"
+                   f"`{os.path.normpath(files['flamegraph'])}` (speedscope.app)")
+        st.code(_top_functions(files['profile']), language=None)
+        for key, mime in (('profile', 'application/octet-stream'), ('flamegraph', 'application/json')):
+            with open(files[key], 'rb') as f:
+                st.download_button(f"⬇️ {os.path.basename(files[key])}", f.read(),
+                                   file_name=os.path.basename(files[key]), mime=mime,
+                                   use_container_width=True, key=f"dev_download_{key}")
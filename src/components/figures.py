@@ -0,0 +1,110 @@
+"""
+Figure factory: shared Plotly theme template and cached, serialized figures
+"""
+import json
+import hashlib
+import functools
+from typing import Any, Callable, Dict, Optional
+
+import plotly.io as pio
+import plotly.graph_objects as go
+import streamlit as st
+
+from config.theme import COLORS
+from utils.metrics import cache_metrics
+from utils.profiling import timed
+
+
+THEME_TEMPLATE = 'cropyield'
+
+# Registered builders, by module-qualified name
+_BUILDERS: Dict[str, Callable[..., go.Figure]] = {}
+
+
+def _theme_layout() -> Dict[str, Any]:
+    """Layout defaults of every app figure, from the theme colors"""
+    axis = dict(gridcolor=COLORS['border_light'], zerolinecolor=COLORS['border_light'],
+                linecolor=COLORS['border_medium'])
+    return dict(
+        plot_bgcolor=COLORS['bg_card'],
+        paper_bgcolor=COLORS['bg_card'],
+        font=dict(color=COLORS['text_primary'], family='Inter'),
+        title=dict(font=dict(color=COLORS['text_primary'])),
+        xaxis=axis,
+        yaxis=axis,
+        colorway=[COLORS['primary'], COLORS['secondary'], COLORS['accent_emerald'], COLORS['accent_amber'],
+                  COLORS['accent_rose'], COLORS['accent_cyan'], COLORS['accent_purple']],
+        hoverlabel=dict(bgcolor=COLORS['bg_secondary'], font=dict(color=COLORS['text_primary'])),
+        legend=dict(bgcolor='rgba(0,0,0,0)')
+    )
+
+
+def register_theme() -> str:
+    """
+    Register the app template (plotly_dark with the theme colors) with plotly.io
+
+    Returns:
+        Theme key: a hash of the template, part of every figure's cache key
+        so cached figures are rebuilt when the theme changes
+    """
+    layout = _theme_layout()
+    template = go.layout.Template(pio.templates['plotly_dark'])
+    template.layout.update(layout)
+    pio.templates[THEME_TEMPLATE] = template
+    return hashlib.sha1(json.dumps(layout, sort_keys=True).encode()).hexdigest()[:12]
+
+
+THEME_KEY = register_theme()
+
+
+def figure_json(fig: go.Figure) -> str:
+    """Serialize a figure in the app template (uncached, for one-off figures such as live progress)"""
+    fig.update_layout(template=THEME_TEMPLATE)
+    return pio.to_json(fig, validate=False)
+
+
+@cache_metrics(st.cache_data)
+def _figure_json(name: str, theme: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+    """Serialized figure of a builder (cached on builder, theme and parameters)"""
+    return figure_json(_BUILDERS[name](*args, **kwargs))
+
+
+def figure_builder(fn: Callable[..., go.Figure]) -> Callable[..., str]:
+    """
+    Register a figure builder and memoize its serialized output
+
+    The builder returns a go.Figure styled only where it differs from the
+    theme template. The decorated function returns the figure's JSON,
+    cached on (builder, theme, arguments). Pass a data version (e.g.
+    get_data_version()) and small parameters rather than large frames,
+    and let the builder load data from the cached loaders, so the cache
+    key stays cheap to hash. `__wrapped__` is the builder itself
+    (an unthemed go.Figure, uncached).
+
+    Usage:
+        @figure_builder
+        def yield_histogram(version, bins): ...
+
+        show_figure(yield_histogram(get_data_version(), 30))
+    """
+    name = f"{fn.__module__}.{fn.__qualname__}"
+    _BUILDERS[name] = timed(fn.__name__)(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return _figure_json(name, THEME_KEY, args, kwargs)
+    return wrapper
+
+
+def clear_figure_cache() -> None:
+    """Drop every cached figure (they are rebuilt on next use)"""
+    _figure_json.clear()
+
+
+def show_figure(fig_json: str, key: Optional[str] = None) -> None:
+    """Display a figure built by a figure_builder, in the app template rather than Streamlit's theme"""
+    # The figure was validated when it was built; a plain dict would be
+    # validated again by st.plotly_chart on every rerun, costing more than
+    # building it did
+    fig = go.Figure(json.loads(fig_json), _validate=False)
+    st.plotly_chart(fig, key=key, theme=None, use_container_width=True)
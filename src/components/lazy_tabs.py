@@ -0,0 +1,41 @@
+"""
+Lazy tabs: render only the selected tab's content
+"""
+import time
+from typing import Callable, Dict, Optional
+
+import streamlit as st
+
+from utils.metrics import TAB_RENDER_SECONDS
+from utils.profiling import span
+
+
+def lazy_tabs(tabs: Dict[str, Callable[[], None]], key: str, default: Optional[str] = None) -> str:
+    """
+    Tab bar that only runs the renderer of the selected tab
+
+    st.tabs runs every tab's code on every rerun and hides all but one in
+    the browser; here the other tabs' renderers are not called at all.
+    The selection is kept in session state under `key`, so it survives
+    reruns triggered by widgets inside the tab. Each render is timed as a
+    span and in the cropyield_tab_render_seconds histogram.
+
+    Args:
+        tabs: Tab label -> zero-argument renderer, in display order
+        key: Session state key of the selection (unique per page)
+        default: Label selected on first load (the first tab if None)
+
+    Returns:
+        Label of the tab that was rendered
+    """
+    labels = list(tabs)
+    if st.session_state.get(key) not in labels:
+        st.session_state[key] = default if default in labels else labels[0]
+
+    selected = st.radio("Section", labels, key=key, horizontal=True, label_visibility="collapsed")
+
+    start = time.perf_counter()
+    with span(f"tab: {selected}"):
+        tabs[selected]()
+    TAB_RENDER_SECONDS.observe(time.perf_counter() - start, key, selected)
+    return selected
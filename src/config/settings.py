@@ -23,6 +23,102 @@ MODEL_PATHS = {
 
 METRICS_PATH = os.path.join(MODEL_DIR, 'model_comparison.csv')
 
+# Winning hyperparameters of the last training run (written by scripts/train.py)
+BEST_PARAMS_PATH = os.path.join(MODEL_DIR, 'best_params.json')
+
+# Split-conformal residual quantiles (built by scripts/build_conformal_table.py)
+CONFORMAL_TABLE_PATH = os.path.join(MODEL_DIR, 'conformal_table.json')
+
+# Hash-split Parquet shards (written by scripts/hash_split.py)
+SPLIT_DIR = os.path.join(DATA_DIR, 'split')
+
+# Dataset profile (summary statistics, rebuilt or extended when the dataset changes).
+# Built from mergeable sketches a block at a time, so its size and the memory
+# used to build it do not grow with the dataset
+PROFILE_PATH = os.path.join(DATA_DIR, 'dataset_profile.json')
+PROFILE_HIST_BINS = 960
+PROFILE_DIGEST_COMPRESSION = 500
+PROFILE_TOP_VALUES = 64
+PROFILE_SAMPLE_ROWS = 20
+PROFILE_BLOCK_BYTES = 16 * 1024 * 1024
+
+# Yield cube: count/sum/sum of squares for every combination of these columns
+# (drill-down order), extended when rows are appended to the dataset
+CUBE_PATH = os.path.join(DATA_DIR, 'yield_cube.npz')
+CUBE_DIMENSIONS = ['Crop', 'Soil_Type', 'Weather_Condition', 'Fertilizer_Used', 'Irrigation_Used']
+
+# Nearest historical farms index (rebuilt when the dataset changes)
+NEIGHBOR_INDEX_PATH = os.path.join(MODEL_DIR, 'neighbor_index.joblib')
+
+# SHAP analysis: background rows given to the explainer, and rows explained
+# per chunk (the progress bar and partial importances update after each)
+SHAP_BACKGROUND_ROWS = 100
+SHAP_CHUNK_ROWS = 100
+
+# Rendered SHAP plots kept per analysis and plot kind (summary, waterfall),
+# least recently viewed dropped first
+SHAP_PLOT_CACHE_ENTRIES = 5
+
+# SHAP worker processes (each loads its own model and explainer copies), how
+# often a waiting page checks its job, and how long a finished job nobody
+# collected is kept for sessions that asked for the same analysis. Workers
+# are capped at the cores left over by the server process: a worker sharing
+# the server's core slows every session's reruns
+SHAP_WORKERS = max(1, min(int(os.environ.get('CROPYIELD_SHAP_WORKERS', '2')), (os.cpu_count() or 1) - 1))
+SHAP_POLL_SECONDS = 0.25
+SHAP_JOB_TTL_SECONDS = 600
+
+# Batch "explain all rows": rows per chunk of native tree contributions (with
+# interactions a chunk holds a features x features matrix per row)
+CONTRIB_CHUNK_ROWS = 10_000
+# The Decision Tree's exact contributions come from per-leaf tables (2^M rows
+# for a leaf with M path features): cells per block of table lookups, and the
+# table size above which shap's TreeExplainer is used instead
+CONTRIB_BLOCK_CELLS = 2_000_000
+CONTRIB_TABLE_MAX_CELLS = 50_000_000
+
+# Benchmark suite results (scripts/benchmark_suite.py), one JSON per run
+BENCHMARK_DIR = os.path.join(BASE_DIR, '..', 'benchmarks')
+
+# Developer panel with per-rerun timing spans (enable with CROPYIELD_DEV_PANEL=1)
+DEV_PANEL = os.environ.get('CROPYIELD_DEV_PANEL', '') == '1'
+
+# Admin page (sessions, cache eviction, tracemalloc): listed only when
+# enabled with CROPYIELD_ADMIN=1, as it exposes every session and slows all
+ADMIN_PAGE = os.environ.get('CROPYIELD_ADMIN', '') == '1'
+
+# Single-rerun cProfile and flame graph captures from the developer panel
+PROFILE_DIR = os.path.join(BASE_DIR, '..', 'profiles')
+
+# Prometheus metrics endpoint (scrape http://METRICS_HOST:METRICS_PORT/metrics; port 0 disables)
+METRICS_HOST = os.environ.get('CROPYIELD_METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.environ.get('CROPYIELD_METRICS_PORT', '9464'))
+# Sessions count as active while they rerun at least this often
+SESSION_IDLE_SECONDS = 300
+
+# Memory budgets checked after every rerun: the largest session state values
+# are spilled to SPILL_DIR, the largest st.cache_* entries evicted
+SESSION_STATE_BUDGET = int(os.environ.get('CROPYIELD_SESSION_BUDGET_MB', '64')) * 2 ** 20
+CACHE_BUDGET = int(os.environ.get('CROPYIELD_CACHE_BUDGET_MB', '1024')) * 2 ** 20
+SPILL_MIN_BYTES = 2 ** 20
+SPILL_DIR = os.path.join(BASE_DIR, '..', 'spill')
+
+# Prediction history: SQLite database, latest entries kept per session,
+# writer batching and history page size
+HISTORY_DB_PATH = os.path.join(DATA_DIR, 'prediction_history.db')
+HISTORY_RING_SIZE = 50
+HISTORY_BATCH_SIZE = 500
+HISTORY_FLUSH_SECONDS = 0.25
+HISTORY_PAGE_SIZE = 50
+
+# Chart data reduction: scatters switch to WebGL above CHART_WEBGL_POINTS points
+# and to a CHART_DENSITY_BINS x CHART_DENSITY_BINS density grid above
+# CHART_POINT_BUDGET; histograms are always binned server-side
+CHART_WEBGL_POINTS = 2_000
+CHART_POINT_BUDGET = 50_000
+CHART_DENSITY_BINS = 100
+CHART_HISTOGRAM_BINS = 30
+
 # App configuration
 APP_TITLE = "Crop Yield Prediction System"
 APP_ICON = "🌾"
@@ -33,6 +129,85 @@ from config.theme import COLORS, TYPOGRAPHY, SPACING, BORDER_RADIUS, SHADOWS, TR
 
 # Categorical columns
 CATEGORICAL_COLS = ['Soil_Type', 'Crop', 'Weather_Condition']
+NUMERIC_COLS = ['Rainfall_mm', 'Temperature_Celsius', 'Days_to_Harvest']
+INTEGER_COLS = ['Days_to_Harvest']
+BOOLEAN_COLS = ['Fertilizer_Used', 'Irrigation_Used']
+
+# Categories dropped by one-hot encoding (drop_first=True) in split_dataset.py
+BASELINE_CATEGORIES = {
+    'Soil_Type': 'Chalky',
+    'Crop': 'Barley',
+    'Weather_Condition': 'Cloudy'
+}
+
+# Prediction interval settings
+CONFIDENCE_LEVELS = [0.80, 0.90, 0.95]
+CONFORMAL_SEGMENTS = ['Crop', 'Soil_Type']
+CONFORMAL_MIN_SEGMENT_SIZE = 20
+
+# Similar farms lookup: exact-match partitions from most to least specific,
+# with a KD-tree over the standardized numeric features inside each one
+NEIGHBOR_PARTITION_LEVELS = [
+    ['Soil_Type', 'Crop', 'Weather_Condition', 'Fertilizer_Used', 'Irrigation_Used'],
+    ['Soil_Type', 'Crop', 'Weather_Condition'],
+    ['Soil_Type', 'Crop'],
+    ['Crop'],
+    []
+]
+NEIGHBOR_NUMERIC_COLS = NUMERIC_COLS
+NEIGHBOR_K = 5
+
+# Leaf proximity index: trees per inverted-index block and examples shown
+PROXIMITY_BLOCK_TREES = 10
+PROXIMITY_K = 5
+
+# Counterfactual search: numeric changes cost |delta| / std, switching a
+# category or flag costs COUNTERFACTUAL_SWITCH_COST
+COUNTERFACTUAL_TARGET = 7.0
+COUNTERFACTUAL_SWITCH_COST = 1.0
+COUNTERFACTUAL_MAX_RESULTS = 3
+COUNTERFACTUAL_MAX_EVALUATIONS = 5000
+
+# Training pipeline (scripts/train.py): the notebook's XGBoost grid.
+# n_estimators values are scored as checkpoints of one boosting run per
+# config, stopped early once an inner split of the training fold (a
+# EARLY_STOPPING_FRACTION share of it) stops improving, so the scored
+# validation fold never picks the stopping round
+RANDOM_STATE = 42
+XGB_PARAM_GRID = {
+    'n_estimators': [100, 200, 300],
+    'max_depth': [3, 5, 7],
+    'learning_rate': [0.01, 0.05, 0.1],
+    'subsample': [0.8, 0.9, 1.0]
+}
+CV_FOLDS = 3
+EARLY_STOPPING_ROUNDS = 20
+EARLY_STOPPING_FRACTION = 0.1
+
+# Adaptive search modes: keep the best 1/HALVING_ETA of configs per rung;
+# Bayesian search tries BAYES_TRIALS configs, the first BAYES_INITIAL at random
+HALVING_ETA = 3
+BAYES_TRIALS = 12
+BAYES_INITIAL = 5
+
+# Incremental updates: extra boosting rounds allowed, share of the new
+# records held out for early stopping, and the largest relative increase
+# in test RMSE accepted before the current model is kept
+UPDATE_MAX_ROUNDS = 50
+UPDATE_VALID_FRACTION = 0.2
+UPDATE_TOLERANCE = 0.02
+
+# Hash split: a record goes to test when the hash of its line (or id
+# column) falls below SPLIT_TEST_FRACTION; input is read in blocks of
+# SPLIT_BLOCK_BYTES so memory stays flat whatever the file size
+SPLIT_TEST_FRACTION = 0.2
+SPLIT_BLOCK_BYTES = 64 * 1024 * 1024
+SPLIT_HASH_KEY = '0123456789123456'
+
+# Synthetic dataset generator (scripts/generate_dataset.py): rows drawn
+# per seeded chunk, and quantiles kept per crop for numeric features
+SYNTHETIC_CHUNK_ROWS = 1_000_000
+SYNTHETIC_QUANTILES = 101
 
 # Feature names
 FEATURE_NAMES = [
@@ -40,6 +215,16 @@ FEATURE_NAMES = [
     'Fertilizer_Used', 'Irrigation_Used', 'Weather_Condition', 'Days_to_Harvest'
 ]
 
+TARGET_COL = 'Yield_tons_per_hectare'
+
+# One-hot encoded training column order (as in X_train.csv)
+ENCODED_COLUMNS = [
+    'Rainfall_mm', 'Temperature_Celsius', 'Fertilizer_Used', 'Irrigation_Used', 'Days_to_Harvest',
+    'Crop_Cotton', 'Crop_Maize', 'Crop_Rice', 'Crop_Soybean', 'Crop_Wheat',
+    'Soil_Type_Clay', 'Soil_Type_Loam', 'Soil_Type_Peaty', 'Soil_Type_Sandy', 'Soil_Type_Silt',
+    'Weather_Condition_Rainy', 'Weather_Condition_Sunny'
+]
+
 # Page names
 PAGES = {
     'home': '🏠 Home',
@@ -48,5 +233,8 @@ PAGES = {
     'shap': '🔍 SHAP Analysis',
     'visualization': '📈 Data Visualization',
     'batch': '🤖 Batch Prediction',
-    'comparison': '⚖️ Model Comparison'
+    'comparison': '⚖️ Model Comparison',
+    'history': '🕘 Prediction History'
 }
+if ADMIN_PAGE:
+    PAGES['admin'] = '🛡️ Admin'
@@ -0,0 +1,117 @@
+"""
+Chart data reduction: bin or aggregate large series before they reach Plotly
+
+st.plotly_chart serializes every trace value into the page, so a figure
+built from raw rows grows with the data. Histograms are binned here with
+NumPy and sent as bars; scatters are sent as points up to a point budget
+(as WebGL above a smaller threshold) and as a 2D density grid beyond it.
+"""
+import numpy as np
+import plotly.graph_objects as go
+from typing import Any, Dict, Optional
+
+from config.settings import CHART_WEBGL_POINTS, CHART_POINT_BUDGET, CHART_DENSITY_BINS, CHART_HISTOGRAM_BINS
+
+
+def _finite(*arrays) -> np.ndarray:
+    """Mask of the positions where every array holds a finite value"""
+    mask = np.ones(len(arrays[0]), dtype=bool)
+    for a in arrays:
+        mask &= np.isfinite(np.asarray(a, dtype=np.float64))
+    return mask
+
+
+def histogram_bar(edges: np.ndarray, counts: np.ndarray, **kwargs) -> go.Bar:
+    """Bar trace drawing pre-binned counts as a histogram"""
+    edges = np.asarray(edges, dtype=np.float64)
+    return go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        hovertemplate='%{x:.4g}<br>Count: %{y:,}<extra></extra>',
+        **kwargs
+    )
+
+
+def histogram_trace(values, bins: int = CHART_HISTOGRAM_BINS, **kwargs) -> go.Bar:
+    """
+    Histogram of raw values, binned server-side
+
+    Drop-in for go.Histogram(x=values, nbinsx=bins, ...): the figure holds
+    `bins` counts instead of every value.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    counts, edges = np.histogram(x[np.isfinite(x)], bins=bins)
+    return histogram_bar(edges, counts, **kwargs)
+
+
+def density_grid(x, y, z=None, bins: int = CHART_DENSITY_BINS) -> Dict[str, np.ndarray]:
+    """
+    Aggregate points onto a bins x bins grid over their range
+
+    Returns:
+        Dict with x and y bin centers, counts per cell (rows follow y) and,
+        when z is given, the mean of z per cell (NaN for empty cells)
+    """
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    z = None if z is None else np.asarray(z, dtype=np.float64)
+    keep = _finite(x, y) if z is None else _finite(x, y, z)
+    x, y = x[keep], y[keep]
+
+    cells = []
+    for values in (x, y):
+        lo, hi = (values.min(), values.max()) if len(values) else (0.0, 1.0)
+        hi = hi if hi > lo else lo + 1.0
+        index = np.minimum(((values - lo) * (bins / (hi - lo))).astype(np.int64), bins - 1)
+        cells.append((index, lo + (np.arange(bins) + 0.5) * (hi - lo) / bins))
+    flat = cells[1][0] * bins + cells[0][0]
+
+    counts = np.bincount(flat, minlength=bins * bins).reshape(bins, bins)
+    grid = {'x': cells[0][1], 'y': cells[1][1], 'counts': counts}
+    if z is not None:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            grid['mean'] = np.bincount(flat, weights=z[keep], minlength=bins * bins).reshape(bins, bins) / counts
+    return grid
+
+
+def is_reduced(points: int, budget: int = CHART_POINT_BUDGET) -> bool:
+    """True if scatter_trace draws this many points as a density grid"""
+    return points > budget
+
+
+def scatter_trace(x, y, color=None, colorscale: Optional[str] = None, colorbar_title: Optional[str] = None,
+                  marker: Optional[Dict[str, Any]] = None, budget: int = CHART_POINT_BUDGET,
+                  bins: int = CHART_DENSITY_BINS, **kwargs):
+    """
+    Marker scatter that stays light whatever the number of points
+
+    Up to CHART_WEBGL_POINTS points this is a plain go.Scatter, up to
+    `budget` a go.Scattergl (WebGL), and beyond that a go.Heatmap of the
+    point count per cell, or of the mean color value when `color` is given.
+
+    Args:
+        color: Optional values mapped through colorscale
+        marker: Marker style for the point modes
+        **kwargs: Further trace properties for the point modes (name,
+            customdata, hovertemplate, ...); only name carries over to the grid
+    """
+    if is_reduced(len(x), budget):
+        grid = density_grid(x, y, color, bins)
+        z = grid['mean'] if color is not None else grid['counts']
+        return go.Heatmap(
+            x=grid['x'], y=grid['y'], z=z,
+            customdata=grid['counts'],
+            colorscale=colorscale or 'Viridis',
+            colorbar=dict(title=colorbar_title if color is not None else 'Points'),
+            hovertemplate=('x: %{x:.4g}<br>y: %{y:.4g}<br>'
+                           + ('Mean: %{z:.3g}<br>' if color is not None else '')
+                           + 'Points: %{customdata:,}<extra></extra>'),
+            hoverongaps=False,
+            name=kwargs.get('name')
+        )
+
+    marker = dict(marker or {})
+    if color is not None:
+        marker.update(color=color, colorscale=colorscale, showscale=True, colorbar=dict(title=colorbar_title))
+    trace = go.Scattergl if len(x) > CHART_WEBGL_POINTS else go.Scatter
+    return trace(x=x, y=y, mode='markers', marker=marker, **kwargs)
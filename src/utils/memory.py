@@ -0,0 +1,384 @@
+"""
+Memory accounting for session state and st.cache_* entries, with budgets
+"""
+import os
+import sys
+import time
+import pickle
+import hashlib
+import shutil
+import weakref
+import threading
+import tracemalloc
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.settings import (
+    SESSION_IDLE_SECONDS, SESSION_STATE_BUDGET, CACHE_BUDGET, SPILL_DIR, SPILL_MIN_BYTES
+)
+
+
+# Containers longer than this are sized from an evenly spaced sample
+_SAMPLE = 1000
+
+
+def _sized_sample(items: List[Any], seen: set) -> int:
+    if len(items) <= _SAMPLE:
+        return sum(deep_sizeof(item, seen) for item in items)
+    step = len(items) / _SAMPLE
+    sample = sum(deep_sizeof(items[int(i * step)], seen) for i in range(_SAMPLE))
+    return int(sample * len(items) / _SAMPLE)
+
+
+def _frame_sizeof(obj: Any) -> int:
+    """Deep pandas memory usage; object payloads of long frames are scaled from a sample"""
+    if len(obj) <= 100 * _SAMPLE:
+        return int(np.sum(obj.memory_usage(deep=True)))
+    sample = obj[::len(obj) // (10 * _SAMPLE)]
+    payload = np.sum(sample.memory_usage(deep=True)) - np.sum(sample.memory_usage(deep=False))
+    return int(np.sum(obj.memory_usage(deep=False)) + payload * len(obj) / len(sample))
+
+
+def deep_sizeof(obj: Any, _seen: Optional[set] = None) -> int:
+    """
+    Approximate bytes held by an object and everything it references
+
+    numpy arrays and pandas objects are sized from their buffers, containers
+    and plain objects recursively (long containers from a sample); shared
+    objects are counted once. Native allocations outside Python objects
+    (e.g. XGBoost boosters) are not visible.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        size = sys.getsizeof(obj)
+        return size if obj.base is None else size + deep_sizeof(obj.base, seen)
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        return _frame_sizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return sys.getsizeof(obj)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return size + _sized_sample(list(obj.keys()), seen) + _sized_sample(list(obj.values()), seen)
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + _sized_sample(list(obj), seen)
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += deep_sizeof(vars(obj), seen)
+    for name in getattr(type(obj), '__slots__', ()):
+        if hasattr(obj, name):
+            size += deep_sizeof(getattr(obj, name), seen)
+    return size
+
+
+def format_bytes(n: float) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(n) < 1024 or unit == 'GB':
+            return f"{n:,.0f} {unit}" if unit == 'B' else f"{n:,.1f} {unit}"
+        n /= 1024
+
+
+def process_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (Linux), or None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Session state
+# ---------------------------------------------------------------------------
+
+class Spilled:
+    """Placeholder left in session state for a value written to disk"""
+    __slots__ = ('path', 'nbytes', 'type_name')
+
+    def __init__(self, path: str, nbytes: int, type_name: str):
+        self.path = path
+        self.nbytes = nbytes
+        self.type_name = type_name
+
+    def load(self) -> Any:
+        with open(self.path, 'rb') as f:
+            return pickle.load(f)
+
+    def __repr__(self) -> str:
+        return f"Spilled({self.type_name}, {format_bytes(self.nbytes)})"
+
+
+# session id -> (weak reference to its state, last rerun time)
+_sessions: Dict[str, Tuple[weakref.ref, float]] = {}
+# session id -> key -> (id, len, bytes) of the value last sized
+_size_memo: Dict[str, Dict[str, Tuple[int, int, int]]] = {}
+_sessions_lock = threading.Lock()
+
+# Spill files go in a per-process directory; sessions do not outlive it
+_spill_root = os.path.join(SPILL_DIR, str(os.getpid()))
+
+
+def register_session(session_id: str, state: Any) -> None:
+    """Track a session's state object (call once per rerun)"""
+    with _sessions_lock:
+        _sessions[session_id] = (weakref.ref(state), time.monotonic())
+
+
+def live_sessions() -> Dict[str, Any]:
+    """
+    States of sessions that reran within SESSION_IDLE_SECONDS
+
+    Sessions that ended or went idle are forgotten and their spill files
+    deleted.
+    """
+    cutoff = time.monotonic() - SESSION_IDLE_SECONDS
+    live, gone = {}, []
+    with _sessions_lock:
+        for session_id, (ref, seen) in _sessions.items():
+            state = ref()
+            if state is None or seen < cutoff:
+                gone.append(session_id)
+            else:
+                live[session_id] = state
+        for session_id in gone:
+            del _sessions[session_id]
+            _size_memo.pop(session_id, None)
+    for session_id in gone:
+        shutil.rmtree(os.path.join(_spill_root, session_id), ignore_errors=True)
+    return live
+
+
+def _state_items(state: Any) -> Dict[str, Any]:
+    # Streamlit's SafeSessionState: user keys plus keyed widget values
+    filtered = getattr(state, 'filtered_state', None)
+    return dict(filtered if filtered is not None else state)
+
+
+def session_usage(session_id: str, state: Any) -> List[Dict[str, Any]]:
+    """
+    Bytes held per session state key, largest first
+
+    Sizes are memoized per value object (and length, for containers that
+    grow in place), so repeated calls only size new or changed values.
+    """
+    memo = _size_memo.setdefault(session_id, {})
+    rows = []
+    for key, value in _state_items(state).items():
+        length = len(value) if hasattr(value, '__len__') and not isinstance(value, (str, bytes)) else -1
+        cached = memo.get(key)
+        if cached is not None and cached[:2] == (id(value), length):
+            nbytes = cached[2]
+        else:
+            nbytes = 0 if isinstance(value, Spilled) else deep_sizeof(value)
+            memo[key] = (id(value), length, nbytes)
+        rows.append({
+            'key': key, 'type': value.type_name if isinstance(value, Spilled) else type(value).__name__,
+            'bytes': nbytes, 'spilled': value.nbytes if isinstance(value, Spilled) else 0
+        })
+    for key in set(memo) - {row['key'] for row in rows}:
+        del memo[key]
+    return sorted(rows, key=lambda row: row['bytes'], reverse=True)
+
+
+def spill(session_id: str, state: Any, key: str) -> int:
+    """
+    Write a session state value to disk, leaving a Spilled placeholder
+
+    Returns:
+        Bytes freed (as sized before spilling)
+    """
+    value = state[key]
+    if isinstance(value, Spilled):
+        return 0
+    nbytes = deep_sizeof(value)
+    directory = os.path.join(_spill_root, session_id)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{hashlib.sha1(key.encode()).hexdigest()[:16]}.pkl")
+    with open(path, 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    state[key] = Spilled(path, nbytes, type(value).__name__)
+    return nbytes
+
+
+def get_state(state: Any, key: str, default: Any = None) -> Any:
+    """
+    Session state value, reloading it first if it was spilled to disk
+
+    Use instead of `st.session_state.get` for keys that may be spilled
+    (any large value stored by a view).
+    """
+    if key not in state:
+        return default
+    value = state[key]
+    if isinstance(value, Spilled):
+        spilled, value = value, value.load()
+        state[key] = value
+        os.remove(spilled.path)
+    return value
+
+
+def session_file(session_id: Optional[str], name: str) -> str:
+    """
+    Path of a scratch file of a session (e.g. a large download), next to its spill files
+
+    Deleted with them once the session ends or goes idle.
+    """
+    directory = os.path.join(_spill_root, session_id or 'no-session')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, name)
+
+
+def enforce_session_budget(session_id: str, state: Any,
+                           budget: int = SESSION_STATE_BUDGET) -> List[Tuple[str, int]]:
+    """
+    Spill the largest values of a session until it fits its budget
+
+    Values smaller than SPILL_MIN_BYTES (widget values, flags, ...) are
+    never spilled.
+
+    Returns:
+        (key, bytes) of every spilled value
+    """
+    rows = session_usage(session_id, state)
+    total = sum(row['bytes'] for row in rows)
+    spilled = []
+    for row in rows:
+        if total <= budget or row['bytes'] < SPILL_MIN_BYTES:
+            break
+        try:
+            freed = spill(session_id, state, row['key'])
+        except Exception:
+            # Unpicklable or widget-bound values stay in memory
+            continue
+        total -= freed
+        spilled.append((row['key'], freed))
+    return spilled
+
+
+# ---------------------------------------------------------------------------
+# st.cache_* entries (recorded by utils.metrics.cache_metrics)
+# ---------------------------------------------------------------------------
+
+# function name -> {'clear', 'max_entries', 'entries': key -> entry}
+_caches: Dict[str, Dict[str, Any]] = {}
+_caches_lock = threading.Lock()
+
+
+def _entry_key(args: Tuple, kwargs: Dict[str, Any]) -> str:
+    text = ', '.join([repr(a) for a in args] + [f"{k}={v!r}" for k, v in sorted(kwargs.items())])
+    return text if len(text) <= 120 else text[:117] + '...'
+
+
+def record_cache_entry(name: str, clear: Callable, max_entries: Optional[int],
+                       args: Tuple, kwargs: Dict[str, Any], value: Any) -> None:
+    """Size a freshly computed cache entry"""
+    nbytes = deep_sizeof(value)
+    with _caches_lock:
+        cache = _caches.setdefault(name, {'clear': clear, 'max_entries': max_entries, 'entries': OrderedDict()})
+        entries = cache['entries']
+        key = _entry_key(args, kwargs)
+        entries.pop(key, None)
+        entries[key] = {'args': args, 'kwargs': kwargs, 'bytes': nbytes, 'created': time.time()}
+        # Streamlit drops the oldest entries beyond max_entries
+        while max_entries and len(entries) > max_entries:
+            entries.popitem(last=False)
+
+
+def forget_cache_entries(name: str, args: Tuple = (), kwargs: Optional[Dict[str, Any]] = None) -> None:
+    """Drop the records of cleared entries (all of them without arguments)"""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            return
+        if args or kwargs:
+            cache['entries'].pop(_entry_key(args, kwargs or {}), None)
+        else:
+            cache['entries'].clear()
+
+
+def cache_usage() -> List[Dict[str, Any]]:
+    """Bytes held per cache entry (as sized when computed), largest first"""
+    with _caches_lock:
+        rows = [{'function': name, 'entry': key, 'bytes': entry['bytes'], 'created': entry['created']}
+                for name, cache in _caches.items() for key, entry in cache['entries'].items()]
+    return sorted(rows, key=lambda row: row['bytes'], reverse=True)
+
+
+def evict_cache_entry(name: str, key: str) -> int:
+    """Clear one cache entry; returns its recorded bytes"""
+    with _caches_lock:
+        cache = _caches.get(name)
+        entry = cache['entries'].get(key) if cache else None
+    if entry is None:
+        return 0
+    cache['clear'](*entry['args'], **entry['kwargs'])
+    forget_cache_entries(name, entry['args'], entry['kwargs'])
+    return entry['bytes']
+
+
+def enforce_cache_budget(budget: int = CACHE_BUDGET) -> List[Tuple[str, str, int]]:
+    """
+    Evict the largest cache entries until all of them fit the budget
+
+    Evicted entries are recomputed on their next use.
+
+    Returns:
+        (function, entry, bytes) of every evicted entry
+    """
+    rows = cache_usage()
+    total = sum(row['bytes'] for row in rows)
+    evicted = []
+    for row in rows:
+        if total <= budget:
+            break
+        total -= evict_cache_entry(row['function'], row['entry'])
+        evicted.append((row['function'], row['entry'], row['bytes']))
+    return evicted
+
+
+def tracked_bytes() -> Tuple[int, int]:
+    """(session state, cache) bytes as last measured, without resizing anything"""
+    with _sessions_lock:
+        sessions = sum(entry[2] for memo in _size_memo.values() for entry in memo.values())
+    with _caches_lock:
+        caches = sum(entry['bytes'] for cache in _caches.values() for entry in cache['entries'].values())
+    return sessions, caches
+
+
+# ---------------------------------------------------------------------------
+# tracemalloc snapshots
+# ---------------------------------------------------------------------------
+
+_last_snapshot: Optional[tracemalloc.Snapshot] = None
+
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+]
+
+
+def snapshot_top(limit: int = 20) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Take a tracemalloc snapshot (tracing must be on)
+
+    Returns:
+        Top allocation sites by size, and by growth since the previous
+        snapshot (empty on the first one)
+    """
+    global _last_snapshot
+    snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+    top = [{'location': str(stat.traceback), 'bytes': stat.size, 'blocks': stat.count}
+           for stat in snapshot.statistics('lineno')[:limit]]
+    growth = []
+    if _last_snapshot is not None:
+        growth = [{'location': str(stat.traceback), 'bytes': stat.size_diff, 'blocks': stat.count_diff}
+                  for stat in snapshot.compare_to(_last_snapshot, 'lineno')[:limit]]
+    _last_snapshot = snapshot
+    return top, growth
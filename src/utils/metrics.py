@@ -0,0 +1,286 @@
+"""
+In-process metrics registry exposed in the Prometheus text format
+"""
+import time
+import bisect
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import SESSION_IDLE_SECONDS
+from utils.memory import live_sessions, record_cache_entry, forget_cache_entries, tracked_bytes
+
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bounds: seconds from a single-row predict (~1 ms) to a large SHAP run
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+ROW_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in values)
+    return '{' + ','.join(f'{n}="{v}"' for n, v in zip(names, escaped)) + '}'
+
+
+class Registry:
+    """Metrics to expose, in registration order"""
+
+    def __init__(self):
+        self._metrics: List['_Metric'] = []
+
+    def register(self, metric: '_Metric') -> None:
+        self._metrics.append(metric)
+
+    def exposition(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    """
+    Base metric: one value per label-value tuple
+
+    Each metric has its own lock, held only for a dict update, so recording
+    from the single-row hot path costs well under a microsecond.
+    """
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+        if registry is not None:
+            registry.register(self)
+
+    def _snapshot(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}"
+                for labels, v in sorted(self._snapshot().items())]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is computed by a callback at scrape time"""
+    kind = 'gauge'
+
+    def __init__(self, *args, callback: Optional[Callable[[], float]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._callback = callback
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def _snapshot(self) -> Dict[Tuple[str, ...], float]:
+        if self._callback is not None:
+            return {(): self._callback()}
+        return super()._snapshot()
+
+
+class Histogram(_Metric):
+    """Distribution of observations in fixed buckets, with their sum and count"""
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket..., count above the last bucket, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[i] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str):
+        """Observe the duration of a block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def value(self, *labels: str) -> float:
+        """Number of observations"""
+        state = self._values.get(labels)
+        return sum(state[:-1]) if state else 0
+
+    def _snapshot(self) -> Dict[Tuple[str, ...], List[float]]:
+        with self._lock:
+            return {labels: list(state) for labels, state in self._values.items()}
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, state in sorted(self._snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state[:-1]):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames + ('le',), labels + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {_format_value(cumulative)}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{label_text} {_format_value(cumulative)}")
+        return lines
+
+
+# Application metrics
+# Prediction counts are the histograms' _count (calls) and _sum (rows predicted)
+PREDICTION_ROWS = Histogram('cropyield_prediction_rows', "Rows per prediction call", ['model'],
+                            buckets=ROW_BUCKETS)
+PREDICTION_ERRORS = Counter('cropyield_prediction_errors_total', "Prediction calls that raised", ['model'])
+PREDICTION_LATENCY = Histogram('cropyield_prediction_latency_seconds', "Prediction call latency", ['model'])
+CACHE_CALLS = Counter('cropyield_cache_calls_total', "Calls of st.cache_* loaders", ['function'])
+CACHE_MISSES = Counter('cropyield_cache_misses_total', "st.cache_* loader calls that ran the loader",
+                       ['function'])
+SHAP_SECONDS = Histogram('cropyield_shap_seconds', "SHAP value computation time", ['model'])
+CONTRIBUTION_SECONDS = Histogram('cropyield_contribution_seconds',
+                                 "Native per-row tree contribution time per chunk", ['model'])
+TAB_RENDER_SECONDS = Histogram('cropyield_tab_render_seconds', "Render time of the selected lazy tab",
+                               ['key', 'tab'])
+ACTIVE_SESSIONS = Gauge('cropyield_active_sessions',
+                        f"Sessions with a rerun in the last {SESSION_IDLE_SECONDS}s",
+                        callback=lambda: len(live_sessions()))
+SESSION_STATE_BYTES = Gauge('cropyield_session_state_bytes', "Session state bytes, all sessions (as last sized)",
+                            callback=lambda: tracked_bytes()[0])
+CACHE_BYTES = Gauge('cropyield_cache_bytes', "st.cache_* entry bytes (as sized when computed)",
+                    callback=lambda: tracked_bytes()[1])
+
+
+def observe_prediction(model: str, rows: int, seconds: float) -> None:
+    """Record one successful prediction call"""
+    PREDICTION_ROWS.observe(rows, model)
+    PREDICTION_LATENCY.observe(seconds, model)
+
+
+def cache_metrics(cache_decorator: Callable) -> Callable:
+    """
+    Apply an st.cache_data / st.cache_resource decorator, counting calls and misses
+
+    The cached function only runs on a miss, so the hit rate is
+    1 - misses / calls; every computed entry is also sized for memory
+    accounting (utils.memory). The returned function keeps `.clear()` and
+    `__wrapped__` (the undecorated loader).
+
+    Usage:
+        @cache_metrics(st.cache_data)
+        def load_dataset(): ...
+    """
+    def decorator(fn: Callable) -> Callable:
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def on_miss(*args, **kwargs):
+            CACHE_MISSES.inc(name)
+            value = fn(*args, **kwargs)
+            record_cache_entry(name, cached.clear, max_entries, args, kwargs, value)
+            return value
+
+        cached = cache_decorator(on_miss)
+        max_entries = getattr(getattr(cached, '_info', None), 'max_entries', None)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            CACHE_CALLS.inc(name)
+            return cached(*args, **kwargs)
+
+        def clear(*args, **kwargs):
+            cached.clear(*args, **kwargs)
+            forget_cache_entries(name, args, kwargs)
+
+        wrapper.clear = clear
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.registry.exposition().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1') -> Optional[ThreadingHTTPServer]:
+    """
+    Serve /metrics from a daemon thread (once per process)
+
+    Safe to call on every rerun. If the port is taken (e.g. by another app
+    process) a warning is logged once and metrics are only recorded.
+
+    Returns:
+        The running server, or None if it could not be started
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                logger.warning(f"Metrics endpoint not started on {host}:{port}: {e}")
+                _server = False
+            else:
+                _server.daemon_threads = True
+                threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+        return _server or None
@@ -0,0 +1,191 @@
+"""
+Rerun timing spans and opt-in profiling for the developer panel
+"""
+import os
+import json
+import time
+import cProfile
+import functools
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Streamlit runs each session's script in its own thread, so the span stack
+# is thread-local; it is None (and every span a no-op) unless recording
+class _State(threading.local):
+    stack: Optional[List['Span']] = None
+
+
+_local = _State()
+
+
+class Span:
+    """One timed step of a rerun, with its nested steps"""
+    __slots__ = ('name', 'start', 'end', 'children')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.children: List['Span'] = []
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def walk(self, depth: int = 0):
+        """Yield (depth, span) for this span and its descendants, depth first"""
+        yield depth, self
+        for child in self.children:
+            yield from child.walk(depth + 1)
+
+
+class _SpanContext:
+    __slots__ = ('name', 'stack', 'span')
+
+    def __init__(self, name: str, stack: List[Span]):
+        self.name = name
+        self.stack = stack
+
+    def __enter__(self):
+        self.span = Span(self.name)
+        self.stack[-1].children.append(self.span)
+        self.stack.append(self.span)
+        return self.span
+
+    def __exit__(self, *exc):
+        self.span.end = time.perf_counter()
+        self.stack.pop()
+        return False
+
+
+class _NullContext:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullContext()
+
+
+def span(name: str):
+    """Context manager timing a step of the current rerun (no-op when not recording)"""
+    stack = _local.stack
+    if stack is None:
+        return _NULL
+    return _SpanContext(name, stack)
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """
+    Decorator recording every call of a function as a span
+
+    When no rerun is being recorded the only cost is one thread-local
+    lookup per call. Place it below @st.cache_data / @st.cache_resource so
+    spans show the work done on cache misses.
+    """
+    def decorator(fn: Callable) -> Callable:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            stack = _local.stack
+            if stack is None:
+                return fn(*args, **kwargs)
+            with _SpanContext(label, stack):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Rerun:
+    """Span tree and optional cProfile capture of one script run"""
+
+    def __init__(self, name: str, profile_dir: Optional[str]):
+        self.root = Span(name)
+        self.profile_dir = profile_dir
+        self.profiler = cProfile.Profile() if profile_dir else None
+        self.files: Dict[str, str] = {}
+
+    def finish(self) -> None:
+        self.root.end = time.perf_counter()
+        if self.profiler is None:
+            return
+        self.profiler.disable()
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stem = os.path.join(self.profile_dir, f"rerun-{datetime.now():%Y%m%d-%H%M%S}")
+        self.files['profile'] = f"{stem}.prof"
+        self.profiler.dump_stats(self.files['profile'])
+        self.files['flamegraph'] = f"{stem}.speedscope.json"
+        with open(self.files['flamegraph'], 'w') as f:
+            json.dump(speedscope_profile(self.root), f)
+
+
+@contextmanager
+def record_rerun(enabled: bool, name: str = 'rerun', profile_dir: Optional[str] = None):
+    """
+    Record the spans of one rerun, optionally under cProfile
+
+    Yields:
+        Rerun (finished when the block exits) or None when disabled
+    """
+    if not enabled:
+        yield None
+        return
+
+    rerun = Rerun(name, profile_dir)
+    _local.stack = [rerun.root]
+    if rerun.profiler is not None:
+        rerun.profiler.enable()
+    try:
+        yield rerun
+    finally:
+        _local.stack = None
+        rerun.finish()
+
+
+def span_rows(root: Span) -> List[Dict[str, Any]]:
+    """Flatten a span tree into display rows (indented name, total and self time)"""
+    total = root.duration or 1e-12
+    rows = []
+    for depth, s in root.walk():
+        own = s.duration - sum(c.duration for c in s.children)
+        # Em spaces, since tables strip leading ASCII whitespace
+        indent = '\u2003' * (depth - 1) + '└ ' if depth else ''
+        rows.append({
+            'Span': f"{indent}{s.name}",
+            'ms': s.duration * 1000,
+            'Self ms': own * 1000,
+            '% of rerun': s.duration / total * 100
+        })
+    return rows
+
+
+def speedscope_profile(root: Span) -> Dict[str, Any]:
+    """Span tree as a speedscope evented profile (open at speedscope.app as a flame graph)"""
+    frames, index, events = [], {}, []
+
+    for _, s in root.walk():
+        if s.name not in index:
+            index[s.name] = len(frames)
+            frames.append({'name': s.name})
+
+    def emit(s: Span):
+        events.append({'type': 'O', 'frame': index[s.name], 'at': (s.start - root.start) * 1000})
+        for child in s.children:
+            emit(child)
+        events.append({'type': 'C', 'frame': index[s.name], 'at': (s.end - root.start) * 1000})
+
+    emit(root)
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{'type': 'evented', 'name': root.name, 'unit': 'milliseconds',
+                      'startValue': 0, 'endValue': root.duration * 1000, 'events': events}]
+    }
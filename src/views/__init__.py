@@ -8,6 +8,8 @@ from . import shap_analysis
 from . import data_visualization
 from . import batch_prediction
 from . import model_comparison
+from . import prediction_history
+from . import admin
 
 __all__ = [
     'home',
@@ -16,5 +18,7 @@ __all__ = [
     'shap_analysis',
     'data_visualization',
     'batch_prediction',
-    'model_comparison'
+    'model_comparison',
+    'prediction_history',
+    'admin'
 ]
@@ -0,0 +1,135 @@
+"""
+Admin View - memory accounting per session and per cache
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import streamlit as st
+import pandas as pd
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.memory import (
+    live_sessions, session_usage, cache_usage, evict_cache_entry, enforce_session_budget,
+    enforce_cache_budget, snapshot_top, process_rss, format_bytes
+)
+from config.settings import SESSION_STATE_BUDGET, CACHE_BUDGET, SESSION_IDLE_SECONDS
+
+
+def render():
+    """Render admin page"""
+    st.header("🛡️ Admin - Memory")
+    st.markdown("Bytes held per session state key and per cache entry, with their budgets")
+    st.markdown("---")
+
+    ctx = get_script_run_ctx()
+    own_session = ctx.session_id if ctx is not None else None
+    sessions = live_sessions()
+    session_rows = [{'session': sid[:8] + (' (you)' if sid == own_session else ''), **row}
+                    for sid, state in sessions.items() for row in session_usage(sid, state)]
+    cache_rows = cache_usage()
+
+    session_bytes = sum(row['bytes'] for row in session_rows)
+    cache_bytes = sum(row['bytes'] for row in cache_rows)
+    rss = process_rss()
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Process RSS", format_bytes(rss) if rss is not None else "n/a")
+    col2.metric("Active Sessions", len(sessions), help=f"Reran within the last {SESSION_IDLE_SECONDS}s")
+    col3.metric("Session State", format_bytes(session_bytes),
+                help=f"Budget {format_bytes(SESSION_STATE_BUDGET)} per session")
+    col4.metric("Cache Entries", format_bytes(cache_bytes), help=f"Budget {format_bytes(CACHE_BUDGET)} in total")
+
+    if st.button("🧹 Enforce budgets now"):
+        spilled = [item for sid, state in sessions.items() for item in enforce_session_budget(sid, state)]
+        evicted = enforce_cache_budget()
+        st.success(f"✅ Spilled {len(spilled)} session values, evicted {len(evicted)} cache entries")
+
+    _render_sessions(session_rows)
+    _render_caches(cache_rows)
+    _render_tracemalloc()
+
+
+def _render_sessions(rows):
+    """Render per session key usage"""
+    st.markdown("---")
+    st.subheader("👥 Session State")
+    st.caption("Values over the per-session budget are spilled to disk, largest first, "
+               "and reloaded when a view reads them again")
+    if not rows:
+        st.info("No session state held")
+        return
+
+    df = pd.DataFrame(rows)
+    totals = df.groupby('session', sort=False)['bytes'].sum().sort_values(ascending=False)
+    st.dataframe(pd.DataFrame({
+        'Session': totals.index,
+        'Held': totals.map(format_bytes).values,
+        'Budget Used': (totals / SESSION_STATE_BUDGET * 100).map('{:.1f}%'.format).values
+    }), hide_index=True, use_container_width=True)
+
+    df['Held'] = df['bytes'].map(format_bytes)
+    df['On Disk'] = df['spilled'].map(lambda n: format_bytes(n) if n else '')
+    st.dataframe(df[['session', 'key', 'type', 'Held', 'On Disk']].rename(columns=str.title),
+                 hide_index=True, use_container_width=True)
+
+
+def _render_caches(rows):
+    """Render per cache entry usage with manual eviction"""
+    st.markdown("---")
+    st.subheader("🗄️ Cached Loaders")
+    st.caption("Sized when computed. Over the budget the largest entries are evicted and recomputed on next use")
+    if not rows:
+        st.info("No cache entries recorded yet")
+        return
+
+    df = pd.DataFrame(rows)
+    df['Held'] = df['bytes'].map(format_bytes)
+    df['Age'] = (time.time() - df['created']).map(lambda s: f"{s / 60:,.0f} min" if s >= 60 else f"{s:.0f} s")
+    st.dataframe(df[['function', 'entry', 'Held', 'Age']].rename(columns=str.title),
+                 hide_index=True, use_container_width=True)
+
+    labels = [f"{row['function']}({row['entry']})" for row in rows]
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        choice = st.selectbox("Entry", range(len(rows)), format_func=labels.__getitem__,
+                              label_visibility="collapsed")
+    with col2:
+        if st.button("🗑️ Evict", use_container_width=True):
+            freed = evict_cache_entry(rows[choice]['function'], rows[choice]['entry'])
+            st.success(f"✅ Evicted {labels[choice]} ({format_bytes(freed)})")
+
+
+def _render_tracemalloc():
+    """Render tracemalloc controls and the top allocation sites"""
+    st.markdown("---")
+    st.subheader("🔬 Allocation Tracing")
+    st.caption("tracemalloc slows allocations down while it is on; the first snapshot shows "
+               "the largest sites, later ones also the growth since the previous snapshot")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if tracemalloc.is_tracing():
+            if st.button("⏹️ Stop tracing", use_container_width=True):
+                tracemalloc.stop()
+                st.rerun()
+        elif st.button("▶️ Start tracing", use_container_width=True):
+            tracemalloc.start()
+            st.rerun()
+    with col2:
+        snapshot = st.button("📸 Take snapshot", use_container_width=True, disabled=not tracemalloc.is_tracing())
+
+    if not snapshot:
+        return
+    top, growth = snapshot_top()
+    for title, rows in (("Largest allocation sites", top), ("Growth since previous snapshot", growth)):
+        if not rows:
+            continue
+        st.markdown(f"**{title}**")
+        df = pd.DataFrame(rows)
+        df['bytes'] = df['bytes'].map(format_bytes)
+        st.dataframe(df.rename(columns=str.title), hide_index=True, use_container_width=True)
@@ -3,6 +3,7 @@ Batch Prediction View
 """
 import sys
 import os
+import time
 from pathlib import Path
 
 # Add project root to Python path
@@ -10,12 +11,22 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from models.model_loader import load_models
 from models.data_loader import load_train_test_data
+from models.conformal import load_conformal_table, apply_intervals
+from models.features import decode_one_hot
+from models.uncertainty import load_moment_booster, tree_spread
+from models.contributions import iter_contributions, contribution_columns
+from config.settings import CONFIDENCE_LEVELS
+from utils.metrics import observe_prediction
+from utils.memory import session_file
+from utils.chart_data import scatter_trace, histogram_trace
+from components.figures import figure_builder, show_figure
 
 
 def render():
@@ -46,16 +57,99 @@ def render():
     
     with col2:
         selected_model = st.selectbox("🤖 Select Model", list(models.keys()))
+        confidence = st.selectbox("🎯 Interval Confidence", CONFIDENCE_LEVELS,
+                                  index=len(CONFIDENCE_LEVELS) // 2,
+                                  format_func=lambda x: f"{x:.0%}")
+        show_spread = False
+        if hasattr(models[selected_model], 'get_booster'):
+            show_spread = st.checkbox("🌲 Add tree spread column",
+                                      help="Per-row std of the per-tree contributions")
+        explain = st.checkbox("🔍 Explain all rows",
+                              help="Exact SHAP contribution of every feature for every row, "
+                                   "written next to the predictions in the download")
+        interactions = explain and st.checkbox("🔗 Include strongest interaction",
+                                               help="Per-row feature pair with the largest SHAP "
+                                                    "interaction (slower)")
     
+    options = dict(confidence=confidence, show_spread=show_spread, explain=explain, interactions=interactions)
     if use_test_data:
-        _process_test_dataset(selected_model, models)
+        _process_test_dataset(selected_model, models, **options)
     elif uploaded_file is not None:
-        _process_uploaded_file(uploaded_file, selected_model, models)
+        _process_uploaded_file(uploaded_file, selected_model, models, **options)
     else:
         _show_sample_format()
 
 
-def _process_test_dataset(selected_model, models):
+def _add_intervals(df_results, selected_model, predictions, confidence, crops):
+    """Attach conformal interval bounds (vectorized table lookup) to the results"""
+    conformal_table = load_conformal_table()
+    if conformal_table is None:
+        return
+    
+    bounds = apply_intervals(conformal_table, selected_model, predictions, confidence,
+                             segment_col='Crop', segment_values=crops)
+    if bounds is not None:
+        # Yields are non-negative: clip like the single prediction view
+        df_results['Lower_Bound'] = np.maximum(bounds[0], 0)
+        df_results['Upper_Bound'] = bounds[1]
+
+
+def _predict(model, model_name, X, show_spread):
+    """Predict, optionally with per-tree spread from the same pass"""
+    start = time.perf_counter()
+    predictions, tree_std = None, None
+    if show_spread:
+        moment_booster = load_moment_booster(model_name)
+        if moment_booster is not None:
+            spread = tree_spread(X, moment_booster)
+            predictions, tree_std = spread['Prediction'].values, spread['Tree_Std'].values
+    if predictions is None:
+        predictions = model.predict(X)
+    observe_prediction(type(model).__name__, len(X), time.perf_counter() - start)
+    return predictions, tree_std
+
+
+def _explain_all_rows(df_results, model, model_name, X, interactions, file_name):
+    """
+    Write the results with every row's contributions to a CSV file, chunk by chunk
+
+    Contributions are computed natively per chunk (see iter_contributions)
+    and appended to the session's scratch file with that chunk's results,
+    so neither the full contribution table nor the CSV text is ever held
+    in memory.
+
+    Returns:
+        (CSV path, first rows with their contributions, mean |contribution| per feature)
+    """
+    ctx = get_script_run_ctx()
+    path = session_file(ctx.session_id if ctx is not None else None, file_name)
+    feature_columns = contribution_columns(list(X.columns))[:-1]
+    totals, preview = np.zeros(len(feature_columns)), None
+    progress = st.progress(0.0, text="🔍 Explaining rows...")
+    start_time = time.perf_counter()
+    with open(path, 'w', newline='') as output:
+        for start, end, contributions in iter_contributions(model, model_name, X, interactions):
+            chunk = pd.concat([df_results.iloc[start:end].reset_index(drop=True), contributions], axis=1)
+            chunk.to_csv(output, index=False, header=start == 0)
+            totals += contributions[feature_columns].abs().to_numpy().sum(axis=0)
+            if preview is None:
+                preview = chunk.head(20)
+            progress.progress(end / len(X), text=f"🔍 Explained {end:,} of {len(X):,} rows")
+    progress.empty()
+    
+    seconds = time.perf_counter() - start_time
+    st.caption(f"Explained {len(X):,} rows in {seconds:.2f}s ({len(X) / max(seconds, 1e-9):,.0f} rows/s)")
+    return path, preview, totals / max(len(X), 1)
+
+
+def _show_explanations(preview, importance, features):
+    """First rows' contributions and the batch-wide mean |contribution| per feature"""
+    st.subheader("🔍 Row Contributions (First 20 rows)")
+    st.dataframe(preview, use_container_width=True)
+    show_figure(_contribution_figure(importance, features))
+
+
+def _process_test_dataset(selected_model, models, confidence, show_spread, explain=False, interactions=False):
     """Process test dataset (160 samples)"""
     try:
         train_data = load_train_test_data()
@@ -79,7 +173,7 @@ def _process_test_dataset(selected_model, models):
                 try:
                     # Make predictions
                     model = models[selected_model]
-                    predictions = model.predict(X_test)
+                    predictions, tree_std = _predict(model, selected_model, X_test, show_spread)
                     
                     # Create results dataframe with original features
                     # Convert y_test to Series if it's a DataFrame
@@ -99,6 +193,10 @@ def _process_test_dataset(selected_model, models):
                         'Error': y_test_values - predictions,
                         'Abs_Error': abs(y_test_values - predictions)
                     })
+                    _add_intervals(df_results, selected_model, predictions, confidence,
+                                   decode_one_hot(X_test, 'Crop').values)
+                    if tree_std is not None:
+                        df_results['Tree_Std'] = tree_std
                     
                     st.success("✅ Predictions completed!")
                     
@@ -125,58 +223,23 @@ def _process_test_dataset(selected_model, models):
                     
                     with col1:
                         # Actual vs Predicted
-                        fig1 = go.Figure()
-                        fig1.add_trace(go.Scatter(
-                            x=y_test, 
-                            y=predictions,
-                            mode='markers',
-                            marker=dict(color='#667eea', size=8, opacity=0.6),
-                            name='Predictions'
-                        ))
-                        fig1.add_trace(go.Scatter(
-                            x=[y_test.min(), y_test.max()],
-                            y=[y_test.min(), y_test.max()],
-                            mode='lines',
-                            line=dict(color='#f87171', dash='dash', width=2),
-                            name='Perfect Prediction'
-                        ))
-                        fig1.update_layout(
-                            title='Actual vs Predicted Yield',
-                            xaxis_title='Actual Yield (tons/ha)',
-                            yaxis_title='Predicted Yield (tons/ha)',
-                            height=400,
-                            plot_bgcolor='#0f172a',
-                            paper_bgcolor='#0f172a',
-                            font=dict(color='#e5e7eb', family='Inter'),
-                            xaxis=dict(gridcolor='#1f2937'),
-                            yaxis=dict(gridcolor='#1f2937')
-                        )
-                        st.plotly_chart(fig1, use_container_width=True)
+                        show_figure(_actual_vs_predicted_figure(y_true, predictions))
                     
                     with col2:
                         # Error distribution
-                        fig2 = go.Figure()
-                        fig2.add_trace(go.Histogram(
-                            x=df_results['Error'],
-                            nbinsx=30,
-                            marker_color='#667eea',
-                            marker_line=dict(color='#764ba2', width=1)
-                        ))
-                        fig2.update_layout(
-                            title='Prediction Error Distribution',
-                            xaxis_title='Error (Actual - Predicted)',
-                            yaxis_title='Frequency',
-                            height=400,
-                            plot_bgcolor='#0f172a',
-                            paper_bgcolor='#0f172a',
-                            font=dict(color='#e5e7eb', family='Inter'),
-                            xaxis=dict(gridcolor='#1f2937'),
-                            yaxis=dict(gridcolor='#1f2937')
-                        )
-                        st.plotly_chart(fig2, use_container_width=True)
+                        show_figure(_histogram_figure(df_results['Error'].to_numpy(), 'Prediction Error Distribution',
+                                                      'Error (Actual - Predicted)'))
                     
                     # Download results
-                    csv = df_results.to_csv(index=False)
+                    if explain:
+                        path, preview, importance = _explain_all_rows(df_results, model, selected_model,
+                                                                      X_test, interactions,
+                                                                      f"test_predictions_{selected_model}.csv")
+                        _show_explanations(preview, importance, list(X_test.columns))
+                        # Read from the file only when the button is clicked
+                        csv = Path(path).read_bytes
+                    else:
+                        csv = df_results.to_csv(index=False)
                     st.download_button(
                         label="📥 Download Test Predictions",
                         data=csv,
@@ -194,7 +257,97 @@ def _process_test_dataset(selected_model, models):
         st.exception(e)
 
 
-def _process_uploaded_file(uploaded_file, selected_model, models):
+@figure_builder
+def _actual_vs_predicted_figure(y_true, predictions):
+    """Scatter of predicted against actual yield with the identity line"""
+    fig = go.Figure()
+    fig.add_trace(scatter_trace(
+        y_true,
+        predictions,
+        marker=dict(color='#667eea', size=8, opacity=0.6),
+        colorscale='Purples',
+        name='Predictions'
+    ))
+    fig.add_trace(go.Scatter(
+        x=[y_true.min(), y_true.max()],
+        y=[y_true.min(), y_true.max()],
+        mode='lines',
+        line=dict(color='#f87171', dash='dash', width=2),
+        name='Perfect Prediction'
+    ))
+    fig.update_layout(
+        title='Actual vs Predicted Yield',
+        xaxis_title='Actual Yield (tons/ha)',
+        yaxis_title='Predicted Yield (tons/ha)',
+        height=400
+    )
+    return fig
+
+
+@figure_builder
+def _histogram_figure(values, title, axis_title):
+    """Histogram of predictions or errors"""
+    fig = go.Figure()
+    fig.add_trace(histogram_trace(
+        values,
+        marker_color='#667eea',
+        marker_line=dict(color='#764ba2', width=1)
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=axis_title,
+        yaxis_title='Frequency',
+        height=400
+    )
+    return fig
+
+
+@figure_builder
+def _contribution_figure(importance, features):
+    """Mean |SHAP contribution| per feature over every row of the batch"""
+    order = np.argsort(importance)[-15:]
+    fig = go.Figure(go.Bar(
+        x=np.asarray(importance)[order],
+        y=[features[i] for i in order],
+        orientation='h',
+        marker_color='#667eea'
+    ))
+    fig.update_layout(
+        title='Feature Importance (Mean |SHAP| over all rows)',
+        xaxis_title='Mean |SHAP value|',
+        height=500
+    )
+    return fig
+
+
+def _encode_uploaded(df_input, train_columns):
+    """One-hot encode uploaded records and align them to the training columns"""
+    df_processed = df_input.copy()
+    
+    # Convert boolean columns to int first
+    if 'Fertilizer_Used' in df_processed.columns:
+        df_processed['Fertilizer_Used'] = df_processed['Fertilizer_Used'].astype(int)
+    if 'Irrigation_Used' in df_processed.columns:
+        df_processed['Irrigation_Used'] = df_processed['Irrigation_Used'].astype(int)
+    
+    # One-hot encode categorical columns
+    categorical_cols = [col for col in ['Soil_Type', 'Crop', 'Weather_Condition'] 
+                      if col in df_processed.columns]
+    
+    if categorical_cols:
+        df_processed = pd.get_dummies(df_processed, columns=categorical_cols, drop_first=True)
+    
+    # Align to training columns
+    for col in train_columns:
+        if col not in df_processed.columns:
+            df_processed[col] = 0
+    
+    # Keep only training columns in correct order
+    return df_processed[train_columns]
+
+
+def _process_uploaded_file(uploaded_file, selected_model, models, confidence, show_spread,
+                           explain=False, interactions=False):
     """Process uploaded CSV file"""
     try:
         # Try different separators
@@ -216,36 +369,19 @@ def _process_uploaded_file(uploaded_file, selected_model, models):
                     train_columns = train_data['X_train'].columns.tolist()
                     
                     # Prepare features with one-hot encoding
-                    df_processed = df_input.copy()
-                    
-                    # Convert boolean columns to int first
-                    if 'Fertilizer_Used' in df_processed.columns:
-                        df_processed['Fertilizer_Used'] = df_processed['Fertilizer_Used'].astype(int)
-                    if 'Irrigation_Used' in df_processed.columns:
-                        df_processed['Irrigation_Used'] = df_processed['Irrigation_Used'].astype(int)
-                    
-                    # One-hot encode categorical columns
-                    categorical_cols = [col for col in ['Soil_Type', 'Crop', 'Weather_Condition'] 
-                                      if col in df_processed.columns]
-                    
-                    if categorical_cols:
-                        df_processed = pd.get_dummies(df_processed, columns=categorical_cols, drop_first=True)
-                    
-                    # Align to training columns
-                    for col in train_columns:
-                        if col not in df_processed.columns:
-                            df_processed[col] = 0
-                    
-                    # Keep only training columns in correct order
-                    df_processed = df_processed[train_columns]
+                    df_processed = _encode_uploaded(df_input, train_columns)
                     
                     # Make predictions
                     model = models[selected_model]
-                    predictions = model.predict(df_processed)
+                    predictions, tree_std = _predict(model, selected_model, df_processed, show_spread)
                     
                     # Add predictions to original dataframe
                     df_results = df_input.copy()
                     df_results['Predicted_Yield'] = predictions
+                    _add_intervals(df_results, selected_model, predictions, confidence,
+                                   df_input['Crop'].values if 'Crop' in df_input.columns else None)
+                    if tree_std is not None:
+                        df_results['Tree_Std'] = tree_std
                     
                     st.success("✅ Predictions completed!")
                     
@@ -261,28 +397,19 @@ def _process_uploaded_file(uploaded_file, selected_model, models):
                     col4.metric("Min Predicted Yield", f"{predictions.min():.2f}")
                     
                     # Visualization
-                    fig = go.Figure()
-                    fig.add_trace(go.Histogram(
-                        x=predictions,
-                        nbinsx=30,
-                        marker_color='#667eea',
-                        marker_line=dict(color='#764ba2', width=1)
-                    ))
-                    fig.update_layout(
-                        title='Distribution of Predicted Yields',
-                        xaxis_title='Predicted Yield (tons/ha)',
-                        yaxis_title='Frequency',
-                        height=400,
-                        plot_bgcolor='#0f172a',
-                        paper_bgcolor='#0f172a',
-                        font=dict(color='#e5e7eb', family='Inter'),
-                        xaxis=dict(gridcolor='#1f2937'),
-                        yaxis=dict(gridcolor='#1f2937')
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    show_figure(_histogram_figure(predictions, 'Distribution of Predicted Yields',
+                                                  'Predicted Yield (tons/ha)'))
                     
                     # Download results
-                    csv = df_results.to_csv(index=False)
+                    if explain:
+                        path, preview, importance = _explain_all_rows(df_results, model, selected_model,
+                                                                      df_processed, interactions,
+                                                                      f"batch_predictions_{selected_model}.csv")
+                        _show_explanations(preview, importance, train_columns)
+                        # Read from the file only when the button is clicked
+                        csv = Path(path).read_bytes
+                    else:
+                        csv = df_results.to_csv(index=False)
                     st.download_button(
                         label="📥 Download Predictions",
                         data=csv,
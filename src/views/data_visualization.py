@@ -11,10 +11,16 @@ sys.path.insert(0, str(project_root))
 
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
-from models.data_loader import load_dataset
+from models.data_loader import load_dataset, get_data_version
+from utils.chart_data import histogram_bar, scatter_trace, is_reduced
+from components.figures import figure_builder, show_figure
+from components.lazy_tabs import lazy_tabs
+from models.cube import load_yield_cube, cube_breakdown, cube_cell
+from models.profile import (
+    load_dataset_profile, describe_frame, correlation_frame, histogram_bins, box_stats, category_counts,
+    sample_frame, missing_counts
+)
 
 
 def render():
@@ -23,119 +29,85 @@ def render():
     st.markdown("Explore the dataset with interactive visualizations")
     st.markdown("---")
     
-    df = load_dataset()
+    profile = load_dataset_profile()
     
-    if df is None:
+    if profile is None:
         st.error("⚠️ Dataset not found!")
         return
     
-    tab1, tab2, tab3, tab4 = st.tabs(["📊 Overview", "📈 Distribution", "🔗 Correlation", "📉 Feature Analysis"])
-    
-    with tab1:
-        _render_overview(df)
-    
-    with tab2:
-        _render_distribution(df)
-    
-    with tab3:
-        _render_correlation(df)
-    
-    with tab4:
-        _render_feature_analysis(df)
+    # Only the selected section is computed on a rerun
+    lazy_tabs({
+        "📊 Overview": lambda: _render_overview(profile),
+        "📈 Distribution": lambda: _render_distribution(profile),
+        "🔗 Correlation": lambda: _render_correlation(profile),
+        "📉 Feature Analysis": _render_feature_analysis
+    }, key='visualization_tab')
 
 
-def _render_overview(df):
-    """Render dataset overview"""
+def _render_overview(profile):
+    """Render dataset overview (from the precomputed profile)"""
     st.subheader("📊 Dataset Overview")
     
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Total Samples", f"{df.shape[0]:,}")
-    col2.metric("Features", df.shape[1] - 1)
-    col3.metric("Crops Types", df['Crop'].nunique())
-    col4.metric("Soil Types", df['Soil_Type'].nunique())
+    col1.metric("Total Samples", f"{profile['rows']:,}")
+    col2.metric("Features", len(profile['columns']) - 1)
+    col3.metric("Crops Types", len(category_counts(profile, 'Crop')))
+    col4.metric("Soil Types", len(category_counts(profile, 'Soil_Type')))
     
     st.markdown("### 📋 Sample Data")
-    st.dataframe(df.head(20), use_container_width=True)
+    st.dataframe(sample_frame(profile, 20), use_container_width=True)
     
     st.markdown("### 📊 Statistical Summary")
-    st.dataframe(df.describe(), use_container_width=True)
+    st.dataframe(describe_frame(profile), use_container_width=True)
+    st.caption("Quartiles are t-digest estimates")
     
     # Missing values
     st.markdown("### 🔍 Data Quality Check")
-    missing = df.isnull().sum()
-    if missing.sum() == 0:
+    if missing_counts(profile).sum() == 0:
         st.success("No missing values detected across all features.")
     else:
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=missing.index,
-            y=missing.values,
-            marker_color='#f59e0b',
-            text=missing.values,
-            textposition='auto',
-            textfont=dict(color='white', size=12, family='Inter')
-        ))
-        fig.update_layout(
-            title='Missing Values per Feature',
-            xaxis_title='Feature',
-            yaxis_title='Count',
-            height=400,
-            plot_bgcolor='#0f172a',
-            paper_bgcolor='#0f172a',
-            font=dict(color='#e5e7eb', family='Inter'),
-            xaxis=dict(gridcolor='#1f2937'),
-            yaxis=dict(gridcolor='#1f2937')
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-
-def _render_distribution(df):
-    """Render feature distributions"""
+        show_figure(_missing_values_figure(get_data_version()))
+
+
+@figure_builder
+def _missing_values_figure(version):
+    """Bar chart of missing values per feature"""
+    missing = missing_counts(load_dataset_profile())
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=missing.index,
+        y=missing.values,
+        marker_color='#f59e0b',
+        text=missing.values,
+        textposition='auto',
+        textfont=dict(color='white', size=12, family='Inter')
+    ))
+    fig.update_layout(
+        title='Missing Values per Feature',
+        xaxis_title='Feature',
+        yaxis_title='Count',
+        height=400
+    )
+    return fig
+
+
+def _render_distribution(profile):
+    """Render feature distributions (histograms and box plots from the profile sketches)"""
     st.subheader("📈 Feature Distributions")
+    version = get_data_version()
 
     # Yield distribution
     col1, col2 = st.columns(2)
 
     with col1:
-        fig = go.Figure()
-        fig.add_trace(go.Histogram(
-            x=df['Yield_tons_per_hectare'],
-            nbinsx=30,
-            marker_color='#4facfe',
-            marker_line=dict(color='#00f2fe', width=1)
-        ))
-        fig.update_layout(
-            title='Yield Distribution',
-            xaxis_title='Yield (tons/hectare)',
-            yaxis_title='Frequency',
-            height=400,
-            plot_bgcolor='#0f172a',
-            paper_bgcolor='#0f172a',
-            font=dict(color='#e5e7eb', family='Inter'),
-            xaxis=dict(gridcolor='#1f2937'),
-            yaxis=dict(gridcolor='#1f2937')
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure(_histogram_figure(version, 'Yield_tons_per_hectare', 'Yield Distribution',
+                                      'Yield (tons/hectare)'))
 
     with col2:
-        fig = go.Figure()
-        fig.add_trace(go.Box(
-            y=df['Yield_tons_per_hectare'],
-            marker_color='#764ba2',
-            marker=dict(color='#764ba2', line=dict(color='#667eea', width=2))
-        ))
-        fig.update_layout(
-            title='Yield Box Plot',
-            yaxis_title='Yield (tons/hectare)',
-            height=400,
-            plot_bgcolor='#0f172a',
-            paper_bgcolor='#0f172a',
-            font=dict(color='#e5e7eb', family='Inter'),
-            yaxis=dict(gridcolor='#1f2937')
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-    numerical_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        show_figure(_box_figure(version, 'Yield_tons_per_hectare', 'Yield Box Plot', 'Yield (tons/hectare)',
+                                '#764ba2', '#667eea'))
+
+    numerical_cols = list(profile['numeric'])
     if 'Yield_tons_per_hectare' in numerical_cols:
         numerical_cols.remove('Yield_tons_per_hectare')
 
@@ -144,53 +116,70 @@ def _render_distribution(df):
     col1, col2 = st.columns(2)
 
     with col1:
-        fig = go.Figure()
-        fig.add_trace(go.Histogram(
-            x=df[selected_feature],
-            nbinsx=30,
-            marker_color='#4facfe',
-            marker_line=dict(color='#00f2fe', width=1)
-        ))
-        fig.update_layout(
-            title=f'{selected_feature} Distribution',
-            xaxis_title=selected_feature,
-            yaxis_title='Frequency',
-            height=400,
-            plot_bgcolor='#0f172a',
-            paper_bgcolor='#0f172a',
-            font=dict(color='#e5e7eb', family='Inter'),
-            xaxis=dict(gridcolor='#1f2937'),
-            yaxis=dict(gridcolor='#1f2937')
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure(_histogram_figure(version, selected_feature, f'{selected_feature} Distribution',
+                                      selected_feature))
 
     with col2:
-        fig = go.Figure()
-        fig.add_trace(go.Box(
-            y=df[selected_feature],
-            marker_color='#fa709a',
-            marker=dict(color='#fa709a', line=dict(color='#f5576c', width=2))
-        ))
-        fig.update_layout(
-            title=f'{selected_feature} Box Plot',
-            yaxis_title=selected_feature,
-            height=400,
-            plot_bgcolor='#0f172a',
-            paper_bgcolor='#0f172a',
-            font=dict(color='#e5e7eb', family='Inter'),
-            yaxis=dict(gridcolor='#1f2937')
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-
-def _render_correlation(df):
-    """Render correlation analysis"""
+        show_figure(_box_figure(version, selected_feature, f'{selected_feature} Box Plot', selected_feature,
+                                '#fa709a', '#f5576c'))
+
+    st.caption("Histograms and box plots are drawn from the dataset profile; whiskers end at 1.5 IQR "
+               "(or the observed range), individual outliers are not shown")
+
+
+@figure_builder
+def _histogram_figure(version, col, title, axis_title):
+    """Histogram of a column from its pre-binned profile histogram"""
+    fig = go.Figure()
+    fig.add_trace(histogram_bar(*histogram_bins(load_dataset_profile(), col), marker_color='#4facfe',
+                                marker_line=dict(color='#00f2fe', width=1)))
+    fig.update_layout(
+        title=title,
+        xaxis_title=axis_title,
+        yaxis_title='Frequency',
+        height=400
+    )
+    return fig
+
+
+@figure_builder
+def _box_figure(version, col, title, axis_title, color, line_color):
+    """Box plot of a column from its precomputed quartiles and fences"""
+    stats = box_stats(load_dataset_profile(), col)
+    fig = go.Figure()
+    fig.add_trace(go.Box(
+        **{key: [value] for key, value in stats.items()},
+        name=col,
+        boxpoints=False,
+        marker_color=color,
+        marker=dict(color=color, line=dict(color=line_color, width=2))
+    ))
+    fig.update_layout(
+        title=title,
+        yaxis_title=axis_title,
+        height=400
+    )
+    return fig
+
+
+def _render_correlation(profile):
+    """Render correlation analysis (from the precomputed profile)"""
     st.subheader("🔗 Feature Correlations")
-    
-    numerical_df = df.select_dtypes(include=[np.number])
-    corr_matrix = numerical_df.corr()
+    version = get_data_version()
     
     # Correlation heatmap
+    show_figure(_correlation_figure(version))
+    
+    # Top correlations with yield
+    if 'Yield_tons_per_hectare' in profile['comoments']['columns']:
+        st.markdown("### 🎯 Correlations with Yield")
+        show_figure(_yield_correlation_figure(version))
+
+
+@figure_builder
+def _correlation_figure(version):
+    """Heatmap of the feature correlation matrix"""
+    corr_matrix = correlation_frame(load_dataset_profile())
     fig = go.Figure(data=go.Heatmap(
         z=corr_matrix.values,
         x=corr_matrix.columns,
@@ -204,106 +193,101 @@ def _render_correlation(df):
     fig.update_layout(
         title='Feature Correlation Matrix',
         height=600,
-        plot_bgcolor='#0f172a',
-        paper_bgcolor='#0f172a',
-        font=dict(color='#e5e7eb', family='Inter')
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=False)
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+@figure_builder
+def _yield_correlation_figure(version):
+    """Bar chart of each feature's correlation with yield"""
+    corr_matrix = correlation_frame(load_dataset_profile())
+    yield_corr = corr_matrix['Yield_tons_per_hectare'].sort_values(ascending=False)[1:]
     
-    # Top correlations with yield
-    if 'Yield_tons_per_hectare' in corr_matrix.columns:
-        st.markdown("### 🎯 Correlations with Yield")
-        yield_corr = corr_matrix['Yield_tons_per_hectare'].sort_values(ascending=False)[1:]
-        
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=yield_corr.values,
-            y=yield_corr.index,
-            orientation='h',
-            marker=dict(
-                color=yield_corr.values,
-                colorscale='RdYlGn',
-                cmid=0
-            ),
-            text=yield_corr.values.round(3),
-            textposition='auto',
-            textfont=dict(color='white', size=11, family='Inter')
-        ))
-        fig.update_layout(
-            title='Feature Correlation with Yield',
-            xaxis_title='Correlation Coefficient',
-            yaxis_title='Feature',
-            height=400,
-            plot_bgcolor='#0f172a',
-            paper_bgcolor='#0f172a',
-            font=dict(color='#e5e7eb', family='Inter'),
-            xaxis=dict(gridcolor='#1f2937'),
-            yaxis=dict(gridcolor='#1f2937')
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-
-def _render_feature_analysis(df):
-    """Render yield analysis by categories"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=yield_corr.values,
+        y=yield_corr.index,
+        orientation='h',
+        marker=dict(
+            color=yield_corr.values,
+            colorscale='RdYlGn',
+            cmid=0
+        ),
+        text=yield_corr.values.round(3),
+        textposition='auto',
+        textfont=dict(color='white', size=11, family='Inter')
+    ))
+    fig.update_layout(
+        title='Feature Correlation with Yield',
+        xaxis_title='Correlation Coefficient',
+        yaxis_title='Feature',
+        height=400
+    )
+    return fig
+
+
+def _render_feature_analysis():
+    """Render yield analysis by categories (averages from the yield cube)"""
     st.subheader("📉 Yield Analysis by Categories")
     
+    cube = load_yield_cube()
+    if cube is None:
+        st.error("⚠️ Dataset not found!")
+        return
+    version = get_data_version()
+    
     # Yield by Crop
     col1, col2 = st.columns(2)
     
     with col1:
-        crop_yield = df.groupby('Crop')['Yield_tons_per_hectare'].mean().sort_values(ascending=False)
-        
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=crop_yield.values,
-            y=crop_yield.index,
-            orientation='h',
-            marker_color='#38ef7d',
-            text=crop_yield.values.round(2),
-            textposition='auto',
-            textfont=dict(color='white', size=12, family='Inter')
-        ))
-        fig.update_layout(
-            title='Average Yield by Crop Type',
-            xaxis_title='Average Yield (tons/ha)',
-            yaxis_title='Crop',
-            height=500,
-            plot_bgcolor='#0f172a',
-            paper_bgcolor='#0f172a',
-            font=dict(color='#e5e7eb', family='Inter'),
-            xaxis=dict(gridcolor='#1f2937'),
-            yaxis=dict(gridcolor='#1f2937')
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure(_category_yield_figure(version, 'Crop', 'Average Yield by Crop Type', 'Crop', '#38ef7d'))
     
     with col2:
-        soil_yield = df.groupby('Soil_Type')['Yield_tons_per_hectare'].mean().sort_values(ascending=False)
-        
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=soil_yield.values,
-            y=soil_yield.index,
-            orientation='h',
-            marker_color='#fa709a',
-            text=soil_yield.values.round(2),
-            textposition='auto',
-            textfont=dict(color='white', size=12, family='Inter')
-        ))
-        fig.update_layout(
-            title='Average Yield by Soil Type',
-            xaxis_title='Average Yield (tons/ha)',
-            yaxis_title='Soil Type',
-            height=500,
-            plot_bgcolor='#0f172a',
-            paper_bgcolor='#0f172a',
-            font=dict(color='#e5e7eb', family='Inter'),
-            xaxis=dict(gridcolor='#1f2937'),
-            yaxis=dict(gridcolor='#1f2937')
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure(_category_yield_figure(version, 'Soil_Type', 'Average Yield by Soil Type', 'Soil Type',
+                                           '#fa709a'))
     
     # Weather vs Yield
-    weather_yield = df.groupby('Weather_Condition')['Yield_tons_per_hectare'].mean().sort_values(ascending=False)
+    show_figure(_weather_yield_figure(version))
+    
+    _render_drilldown(cube, version)
+    
+    # Scatter: Temperature vs Rainfall vs Yield (a mean-yield density grid past the point budget)
+    show_figure(_temperature_rainfall_figure(version))
+    points = load_dataset_profile()['rows']
+    if is_reduced(points):
+        st.caption(f"{points:,} points shown as mean yield per cell")
+
+
+@figure_builder
+def _category_yield_figure(version, dimension, title, axis_title, color):
+    """Horizontal bar chart of the average yield per level of a category"""
+    category_yield = cube_breakdown(load_yield_cube(), dimension)['mean']
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=category_yield.values,
+        y=category_yield.index,
+        orientation='h',
+        marker_color=color,
+        text=category_yield.values.round(2),
+        textposition='auto',
+        textfont=dict(color='white', size=12, family='Inter')
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title='Average Yield (tons/ha)',
+        yaxis_title=axis_title,
+        height=500
+    )
+    return fig
+
+
+@figure_builder
+def _weather_yield_figure(version):
+    """Bar chart of the average yield per weather condition"""
+    weather_yield = cube_breakdown(load_yield_cube(), 'Weather_Condition')['mean']
     
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -318,34 +302,86 @@ def _render_feature_analysis(df):
         title='Average Yield by Weather Condition',
         xaxis_title='Weather Condition',
         yaxis_title='Average Yield (tons/ha)',
-        plot_bgcolor='#0f172a',
-        paper_bgcolor='#0f172a',
-        font=dict(color='#e5e7eb', family='Inter'),
-        xaxis=dict(gridcolor='#1f2937'),
-        yaxis=dict(gridcolor='#1f2937'),
         height=400
     )
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Scatter: Temperature vs Rainfall vs Yield
-    # Create a size column with positive values only
-    df_scatter = df.copy()
-    df_scatter['size_col'] = df_scatter['Yield_tons_per_hectare'].abs() + 1  # Add 1 to ensure all positive
-    
-    fig = px.scatter(df_scatter, 
-                    x='Temperature_Celsius', 
-                    y='Rainfall_mm',
-                    color='Yield_tons_per_hectare',
-                    size='size_col',
-                    hover_data=['Crop', 'Soil_Type'],
-                    color_continuous_scale='Viridis',
-                    title='Temperature vs Rainfall (colored by Yield)')
+    return fig
+
+
+@figure_builder
+def _temperature_rainfall_figure(version):
+    """Temperature vs Rainfall scatter colored by yield"""
+    df = load_dataset()
+    # Marker area grows with yield, as px.scatter(size=...) with size_max=20
+    size = df['Yield_tons_per_hectare'].abs() + 1
+    fig = go.Figure(scatter_trace(
+        df['Temperature_Celsius'], df['Rainfall_mm'],
+        color=df['Yield_tons_per_hectare'], colorscale='Viridis', colorbar_title='Yield',
+        marker=dict(size=size, sizemode='area', sizeref=2 * size.max() / 20 ** 2),
+        customdata=df[['Crop', 'Soil_Type']],
+        hovertemplate=('Temperature: %{x:.1f} °C<br>Rainfall: %{y:.0f} mm<br>Yield: %{marker.color:.2f}'
+                       '<br>%{customdata[0]} on %{customdata[1]}<extra></extra>')
+    ))
+    fig.update_layout(
+        title='Temperature vs Rainfall (colored by Yield)',
+        xaxis_title='Temperature_Celsius',
+        yaxis_title='Rainfall_mm',
+        height=500
+    )
+    return fig
+
+
+def _render_drilldown(cube, version):
+    """Render yield drill-down over every combination of categories"""
+    st.markdown("### 🧭 Drill-down")
+    st.caption("Narrow down category by category; the chart breaks the selection down by the next one")
+
+    dimensions = cube['dimensions']
+    filters = {}
+    for col, dim, values in zip(st.columns(len(dimensions)), dimensions, cube['levels']):
+        with col:
+            choice = st.selectbox(dim.replace('_', ' '), ['All'] + values,
+                                  format_func=_level_label, key=f'drilldown_{dim}')
+        if choice != 'All':
+            filters[dim] = choice
+
+    cell = cube_cell(cube, filters)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Matching Samples", f"{cell['count']:,}")
+    col2.metric("Average Yield", f"{cell['mean']:.2f} t/ha" if cell['count'] else "—")
+    col3.metric("Yield Std Dev", f"{cell['std']:.2f} t/ha" if cell['count'] > 1 else "—")
+
+    remaining = [dim for dim in dimensions if dim not in filters]
+    if not remaining or cell['count'] == 0:
+        return
+    show_figure(_drilldown_figure(version, remaining[0], filters))
+
+
+@figure_builder
+def _drilldown_figure(version, dimension, filters):
+    """Average yield (with std error bars) by a dimension, within the filtered cell"""
+    breakdown = cube_breakdown(load_yield_cube(), dimension, filters)
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=[_level_label(v) for v in breakdown.index],
+        y=breakdown['mean'],
+        error_y=dict(type='data', array=breakdown['std'].fillna(0), color='#94a3b8'),
+        marker_color='#4facfe',
+        text=breakdown['mean'].round(2),
+        customdata=breakdown['count'],
+        hovertemplate='%{x}<br>Average: %{y:.2f} t/ha<br>Samples: %{customdata}<extra></extra>',
+        textposition='auto',
+        textfont=dict(color='white', size=12, family='Inter')
+    ))
     fig.update_layout(
-        height=500,
-        plot_bgcolor='#0f172a',
-        paper_bgcolor='#0f172a',
-        font=dict(color='#e5e7eb', family='Inter'),
-        xaxis=dict(gridcolor='#1f2937'),
-        yaxis=dict(gridcolor='#1f2937')
+        title=f"Average Yield by {dimension.replace('_', ' ')}",
+        xaxis_title=dimension.replace('_', ' '),
+        yaxis_title='Average Yield (tons/ha)',
+        height=400
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+def _level_label(value):
+    """Display label of a cube level (boolean flags as Yes/No)"""
+    return {'True': 'Yes', 'False': 'No'}.get(value, value)
@@ -11,7 +11,10 @@ sys.path.insert(0, str(project_root))
 
 import streamlit as st
 import plotly.graph_objects as go
-from models.data_loader import load_dataset, load_metrics
+from models.data_loader import load_metrics
+from models.profile import load_dataset_profile, column_summary, category_counts, sample_frame
+from components.figures import figure_builder, show_figure
+from config.settings import TARGET_COL
 
 
 def _inject_styles():
@@ -312,8 +315,9 @@ def _render_dataset_overview():
         """, unsafe_allow_html=True)
     
     with col2:
-        df = load_dataset()
-        if df is not None:
+        profile = load_dataset_profile()
+        if profile is not None:
+            target = column_summary(profile, TARGET_COL)
             st.markdown("""
             <div class='section-card'>
                 <h3>📊 Dataset Stats</h3>
@@ -322,19 +326,19 @@ def _render_dataset_overview():
             st.markdown(f"""
             <div class='stat-card' style='margin-top:12px;'>
                 <div class='stat-label'>Total Samples</div>
-                <div class='stat-value'>{df.shape[0]:,}</div>
+                <div class='stat-value'>{profile['rows']:,}</div>
             </div>
             <div class='stat-card' style='margin-top:12px;'>
                 <div class='stat-label'>Total Features</div>
-                <div class='stat-value'>{df.shape[1] - 1}</div>
+                <div class='stat-value'>{len(profile['columns']) - 1}</div>
             </div>
             <div class='stat-card' style='margin-top:12px;'>
                 <div class='stat-label'>Mean Yield</div>
-                <div class='stat-value'>{df['Yield_tons_per_hectare'].mean():.2f} t/ha</div>
+                <div class='stat-value'>{target['mean']:.2f} t/ha</div>
             </div>
             <div class='stat-card' style='margin-top:12px;'>
                 <div class='stat-label'>Max Yield</div>
-                <div class='stat-value'>{df['Yield_tons_per_hectare'].max():.2f} t/ha</div>
+                <div class='stat-value'>{target['max']:.2f} t/ha</div>
             </div>
             """, unsafe_allow_html=True)
         else:
@@ -345,13 +349,14 @@ def _render_quick_stats():
     """Render quick statistics"""
     st.subheader("📊 Quick Dataset Overview")
     
-    df = load_dataset()
-    if df is not None:
-        samples = df.shape[0]
-        features = df.shape[1] - 1
-        mean_yield = df['Yield_tons_per_hectare'].mean()
-        std_yield = df['Yield_tons_per_hectare'].std()
-        crops = df['Crop'].nunique()
+    profile = load_dataset_profile()
+    if profile is not None:
+        target = column_summary(profile, TARGET_COL)
+        samples = profile['rows']
+        features = len(profile['columns']) - 1
+        mean_yield = target['mean']
+        std_yield = target['std']
+        crops = len(category_counts(profile, 'Crop'))
 
         stats_html = f"""
         <div class='stats-grid'>
@@ -381,7 +386,7 @@ def _render_quick_stats():
 
         st.markdown("<div class='section-card' style='padding: 12px;'>", unsafe_allow_html=True)
         with st.expander("📋 View Sample Data", expanded=False):
-            st.dataframe(df.head(10), use_container_width=True)
+            st.dataframe(sample_frame(profile, 10), use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
 
 
@@ -395,39 +400,7 @@ def _render_model_performance():
         if r2_col is None:
             st.warning("Metrics file missing R2 column; please refresh metrics.")
             return
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            x=metrics_df['Model'],
-            y=metrics_df[r2_col],
-            name='R² Score',
-            marker=dict(
-                color='#7dd3fc',
-                line=dict(color='#e0f2fe', width=1.6),
-                opacity=1.0
-            ),
-            text=metrics_df[r2_col].round(4),
-            textposition='auto',
-            textfont=dict(color='white', size=12, family='Inter')
-        ))
-        
-        fig.update_layout(
-            title='Model R² Score Comparison',
-            xaxis_title='Model',
-            yaxis_title='R² Score',
-            height=400,
-            showlegend=False,
-            hovermode='x unified',
-            plot_bgcolor='#0e1626',
-            paper_bgcolor='#0e1626',
-            bargap=0.25,
-            font=dict(color='#e5e7eb', family='Inter'),
-            margin=dict(t=40, l=40, r=20, b=40),
-            xaxis=dict(gridcolor='#1f2937', zerolinecolor='#1f2937', showgrid=False, tickfont=dict(color='#e5e7eb')),
-            yaxis=dict(gridcolor='#1f2937', zerolinecolor='#1f2937', range=[0, 1], tickfont=dict(color='#e5e7eb'))
-        )
-        
-        st.plotly_chart(fig, key='home_perf_chart', use_container_width=True)
+        show_figure(_r2_figure(metrics_df, r2_col), key='home_perf_chart')
         
         st.markdown("<div class='section-card' style='padding: 12px;'>", unsafe_allow_html=True)
         with st.expander("📊 Detailed Metrics Table", expanded=False):
@@ -435,6 +408,42 @@ def _render_model_performance():
         st.markdown("</div>", unsafe_allow_html=True)
 
 
+@figure_builder
+def _r2_figure(metrics_df, r2_col):
+    """Bar chart of each model's R² score"""
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        x=metrics_df['Model'],
+        y=metrics_df[r2_col],
+        name='R² Score',
+        marker=dict(
+            color='#7dd3fc',
+            line=dict(color='#e0f2fe', width=1.6),
+            opacity=1.0
+        ),
+        text=metrics_df[r2_col].round(4),
+        textposition='auto',
+        textfont=dict(color='white', size=12, family='Inter')
+    ))
+    
+    fig.update_layout(
+        title='Model R² Score Comparison',
+        xaxis_title='Model',
+        yaxis_title='R² Score',
+        height=400,
+        showlegend=False,
+        hovermode='x unified',
+        plot_bgcolor='#0e1626',
+        paper_bgcolor='#0e1626',
+        bargap=0.25,
+        margin=dict(t=40, l=40, r=20, b=40),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(range=[0, 1])
+    )
+    return fig
+
+
 def _render_call_to_action():
     """Render call to action section"""
     st.markdown("<div style='margin: 2rem 0;'></div>", unsafe_allow_html=True)
@@ -16,6 +16,7 @@ import plotly.graph_objects as go
 from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error, mean_absolute_percentage_error
 from models.model_loader import load_models
 from models.data_loader import load_metrics, load_train_test_data
+from components.figures import figure_builder, show_figure
 
 
 def render():
@@ -136,61 +137,37 @@ def _render_visual_comparison(model1, model2, y_test, pred1, pred2):
     
     with col1:
         # Model 1 predictions
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=y_test, y=pred1,
-            mode='markers',
-            name=model1,
-            marker=dict(size=8, color='#667eea', opacity=0.6)
-        ))
-        fig.add_trace(go.Scatter(
-            x=[y_test.min(), y_test.max()],
-            y=[y_test.min(), y_test.max()],
-            mode='lines',
-            name='Perfect',
-            line=dict(color='#f5576c', dash='dash', width=3)
-        ))
-        fig.update_layout(
-            title=f'{model1} - Actual vs Predicted',
-            xaxis_title='Actual',
-            yaxis_title='Predicted',
-            height=400,
-            plot_bgcolor='#0f172a',
-            paper_bgcolor='#0f172a',
-            font=dict(color='#e5e7eb', family='Inter'),
-            xaxis=dict(gridcolor='#1f2937'),
-            yaxis=dict(gridcolor='#1f2937')
-        )
-        st.plotly_chart(fig, key='model1_pred', use_container_width=True)
+        show_figure(_actual_vs_predicted_figure(model1, y_test, pred1, '#667eea'), key='model1_pred')
     
     with col2:
         # Model 2 predictions
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=y_test, y=pred2,
-            mode='markers',
-            name=model2,
-            marker=dict(size=8, color='#764ba2', opacity=0.6)
-        ))
-        fig.add_trace(go.Scatter(
-            x=[y_test.min(), y_test.max()],
-            y=[y_test.min(), y_test.max()],
-            mode='lines',
-            name='Perfect',
-            line=dict(color='#f5576c', dash='dash', width=3)
-        ))
-        fig.update_layout(
-            title=f'{model2} - Actual vs Predicted',
-            xaxis_title='Actual',
-            yaxis_title='Predicted',
-            height=400,
-            plot_bgcolor='#0f172a',
-            paper_bgcolor='#0f172a',
-            font=dict(color='#e5e7eb', family='Inter'),
-            xaxis=dict(gridcolor='#1f2937'),
-            yaxis=dict(gridcolor='#1f2937')
-        )
-        st.plotly_chart(fig, key='model2_pred', use_container_width=True)
+        show_figure(_actual_vs_predicted_figure(model2, y_test, pred2, '#764ba2'), key='model2_pred')
+
+
+@figure_builder
+def _actual_vs_predicted_figure(model_name, y_test, pred, color):
+    """Scatter of one model's predictions against actual yield"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=y_test, y=pred,
+        mode='markers',
+        name=model_name,
+        marker=dict(size=8, color=color, opacity=0.6)
+    ))
+    fig.add_trace(go.Scatter(
+        x=[y_test.min(), y_test.max()],
+        y=[y_test.min(), y_test.max()],
+        mode='lines',
+        name='Perfect',
+        line=dict(color='#f5576c', dash='dash', width=3)
+    ))
+    fig.update_layout(
+        title=f'{model_name} - Actual vs Predicted',
+        xaxis_title='Actual',
+        yaxis_title='Predicted',
+        height=400
+    )
+    return fig
 
 
 def _render_direct_comparison(model1, model2, y_test, pred1, pred2):
@@ -200,6 +177,14 @@ def _render_direct_comparison(model1, model2, y_test, pred1, pred2):
         y_test = y_test.values.flatten()
     
     st.subheader("🔄 Direct Prediction Comparison")
+    show_figure(_agreement_figure(model1, model2, y_test, pred1, pred2), key='direct_comparison')
+    
+    st.info("💡 Points closer to the red line indicate both models agree on the prediction")
+
+
+@figure_builder
+def _agreement_figure(model1, model2, y_test, pred1, pred2):
+    """Scatter of one model's predictions against the other's, colored by actual yield"""
     fig = go.Figure()
     fig.add_trace(go.Scatter(
         x=pred1, y=pred2,
@@ -222,13 +207,6 @@ def _render_direct_comparison(model1, model2, y_test, pred1, pred2):
         title=f'{model1} vs {model2} Predictions',
         xaxis_title=f'{model1} Predictions',
         yaxis_title=f'{model2} Predictions',
-        height=500,
-        plot_bgcolor='#0f172a',
-        paper_bgcolor='#0f172a',
-        font=dict(color='#e5e7eb', family='Inter'),
-        xaxis=dict(gridcolor='#1f2937'),
-        yaxis=dict(gridcolor='#1f2937')
+        height=500
     )
-    st.plotly_chart(fig, key='direct_comparison', use_container_width=True)
-    
-    st.info("💡 Points closer to the red line indicate both models agree on the prediction")
+    return fig
@@ -16,6 +16,8 @@ import plotly.graph_objects as go
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score, mean_absolute_percentage_error
 from models.model_loader import load_models, predict
 from models.data_loader import load_metrics, load_train_test_data
+from utils.chart_data import histogram_trace
+from components.figures import figure_builder, show_figure
 
 
 def render():
@@ -80,97 +82,52 @@ def _render_metrics_comparison(metrics_df):
     
     with col1:
         # R² Score Comparison
-        fig = go.Figure()
-        colors = ['#7dd3fc', '#c4b5fd'][:len(metrics_df)]
-        fig.add_trace(go.Bar(
-            x=metrics_df['Model'],
-            y=metrics_df[r2_col],
-            marker=dict(
-                color=colors,
-                line=dict(color='#e0f2fe', width=1.6),
-                opacity=1.0
-            ),
-            text=metrics_df[r2_col].round(4),
-            textposition='auto',
-            textfont=dict(color='white', size=12, family='Inter')
-        ))
-        fig.update_layout(
-            title='R² Score Comparison',
-            xaxis_title='Model',
-            yaxis_title='R² Score',
-            height=400,
-            template='plotly_dark',
-            yaxis=dict(range=[0, 1])
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure(_metric_figure(metrics_df, r2_col, 'R² Score Comparison', 'R² Score',
+                                   ('#7dd3fc', '#c4b5fd'), '#e0f2fe', 4, y_range=(0, 1), line_width=1.6))
     
     with col2:
         # MAE Comparison
-        fig = go.Figure()
-        colors = ['#4facfe', '#22d3ee'][:len(metrics_df)]
-        fig.add_trace(go.Bar(
-            x=metrics_df['Model'],
-            y=metrics_df['MAE'],
-            marker=dict(
-                color=colors,
-                line=dict(color='#cfe5ff', width=1.0)
-            ),
-            text=metrics_df['MAE'].round(4),
-            textposition='auto',
-            textfont=dict(color='white', size=12, family='Inter')
-        ))
-        fig.update_layout(
-            title='Mean Absolute Error (MAE)',
-            xaxis_title='Model',
-            yaxis_title='MAE',
-            height=400,
-            template='plotly_dark'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure(_metric_figure(metrics_df, 'MAE', 'Mean Absolute Error (MAE)', 'MAE',
+                                   ('#4facfe', '#22d3ee'), '#cfe5ff', 4))
     
     # RMSE and MAPE
     col1, col2 = st.columns(2)
     
     with col1:
-        fig = go.Figure()
-        colors = ['#f472b6', '#c084fc'][:len(metrics_df)]
-        fig.add_trace(go.Bar(
-            x=metrics_df['Model'],
-            y=metrics_df['RMSE'],
-            marker=dict(color=colors, line=dict(color='#ffd7ef', width=1.0)),
-            text=metrics_df['RMSE'].round(4),
-            textposition='auto',
-            textfont=dict(color='white', size=12, family='Inter')
-        ))
-        fig.update_layout(
-            title='Root Mean Squared Error (RMSE)',
-            xaxis_title='Model',
-            yaxis_title='RMSE',
-            height=400,
-            template='plotly_dark'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure(_metric_figure(metrics_df, 'RMSE', 'Root Mean Squared Error (RMSE)', 'RMSE',
+                                   ('#f472b6', '#c084fc'), '#ffd7ef', 4))
     
     with col2:
         if 'MAPE' in metrics_df.columns:
-            fig = go.Figure()
-            colors = ['#22c55e', '#10b981'][:len(metrics_df)]
-            fig.add_trace(go.Bar(
-                x=metrics_df['Model'],
-                y=metrics_df['MAPE'],
-                marker=dict(color=colors, line=dict(color='#bbf7d0', width=1.0)),
-                text=metrics_df['MAPE'].round(2),
-                textposition='auto',
-                textfont=dict(color='white', size=12, family='Inter')
-            ))
-            fig.update_layout(
-                title='Mean Absolute Percentage Error (MAPE %)',
-                xaxis_title='Model',
-                yaxis_title='MAPE (%)',
-                height=400,
-                template='plotly_dark'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            show_figure(_metric_figure(metrics_df, 'MAPE', 'Mean Absolute Percentage Error (MAPE %)', 'MAPE (%)',
+                                       ('#22c55e', '#10b981'), '#bbf7d0', 2))
+
+
+@figure_builder
+def _metric_figure(metrics_df, column, title, axis_title, colors, line_color, decimals, y_range=None,
+                   line_width=1.0):
+    """Bar chart of one metric per model"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=metrics_df['Model'],
+        y=metrics_df[column],
+        marker=dict(
+            color=list(colors[:len(metrics_df)]),
+            line=dict(color=line_color, width=line_width)
+        ),
+        text=metrics_df[column].round(decimals),
+        textposition='auto',
+        textfont=dict(color='white', size=12, family='Inter')
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title='Model',
+        yaxis_title=axis_title,
+        height=400
+    )
+    if y_range is not None:
+        fig.update_yaxes(range=list(y_range))
+    return fig
 
 
 def _render_detailed_analysis(models, metrics_df):
@@ -206,74 +163,16 @@ def _render_detailed_analysis(models, metrics_df):
                     col4.metric("MAPE", f"{mape:.2f}%")
                     
                     # Actual vs Predicted Plot
-                    fig = go.Figure()
-                    
-                    fig.add_trace(go.Scatter(
-                        x=y_test,
-                        y=y_pred,
-                        mode='markers',
-                        name='Predictions',
-                        marker=dict(size=10, color='#667eea', opacity=0.7, line=dict(width=1, color='#4c51bf'))
-                    ))
-                    
-                    fig.add_trace(go.Scatter(
-                        x=[y_test.min(), y_test.max()],
-                        y=[y_test.min(), y_test.max()],
-                        mode='lines',
-                        name='Perfect Prediction',
-                        line=dict(color='#f5576c', dash='dash', width=3)
-                    ))
-                    
-                    fig.update_layout(
-                        title=f'{selected_model} - Actual vs Predicted Yield',
-                        xaxis_title='Actual Yield (tons/ha)',
-                        yaxis_title='Predicted Yield (tons/ha)',
-                        height=500,
-                        hovermode='closest',
-                        template='plotly_dark'
-                    )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
+                    show_figure(_actual_vs_predicted_figure(selected_model, y_test, y_pred))
                     
                     # Residual Plot
-                    residuals = y_test - y_pred
-                    
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        fig = go.Figure()
-                        fig.add_trace(go.Scatter(
-                            x=y_pred,
-                            y=residuals,
-                            mode='markers',
-                            marker=dict(size=10, color='#fa709a', opacity=0.7, line=dict(width=1, color='#f5576c'))
-                        ))
-                        fig.add_hline(y=0, line_dash="dash", line_color="#f5576c", line_width=2)
-                        fig.update_layout(
-                            title='Residual Plot',
-                            xaxis_title='Predicted Values',
-                            yaxis_title='Residuals',
-                            height=400,
-                            template='plotly_dark'
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
+                        show_figure(_residual_figure(y_test, y_pred))
                     
                     with col2:
-                        fig = go.Figure()
-                        fig.add_trace(go.Histogram(
-                            x=residuals,
-                            nbinsx=30,
-                            marker_color='#4facfe',
-                            marker_line=dict(color='#00f2fe', width=1)
-                        ))
-                        fig.update_layout(
-                            title='Residual Distribution',
-                            xaxis_title='Residuals',
-                            yaxis_title='Frequency',
-                            height=400,
-                            template='plotly_dark'
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
+                        show_figure(_residual_histogram_figure(y_test, y_pred))
                     
                     # Save to session
                     st.session_state['predictions'] = y_pred
@@ -290,6 +189,75 @@ def _render_detailed_analysis(models, metrics_df):
                 st.exception(e)
 
 
+@figure_builder
+def _actual_vs_predicted_figure(model_name, y_test, y_pred):
+    """Scatter of predicted against actual yield with the identity line"""
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=y_test,
+        y=y_pred,
+        mode='markers',
+        name='Predictions',
+        marker=dict(size=10, color='#667eea', opacity=0.7, line=dict(width=1, color='#4c51bf'))
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=[y_test.min(), y_test.max()],
+        y=[y_test.min(), y_test.max()],
+        mode='lines',
+        name='Perfect Prediction',
+        line=dict(color='#f5576c', dash='dash', width=3)
+    ))
+    
+    fig.update_layout(
+        title=f'{model_name} - Actual vs Predicted Yield',
+        xaxis_title='Actual Yield (tons/ha)',
+        yaxis_title='Predicted Yield (tons/ha)',
+        height=500,
+        hovermode='closest'
+    )
+    return fig
+
+
+@figure_builder
+def _residual_figure(y_test, y_pred):
+    """Scatter of residuals against predictions"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=y_pred,
+        y=y_test - y_pred,
+        mode='markers',
+        marker=dict(size=10, color='#fa709a', opacity=0.7, line=dict(width=1, color='#f5576c'))
+    ))
+    fig.add_hline(y=0, line_dash="dash", line_color="#f5576c", line_width=2)
+    fig.update_layout(
+        title='Residual Plot',
+        xaxis_title='Predicted Values',
+        yaxis_title='Residuals',
+        height=400
+    )
+    return fig
+
+
+@figure_builder
+def _residual_histogram_figure(y_test, y_pred):
+    """Histogram of residuals"""
+    fig = go.Figure()
+    fig.add_trace(histogram_trace(
+        y_test - y_pred,
+        marker_color='#4facfe',
+        marker_line=dict(color='#00f2fe', width=1)
+    ))
+    fig.update_layout(
+        title='Residual Distribution',
+        xaxis_title='Residuals',
+        yaxis_title='Frequency',
+        height=400
+    )
+    return fig
+
+
 def _render_raw_data(metrics_df):
     """Render raw data section"""
     st.subheader("📋 Complete Metrics Table")
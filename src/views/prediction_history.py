@@ -0,0 +1,106 @@
+"""
+Prediction History View
+"""
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import streamlit as st
+import pandas as pd
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from models.profile import load_dataset_profile, category_counts
+from models.history import count_history, read_page
+from config.settings import MODEL_PATHS, HISTORY_RING_SIZE, HISTORY_PAGE_SIZE
+
+
+def render():
+    """Render prediction history page"""
+    st.header("🕘 Prediction History")
+    st.markdown("Every single prediction made in the app, stored on disk and paged from the database")
+    st.markdown("---")
+
+    _render_recent()
+    _render_stored()
+
+
+def _render_recent():
+    """Render this session's latest predictions (in-memory ring buffer)"""
+    st.subheader(f"⏱️ This Session (latest {HISTORY_RING_SIZE})")
+    recent = st.session_state.get('prediction_history')
+    if not recent:
+        st.info("💡 No predictions in this session yet - make one on the Single Prediction page")
+        return
+
+    st.dataframe(pd.DataFrame([{
+        'Time': entry['timestamp'],
+        'Model': entry['model'],
+        'Crop': entry['inputs']['crop'],
+        'Prediction': f"{entry['prediction']:.2f}",
+        'Interval': (f"{entry['interval'][0]:.2f} – {entry['interval'][1]:.2f}"
+                     if entry.get('interval') is not None else '')
+    } for entry in reversed(recent)]), hide_index=True, use_container_width=True)
+
+
+def _render_stored():
+    """Render the stored history with filters and keyset paging"""
+    st.markdown("---")
+    st.subheader("🗃️ All Predictions")
+
+    profile = load_dataset_profile()
+    crops = sorted(category_counts(profile, 'Crop').index) if profile is not None else []
+
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        model = st.selectbox("Model", ['All'] + list(MODEL_PATHS.keys()), key='history_model')
+    with col2:
+        crop = st.selectbox("Crop", ['All'] + crops, key='history_crop')
+    with col3:
+        st.markdown("##")
+        own_only = st.checkbox("Only this session", key='history_own')
+
+    ctx = get_script_run_ctx()
+    filters = {
+        'model': None if model == 'All' else model,
+        'crop': None if crop == 'All' else crop,
+        'session': ctx.session_id if own_only and ctx is not None else None
+    }
+
+    # Stack of page start cursors (None = newest page), reset when filters change
+    filter_key = tuple(filters.values())
+    if st.session_state.get('history_filters') != filter_key:
+        st.session_state['history_filters'] = filter_key
+        st.session_state['history_cursors'] = [None]
+    cursors = st.session_state['history_cursors']
+
+    total = count_history(filters)
+    page = read_page(filters, before_id=cursors[-1], limit=HISTORY_PAGE_SIZE)
+
+    if total == 0:
+        st.info("💡 No stored predictions match these filters")
+        return
+
+    first = (len(cursors) - 1) * HISTORY_PAGE_SIZE + 1
+    st.caption(f"Showing {first:,}–{first + len(page) - 1:,} of {total:,} predictions, newest first")
+
+    page['Time'] = pd.to_datetime(page['ts'], unit='s').dt.strftime('%Y-%m-%d %H:%M:%S')
+    for col in ('fertilizer', 'irrigation'):
+        page[col] = page[col].map({1: 'Yes', 0: 'No'})
+    st.dataframe(
+        page[['Time', 'model', 'crop', 'soil', 'weather', 'rainfall', 'temperature',
+              'fertilizer', 'irrigation', 'days', 'prediction', 'lower', 'upper']]
+        .rename(columns=str.title),
+        hide_index=True, use_container_width=True
+    )
+
+    col1, col2, _ = st.columns([1, 1, 4])
+    with col1:
+        if st.button("⬅️ Newer", disabled=len(cursors) == 1, use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if st.button("Older ➡️", disabled=first + len(page) - 1 >= total, use_container_width=True):
+            cursors.append(int(page['id'].min()))
+            st.rerun()
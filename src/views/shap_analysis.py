@@ -1,8 +1,10 @@
 """
 SHAP Analysis View
 """
+import io
 import sys
 import os
+from concurrent.futures import wait, FIRST_COMPLETED
 from pathlib import Path
 
 # Add project root to Python path
@@ -17,7 +19,21 @@ import plotly.graph_objects as go
 import shap
 from models.model_loader import load_models
 from models.data_loader import load_train_test_data
-from config.settings import CATEGORICAL_COLS
+from models.proximity import similar_training_rows
+from config.settings import CATEGORICAL_COLS, RANDOM_STATE, SHAP_POLL_SECONDS, SHAP_PLOT_CACHE_ENTRIES
+from models.explain import background_sample, merge_explanations, mean_abs_importance
+from models.shap_pool import block_explanation
+from models import shap_pool
+from utils.memory import get_state
+from components.lazy_tabs import lazy_tabs
+from components.figures import figure_builder, figure_json, show_figure
+
+
+# Session key of the SHAP analyses of this session, by model name (values,
+# sample and rendered tab outputs), so switching models keeps earlier results
+SHAP_RESULTS_KEY = 'shap_results'
+# Session key of the running SHAP job (rows to explain and chunks done)
+SHAP_JOB_KEY = 'shap_job'
 
 
 def render():
@@ -34,98 +50,252 @@ def render():
     
     st.info("💡 **What is SHAP?** SHAP (SHapley Additive exPlanations) explains model predictions by showing how much each feature contributed to the final prediction.")
     
+    data = load_train_test_data()
+    if 'X_train' not in data or 'X_test' not in data:
+        st.error("❌ Training/Test data not found!")
+        return
+    test_rows = len(data['X_test'])
+    
     col1, col2 = st.columns([2, 1])
     
     with col1:
         model_name = st.selectbox("🤖 Select Model for Analysis", list(models.keys()))
     
     with col2:
-        sample_size = st.slider("Sample Size", 50, 200, 100, 
-                               help="Number of samples to use for SHAP analysis")
+        sample_size = st.slider("Sample Size", min(50, test_rows), test_rows, min(100, test_rows),
+                               help="Number of test rows to explain (up to the whole test set)")
     
-    analyze_button = st.button("🔬 Generate SHAP Analysis", type="primary", use_container_width=True)
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        analyze_button = st.button("🔬 Generate SHAP Analysis", type="primary", use_container_width=True)
+    with col2:
+        cancel_button = st.button("⏹️ Cancel", use_container_width=True,
+                                  help="Stop the running analysis and keep the rows explained so far")
     
     if analyze_button:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
         try:
-            status_text.text("📂 Loading data...")
-            progress_bar.progress(20)
-            
-            data = load_train_test_data()
-            
-            if 'X_train' in data and 'X_test' in data:
-                X_train = data['X_train']
-                X_test = data['X_test']
-
-                # Ensure numeric, aligned frames for SHAP
-                X_train, X_test = _prepare_data_for_shap(X_train, X_test)
-
-                # Sample data for faster computation
-                X_test_sample = X_test.sample(min(sample_size, len(X_test)), random_state=42)
-                
-                status_text.text("🧮 Computing SHAP values...")
-                progress_bar.progress(40)
-                
-                model = models[model_name]
-                
-                # Create explainer on numeric data
-                explainer = shap.Explainer(model, X_train.sample(min(100, len(X_train))))
-                shap_values = explainer(X_test_sample)
-                
-                progress_bar.progress(70)
-                status_text.text("📊 Generating visualizations...")
-                
-                st.success("✅ SHAP analysis complete!")
-                progress_bar.progress(100)
-                status_text.empty()
-                
-                st.markdown("---")
-                
-                # Tabs for different visualizations
-                tab1, tab2, tab3, tab4 = st.tabs(["📊 Summary Plot", "📈 Feature Importance", 
-                                                   "🎯 Individual Prediction", "📋 Data Table"])
-                
-                with tab1:
-                    _render_summary_plot(shap_values, X_test_sample, model_name)
-                
-                with tab2:
-                    _render_feature_importance(shap_values, X_train, model_name)
-                
-                with tab3:
-                    _render_individual_prediction(shap_values, X_test_sample)
-                
-                with tab4:
-                    _render_data_table(shap_values, X_train, model_name)
-                
-                # Store in session
-                st.session_state['shap_values'] = shap_values
-                st.session_state['shap_features'] = X_test_sample
-                
-            else:
-                st.error("❌ Training/Test data not found!")
-                
+            _drop_job(cancel=True)
+            st.session_state[SHAP_JOB_KEY] = _new_job(model_name, data, sample_size)
         except Exception as e:
             st.error(f"❌ Error during SHAP analysis: {str(e)}")
             st.exception(e)
-        finally:
-            progress_bar.empty()
-            status_text.empty()
+    
+    # The job runs in the SHAP worker pool; a rerun (another widget, or the
+    # user coming back to the page) picks it up again where it is
+    job = get_state(st.session_state, SHAP_JOB_KEY)
+    if job is not None:
+        if cancel_button:
+            _finish_job(job, _drop_job(cancel=True), cancelled=True)
+        else:
+            _run_job(job)
+    
+    result = (get_state(st.session_state, SHAP_RESULTS_KEY) or {}).get(model_name)
+    if result is None:
+        return
+    
+    st.markdown("---")
+    st.caption(f"Showing the last analysis of {model_name} ({len(result['features'])} samples)")
+    
+    # Only the selected tab is rendered; its plots and tables are kept in result['outputs'].
+    # The summary plot and the individual prediction panel (with its waterfall) are
+    # fragments: their widgets rerun only that panel, from the stored result
+    model = models[model_name]
+    lazy_tabs({
+        "📊 Summary Plot": lambda: _render_summary_plot(result, model_name),
+        "📈 Feature Importance": lambda: _render_feature_importance(result, model_name),
+        "🎯 Individual Prediction": lambda: _render_individual_prediction(result, model, model_name),
+        "📋 Data Table": lambda: _render_data_table(result, model_name)
+    }, key='shap_tab')
 
 
-def _render_summary_plot(shap_values, X_test_sample, model_name):
-    """Render SHAP summary plot"""
-    st.subheader("📊 SHAP Summary Plot")
-    st.markdown("Shows the distribution of SHAP values for each feature")
+def _new_job(model_name, data, sample_size):
+    """Dispatch a SHAP analysis to the worker pool; returns the session's job state"""
+    # Ensure numeric, aligned frames for SHAP
+    X_train, X_test = _prepare_data_for_shap(data['X_train'], data['X_test'])
     
+    # Fixed samples, so sessions asking for the same analysis share one job
+    job = {
+        'model': model_name,
+        'features': X_test.sample(min(sample_size, len(X_test)), random_state=RANDOM_STATE),
+        'background': background_sample(X_train, random_state=RANDOM_STATE),
+        'columns': list(X_train.columns)
+    }
+    job['key'] = shap_pool.submit(model_name, job['background'], job['features']).key
+    return job
+
+
+def _pool_job(job):
+    """The session job's pool job, dispatched again if the pool no longer has it"""
+    pool_job = shap_pool.attach(job['key'])
+    if pool_job is None:
+        pool_job = shap_pool.submit(job['model'], job['background'], job['features'])
+        job['key'] = pool_job.key
+    return pool_job
+
+
+def _drop_job(cancel):
+    """Forget the session's job and unsubscribe from its pool job; returns the blocks it finished"""
+    job = st.session_state.pop(SHAP_JOB_KEY, None)
+    if job is None:
+        return []
+    pool_job = shap_pool.attach(job['key'])
+    if pool_job is None:
+        return []
+    parts = pool_job.done_parts()
+    shap_pool.release(pool_job, cancel=cancel)
+    return parts
+
+
+def _run_job(job):
+    """Wait for the job's blocks, showing progress and the importances of the rows explained so far"""
+    total = len(job['features'])
+    progress_bar = st.progress(0.0, text=f"🧮 Explained 0 of {total:,} rows")
+    live = st.empty()
+    
+    pool_job = None
+    try:
+        pool_job = _pool_job(job)
+        shown = -1
+        while True:
+            parts = pool_job.done_parts()
+            if len(parts) != shown:
+                shown = len(parts)
+                done = sum(len(part['values']) for part in parts)
+                progress_bar.progress(done / total, text=f"🧮 Explained {done:,} of {total:,} rows")
+                if parts and not pool_job.finished:
+                    _render_partial_importance(live, job, parts)
+            if pool_job.finished:
+                break
+            # Waiting releases the GIL; the SHAP work itself runs in the worker processes
+            wait([f for f in pool_job.futures if not f.done()], timeout=SHAP_POLL_SECONDS,
+                 return_when=FIRST_COMPLETED)
+            # Any Streamlit call lets a widget interaction (or Cancel) stop this run
+            progress_bar.progress(done / total, text=f"🧮 Explained {done:,} of {total:,} rows")
+    except Exception as e:
+        st.session_state.pop(SHAP_JOB_KEY, None)
+        if pool_job is not None:
+            shap_pool.release(pool_job, cancel=True)
+        live.empty()
+        progress_bar.empty()
+        st.error(f"❌ Error during SHAP analysis: {str(e)}")
+        st.exception(e)
+        return
+    
+    live.empty()
+    progress_bar.empty()
+    _finish_job(job, _drop_job(cancel=False), cancelled=False)
+
+
+def _render_partial_importance(live, job, parts):
+    """Global importance bars over the rows explained so far"""
+    chunks = [block_explanation(part, job['columns']) for part in parts]
+    rows = sum(len(c.values) for c in chunks)
+    frame = pd.DataFrame({
+        'Feature': job['columns'],
+        'Importance': mean_abs_importance(chunks)
+    }).sort_values('Importance', ascending=False)
+    fig = _importance_figure.__wrapped__(frame, job['model'])
+    fig.update_layout(title=f"Feature Importance - {job['model']} ({rows:,} rows so far)")
+    with live.container():
+        show_figure(figure_json(fig))
+
+
+def _finish_job(job, parts, cancelled):
+    """Store a job's finished blocks as the model's SHAP result"""
+    total = len(job['features'])
+    if not parts:
+        st.info("⏹️ SHAP analysis cancelled before any rows were explained")
+        return
+    
+    shap_values = merge_explanations([block_explanation(part, job['columns']) for part in parts])
+    positions = np.concatenate([np.arange(part['start'], part['start'] + len(part['values'])) for part in parts])
+    X_test_sample = job['features'].iloc[positions]
+    rows = len(positions)
+    
+    # Store in session, so the tabs below survive the reruns their widgets trigger
+    results = get_state(st.session_state, SHAP_RESULTS_KEY) or {}
+    results[job['model']] = {
+        'model': job['model'],
+        'values': shap_values,
+        'features': X_test_sample,
+        'columns': job['columns'],
+        'outputs': {}
+    }
+    st.session_state[SHAP_RESULTS_KEY] = results
+    
+    if cancelled:
+        st.warning(f"⏹️ Cancelled after {rows:,} of {total:,} rows; showing the rows explained so far")
+    else:
+        st.success("✅ SHAP analysis complete!")
+
+
+def _cached_output(result, key, build):
+    """
+    Output of a tab for this SHAP result, built on first use
+
+    Tuple keys start with their kind (e.g. ('waterfall', sample, features));
+    only the SHAP_PLOT_CACHE_ENTRIES most recently used outputs of a kind
+    are kept, as sliders can ask for one per sample.
+    """
+    outputs = result['outputs']
+    if key in outputs:
+        # Move to the end: dict order is least recently used first
+        outputs[key] = outputs.pop(key)
+        return outputs[key]
+    
+    value = outputs[key] = build()
+    if isinstance(key, tuple):
+        same_kind = [k for k in outputs if isinstance(k, tuple) and k[0] == key[0]]
+        for stale in same_kind[:-SHAP_PLOT_CACHE_ENTRIES]:
+            del outputs[stale]
+    return value
+
+
+def _figure_png(fig) -> bytes:
+    """Rendered PNG of a matplotlib figure (closed afterwards)"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight', facecolor=fig.get_facecolor())
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def _summary_png(shap_values, X_test_sample, model_name, max_display) -> bytes:
+    """SHAP summary (beeswarm) plot as PNG"""
     plt.style.use("dark_background")
     fig, ax = plt.subplots(figsize=(12, 8), facecolor="#0f172a")
     ax.set_facecolor("#0f172a")
-    shap.summary_plot(shap_values, X_test_sample, show=False)
+    shap.summary_plot(shap_values, X_test_sample, max_display=max_display, show=False)
     plt.title(f'SHAP Summary Plot - {model_name}', fontsize=16, pad=20, color="#e5e7eb")
-    st.pyplot(fig)
-    plt.close()
+    return _figure_png(plt.gcf())
+
+
+def _waterfall_png(shap_values, sample_idx, max_display) -> bytes:
+    """SHAP waterfall plot of one sample as PNG"""
+    plt.style.use("dark_background")
+    fig, ax = plt.subplots(figsize=(10, 6), facecolor="#0f172a")
+    ax.set_facecolor("#0f172a")
+    shap.waterfall_plot(shap_values[sample_idx], max_display=max_display, show=False)
+    return _figure_png(plt.gcf())
+
+
+def _importance_frame(result) -> pd.DataFrame:
+    """Mean |SHAP value| per feature, most important first"""
+    return pd.DataFrame({
+        'Feature': result['columns'],
+        'Importance': np.abs(result['values'].values).mean(axis=0)
+    }).sort_values('Importance', ascending=False)
+
+
+@st.fragment
+def _render_summary_plot(result, model_name):
+    """Render SHAP summary plot"""
+    st.subheader("📊 SHAP Summary Plot")
+    st.markdown("Shows the distribution of SHAP values for each feature")
+    
+    features = len(result['columns'])
+    max_display = st.slider("Features Shown", 1, features, min(features, 20), key=f'shap_summary_{model_name}')
+    st.image(_cached_output(result, ('summary', max_display),
+                            lambda: _summary_png(result['values'], result['features'], model_name, max_display)))
     
     st.info("""
     **How to read this plot:**
@@ -136,16 +306,31 @@ def _render_summary_plot(shap_values, X_test_sample, model_name):
     """)
 
 
-def _render_feature_importance(shap_values, X_train, model_name):
+def _render_feature_importance(result, model_name):
     """Render feature importance ranking"""
     st.subheader("📈 Feature Importance Ranking")
     
-    feature_importance = pd.DataFrame({
-        'Feature': X_train.columns,
-        'Importance': np.abs(shap_values.values).mean(axis=0)
-    }).sort_values('Importance', ascending=False)
+    feature_importance = _cached_output(result, 'importance', lambda: _importance_frame(result))
     
     # Interactive bar chart
+    show_figure(_importance_figure(feature_importance, model_name), key='shap_importance')
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 🏆 Top 5 Features")
+        for idx, row in feature_importance.head(5).iterrows():
+            st.metric(row['Feature'], f"{row['Importance']:.4f}")
+    
+    with col2:
+        st.markdown("### 📉 Bottom 5 Features")
+        for idx, row in feature_importance.tail(5).iterrows():
+            st.metric(row['Feature'], f"{row['Importance']:.4f}")
+
+
+@figure_builder
+def _importance_figure(feature_importance, model_name):
+    """Horizontal bar chart of mean |SHAP value| per feature"""
     fig = go.Figure()
     fig.add_trace(go.Bar(
         x=feature_importance['Importance'],
@@ -164,42 +349,23 @@ def _render_feature_importance(shap_values, X_train, model_name):
         xaxis_title='Mean |SHAP Value|',
         yaxis_title='Feature',
         height=500,
-        plot_bgcolor='#0f172a',
-        paper_bgcolor='#0f172a',
-        font=dict(color='#e5e7eb', family='Inter'),
-        xaxis=dict(gridcolor='#1f2937'),
-        yaxis=dict(categoryorder='total ascending', gridcolor='#1f2937')
+        yaxis=dict(categoryorder='total ascending')
     )
-    st.plotly_chart(fig, key='shap_waterfall', use_container_width=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("### 🏆 Top 5 Features")
-        for idx, row in feature_importance.head(5).iterrows():
-            st.metric(row['Feature'], f"{row['Importance']:.4f}")
-    
-    with col2:
-        st.markdown("### 📉 Bottom 5 Features")
-        for idx, row in feature_importance.tail(5).iterrows():
-            st.metric(row['Feature'], f"{row['Importance']:.4f}")
+    return fig
 
 
-def _render_individual_prediction(shap_values, X_test_sample):
+@st.fragment
+def _render_individual_prediction(result, model, model_name):
     """Render individual prediction explanation"""
     st.subheader("🎯 Individual Prediction Explanation")
     
-    sample_idx = st.slider("Select Sample Index", 0, len(X_test_sample)-1, 0)
+    X_test_sample = result['features']
+    sample_idx = st.slider("Select Sample Index", 0, len(X_test_sample)-1, 0, key=f'shap_sample_{model_name}')
     
     st.markdown(f"**Analyzing Sample #{sample_idx}**")
     
     # Waterfall plot
-    plt.style.use("dark_background")
-    fig, ax = plt.subplots(figsize=(10, 6), facecolor="#0f172a")
-    ax.set_facecolor("#0f172a")
-    shap.waterfall_plot(shap_values[sample_idx], show=False)
-    st.pyplot(fig)
-    plt.close()
+    _render_waterfall(result, model_name, sample_idx)
     
     # Show input features
     st.markdown("### 📋 Input Features for this Sample")
@@ -216,16 +382,30 @@ def _render_individual_prediction(shap_values, X_test_sample):
     with col2:
         for feature, value in features_list[mid:]:
             st.metric(feature, f"{value:.2f}")
+    
+    # Explain by example: training rows sharing the most leaves
+    similar = similar_training_rows(model, model_name, X_test_sample.iloc[[sample_idx]])
+    if similar is not None and not similar.empty:
+        st.markdown("### 🧬 Most Similar Training Examples")
+        st.caption("Ranked by the fraction of trees in which they share a leaf with this sample")
+        st.dataframe(similar.round(2), use_container_width=True, hide_index=True)
+
 
+@st.fragment
+def _render_waterfall(result, model_name, sample_idx):
+    """Render the waterfall plot of one sample"""
+    features = len(result['columns'])
+    max_display = st.slider("Features in Waterfall", 1, features, min(features, 10),
+                            key=f'shap_waterfall_{model_name}')
+    st.image(_cached_output(result, ('waterfall', sample_idx, max_display),
+                            lambda: _waterfall_png(result['values'], sample_idx, max_display)))
 
-def _render_data_table(shap_values, X_train, model_name):
+
+def _render_data_table(result, model_name):
     """Render feature importance data table"""
     st.subheader("📋 Feature Importance Data")
     
-    feature_importance = pd.DataFrame({
-        'Feature': X_train.columns,
-        'Importance': np.abs(shap_values.values).mean(axis=0)
-    }).sort_values('Importance', ascending=False)
+    feature_importance = _cached_output(result, 'importance', lambda: _importance_frame(result))
     
     st.dataframe(feature_importance, use_container_width=True)
     
@@ -9,11 +9,23 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+import time
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
 from datetime import datetime
 from models.model_loader import load_models, predict
 from models.data_loader import load_dataset, load_train_test_data
+from models.conformal import load_conformal_table, lookup_interval
+from models.uncertainty import load_leaf_value_table, contribution_stats
+from models.neighbors import load_neighbor_index, query_neighbors
+from models.proximity import similar_training_rows
+from models.counterfactual import load_counterfactual_space, find_counterfactuals
+from models.history import record_prediction
+from config.settings import (
+    CONFIDENCE_LEVELS, CATEGORICAL_COLS, NUMERIC_COLS, BOOLEAN_COLS,
+    FEATURE_NAMES, COUNTERFACTUAL_TARGET, COUNTERFACTUAL_SWITCH_COST
+)
 
 
 def render():
@@ -87,48 +99,57 @@ def render():
     st.markdown("---")
     
     # Model Selection
-    col1, col2 = st.columns([2, 1])
+    col1, col2, col3 = st.columns([2, 1, 1])
     with col1:
         selected_model = st.selectbox("🤖 Select Model for Prediction", 
                                       list(models.keys()),
                                       help="Choose the ML model for prediction")
     with col2:
+        confidence = st.selectbox("🎯 Interval Confidence", CONFIDENCE_LEVELS,
+                                  index=len(CONFIDENCE_LEVELS) // 2,
+                                  format_func=lambda x: f"{x:.0%}",
+                                  help="Coverage of the conformal prediction interval")
+    with col3:
         st.markdown("##")
         predict_button = st.button("🚀 Predict Yield", type="primary", use_container_width=True)
     
+    # Per-tree spread is only available for boosted tree ensembles
+    show_spread = False
+    if hasattr(models[selected_model], 'get_booster'):
+        show_spread = st.checkbox("🌲 Show tree ensemble spread",
+                                  help="Dispersion of the per-tree contributions to this prediction")
+    
+    record = {
+        'Soil_Type': soil_type,
+        'Crop': crop,
+        'Weather_Condition': weather,
+        'Fertilizer_Used': fertilizer,
+        'Irrigation_Used': irrigation,
+        'Rainfall_mm': rainfall,
+        'Temperature_Celsius': temperature,
+        'Days_to_Harvest': days
+    }
+    
     if predict_button:
         try:
             with st.spinner("🔄 Making prediction..."):
-                # Build a one-hot row aligned to training columns
-                row = {col: 0 for col in train_columns}
-
-                # Helper to set one-hot if the column exists
-                def _set_one_hot(prefix: str, value: str):
-                    col_name = f"{prefix}_{value}"
-                    if col_name in row:
-                        row[col_name] = 1
-
-                _set_one_hot("Soil_Type", soil_type)
-                _set_one_hot("Crop", crop)
-                _set_one_hot("Weather_Condition", weather)
-
-                # Set numeric / boolean columns if present
-                if 'Rainfall_mm' in row:
-                    row['Rainfall_mm'] = rainfall
-                if 'Temperature_Celsius' in row:
-                    row['Temperature_Celsius'] = temperature
-                if 'Days_to_Harvest' in row:
-                    row['Days_to_Harvest'] = days
-                if 'Fertilizer_Used' in row:
-                    row['Fertilizer_Used'] = int(fertilizer)
-                if 'Irrigation_Used' in row:
-                    row['Irrigation_Used'] = int(irrigation)
-
-                features = pd.DataFrame([row], columns=train_columns)
+                features = _encode_input(train_columns, record)
                 
                 # Make prediction
                 prediction = predict(models[selected_model], features)[0]
                 
+                # Conformal interval: precomputed residual quantile lookup
+                interval = None
+                conformal_table = load_conformal_table()
+                if conformal_table is not None:
+                    interval = lookup_interval(conformal_table, selected_model, prediction,
+                                               confidence, segment=('Crop', crop))
+                interval_html = (
+                    f"<p style='color:#e0f2fe; font-size:1.1rem; margin:0.5rem 0 0;'>"
+                    f"{confidence:.0%} interval: {max(interval[0], 0):.2f} – {interval[1]:.2f}</p>"
+                    if interval is not None else ""
+                )
+                
                 # Display Results
                 st.markdown("---")
                 st.success("✅ Prediction Complete!")
@@ -145,11 +166,19 @@ def render():
                         <h2 style="color:#f0f9ff;">🌾 Predicted Yield</h2>
                         <h1 style='font-size: 4rem; margin: 1rem 0; background: linear-gradient(135deg, #93c5fd 0%, #a78bfa 100%); -webkit-background-clip: text; -webkit-text-fill-color: transparent;'>{prediction:.2f}</h1>
                         <h3 style="color:#e0f2fe;">tons/hectare</h3>
+                        {interval_html}
                     </div>
                     """, unsafe_allow_html=True)
                 
                 st.markdown("##")
                 
+                if show_spread:
+                    _render_tree_spread(models[selected_model], selected_model, features)
+                
+                _render_similar_farms(df, record)
+                
+                _render_similar_examples(models[selected_model], selected_model, features)
+                
                 # Input Summary
                 with st.expander("📋 View Input Summary"):
                     summary_col1, summary_col2 = st.columns(2)
@@ -171,14 +200,13 @@ def render():
                         - Model Used: `{selected_model}`
                         """)
                 
-                # Save prediction history
-                if 'prediction_history' not in st.session_state:
-                    st.session_state['prediction_history'] = []
-                
-                st.session_state['prediction_history'].append({
+                # Save prediction history (session ring buffer + database)
+                ctx = get_script_run_ctx()
+                record_prediction(st.session_state, {
                     'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                     'model': selected_model,
                     'prediction': prediction,
+                    'interval': interval,
                     'inputs': {
                         'soil': soil_type,
                         'crop': crop,
@@ -189,8 +217,120 @@ def render():
                         'irrigation': irrigation,
                         'days': days
                     }
-                })
+                }, ctx.session_id if ctx is not None else None)
                 
         except Exception as e:
             st.error(f"❌ Prediction Error: {str(e)}")
             st.exception(e)
+    
+    st.markdown("---")
+    with st.expander("🎯 What Would It Take? (counterfactual search)"):
+        st.caption("Smallest changes to the inputs above that bring the prediction to a target yield")
+        cf_col1, cf_col2 = st.columns([1, 2])
+        with cf_col1:
+            target = st.number_input("Target Yield (t/ha)", min_value=0.0,
+                                     value=COUNTERFACTUAL_TARGET, step=0.25)
+        with cf_col2:
+            fixed = st.multiselect("🔒 Keep Fixed", FEATURE_NAMES, default=CATEGORICAL_COLS,
+                                   help="Features the search may not change")
+        
+        if st.button("🔎 Find Smallest Changes"):
+            _render_counterfactuals(selected_model, train_columns, record, target, fixed)
+
+
+def _encode_input(train_columns, record):
+    """Build a one-hot encoded row aligned to the training columns"""
+    row = {col: 0 for col in train_columns}
+    
+    # Set one-hot columns if present (baseline categories have none)
+    for prefix in CATEGORICAL_COLS:
+        col_name = f"{prefix}_{record[prefix]}"
+        if col_name in row:
+            row[col_name] = 1
+    
+    # Set numeric / boolean columns if present
+    for col in NUMERIC_COLS:
+        if col in row:
+            row[col] = record[col]
+    for col in BOOLEAN_COLS:
+        if col in row:
+            row[col] = int(record[col])
+    
+    return pd.DataFrame([row], columns=train_columns)
+
+
+def _render_tree_spread(model, model_name, features):
+    """Render per-tree contribution statistics for the current input"""
+    table = load_leaf_value_table(model_name)
+    if table is None:
+        st.warning("⚠️ Tree structure not available for this model")
+        return
+    
+    stats = contribution_stats(model, features, table).iloc[0]
+    
+    st.markdown("### 🌲 Tree Ensemble Spread")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Per-Tree Std", f"{stats['Tree_Std']:.4f}",
+                help=f"Std of the {table['n_trees']} per-tree contributions")
+    col2.metric("Smallest Tree Step", f"{stats['Tree_Min']:+.4f}")
+    col3.metric("Largest Tree Step", f"{stats['Tree_Max']:+.4f}")
+
+
+def _render_similar_farms(df, record):
+    """Render the most similar historical records and their actual yields"""
+    index = load_neighbor_index()
+    if index is None:
+        return
+    
+    start = time.perf_counter()
+    neighbors = query_neighbors(index, df, record)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    if neighbors.empty:
+        return
+    
+    st.markdown("### 🏘️ Most Similar Historical Farms")
+    st.caption(f"Matched on: {neighbors['Match_Level'].iloc[0]} · lookup {elapsed_ms:.1f} ms")
+    st.dataframe(
+        neighbors.drop(columns=['Match_Level']).round(2),
+        use_container_width=True,
+        hide_index=True
+    )
+    st.metric("Average Actual Yield of Similar Farms",
+              f"{neighbors['Yield_tons_per_hectare'].mean():.2f} t/ha")
+
+
+def _render_similar_examples(model, model_name, features):
+    """Render training rows that share the most tree leaves with the input"""
+    similar = similar_training_rows(model, model_name, features)
+    if similar is None or similar.empty:
+        return
+    
+    with st.expander("🧬 Similar Training Examples (leaf proximity)"):
+        st.caption("Training rows that land in the same leaves as this input in the most trees")
+        st.dataframe(similar.round(2), use_container_width=True, hide_index=True)
+
+
+def _render_counterfactuals(model_name, train_columns, record, target, fixed):
+    """Render the cheapest input changes that reach the target yield"""
+    space = load_counterfactual_space(model_name)
+    if space is None:
+        st.warning("⚠️ Tree structure not available for this model")
+        return
+    
+    start = time.perf_counter()
+    results = find_counterfactuals(space, _encode_input(train_columns, record), target, fixed)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    if results.empty:
+        st.info(f"ℹ️ No change to the unlocked features was found that reaches "
+                f"{target:.2f} t/ha with {model_name}")
+        return
+    
+    st.caption(f"Cost: numeric changes in standard deviations, each switched category or "
+               f"flag costs {COUNTERFACTUAL_SWITCH_COST:g} · search {elapsed_ms:.0f} ms")
+    st.dataframe(
+        results[['Changes', 'Predicted_Yield', 'Cost']].round(2),
+        use_container_width=True,
+        hide_index=True
+    )